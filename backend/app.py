@@ -1,18 +1,21 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import models
 import schemas
 import crud
-from database import SessionLocal, engine
+import note_storage
+import migrations
+import pagination
+from database import engine, get_async_db, is_statement_timeout
+from config import settings
 import logging
 
-# 라우터 모듈 임포트
-from routers import reviews
-from routers import connections
-from routers import llm
-
 # 로깅 설정
 logging.basicConfig(
     level=logging.INFO,
@@ -20,137 +23,269 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# DB 테이블 생성
-models.Base.metadata.create_all(bind=engine)
-
-# FastAPI 인스턴스 생성
-app = FastAPI(title="개념 그래프 학습 시스템 API")
-
-# CORS 설정
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # 모든 오리진 허용 (개발 환경)
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# DB 세션 의존성
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# 워커 시작 시 한 번 스키마 버전을 확인하고 필요할 때만 테이블 생성/마이그레이션
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(migrations.init_db, engine)
+    yield
 
-# 기본 라우터 정의
-router = APIRouter()
+# 읽기 전용 엔진의 문장 제한 시간 초과는 서버 오류 대신 503으로 응답
+async def handle_operational_error(request, exc: OperationalError):
+    if is_statement_timeout(exc):
+        return JSONResponse(status_code=503, content={"detail": "Query exceeded the statement timeout"})
+    logger.error(f"데이터베이스 오류: {exc}")
+    return JSONResponse(status_code=500, content={"detail": "Database error"})
 
 # 루트 경로 핸들러 - API 상태 확인용
-@app.get("/")
 def read_root():
     return {"status": "online", "message": "개념 그래프 학습 시스템 API가 정상적으로 동작 중입니다."}
 
+# 기본 라우터 정의
+router = APIRouter()
+
 # ------------------------ 개념 API ------------------------
 @router.post("/concepts/", response_model=schemas.Concept)
-def create_concept(concept: schemas.ConceptCreate, db: Session = Depends(get_db)):
-    return crud.create_concept(db=db, concept=concept)
+async def create_concept(concept: schemas.ConceptCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud.create_concept(db=db, concept=concept)
 
 @router.get("/concepts/", response_model=List[schemas.Concept])
-def read_concepts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_concepts(db, skip=skip, limit=limit)
+async def read_concepts(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    concepts = await crud.get_concepts(db, skip=skip, limit=limit, after_id=pagination.decode_id_cursor(cursor))
+    pagination.set_next_cursor(response, concepts, limit)
+    return concepts
 
 @router.get("/concepts/{concept_id}", response_model=schemas.ConceptDetail)
-def read_concept(concept_id: int, db: Session = Depends(get_db)):
-    concept = crud.get_concept(db, concept_id)
+async def read_concept(
+    concept_id: int,
+    related_limit: int = settings.RELATED_CONCEPTS_LIMIT,
+    db: AsyncSession = Depends(get_async_db)
+):
+    concept = await crud.get_concept(db, concept_id)
     if not concept:
         raise HTTPException(status_code=404, detail="Concept not found")
-    return concept
+    if not 0 <= related_limit <= settings.RELATED_CONCEPTS_LIMIT:
+        raise HTTPException(status_code=400, detail=f"related_limit must be between 0 and {settings.RELATED_CONCEPTS_LIMIT}")
+    related_concepts = await crud.get_related_concepts(db, concept_id, related_limit) if related_limit else []
+    return {**schemas.Concept.from_orm(concept).dict(), "related_concepts": related_concepts}
 
 @router.put("/concepts/{concept_id}", response_model=schemas.Concept)
-def update_concept(concept_id: int, concept: schemas.ConceptUpdate, db: Session = Depends(get_db)):
-    db_concept = crud.get_concept(db, concept_id)
+async def update_concept(concept_id: int, concept: schemas.ConceptUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_concept = await crud.get_concept(db, concept_id)
     if not db_concept:
         raise HTTPException(status_code=404, detail="Concept not found")
-    return crud.update_concept(db, concept_id, concept)
+    return await crud.update_concept(db, concept_id, concept)
 
 @router.delete("/concepts/{concept_id}")
-def delete_concept(concept_id: int, db: Session = Depends(get_db)):
-    db_concept = crud.get_concept(db, concept_id)
+async def delete_concept(concept_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_concept = await crud.get_concept(db, concept_id)
     if not db_concept:
         raise HTTPException(status_code=404, detail="Concept not found")
-    crud.delete_concept(db, concept_id)
+    await crud.delete_concept(db, concept_id)
     return {"message": "Concept deleted successfully"}
 
 # ------------------------ 카드 API ------------------------
 @router.post("/cards/", response_model=schemas.Card)
-def create_card(card: schemas.CardCreate, db: Session = Depends(get_db)):
-    return crud.create_card(db=db, card=card)
+async def create_card(card: schemas.CardCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud.create_card(db=db, card=card)
 
 @router.get("/cards/", response_model=List[schemas.Card])
-def read_cards(concept_id: Optional[int] = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def read_cards(
+    response: Response,
+    concept_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    after_id = pagination.decode_id_cursor(cursor)
     if concept_id:
-        return crud.get_cards_by_concept(db, concept_id, skip, limit)
-    return crud.get_cards(db, skip, limit)
+        cards = await crud.get_cards_by_concept(db, concept_id, skip, limit, after_id)
+    else:
+        cards = await crud.get_cards(db, skip, limit, after_id)
+    pagination.set_next_cursor(response, cards, limit)
+    return cards
 
 @router.get("/cards/{card_id}", response_model=schemas.Card)
-def read_card(card_id: int, db: Session = Depends(get_db)):
-    card = crud.get_card(db, card_id)
+async def read_card(card_id: int, db: AsyncSession = Depends(get_async_db)):
+    card = await crud.get_card(db, card_id)
     if not card:
         raise HTTPException(status_code=404, detail="Card not found")
     return card
 
 @router.put("/cards/{card_id}", response_model=schemas.Card)
-def update_card(card_id: int, card: schemas.CardUpdate, db: Session = Depends(get_db)):
-    db_card = crud.get_card(db, card_id)
+async def update_card(card_id: int, card: schemas.CardUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_card = await crud.get_card(db, card_id)
     if not db_card:
         raise HTTPException(status_code=404, detail="Card not found")
-    return crud.update_card(db, card_id, card)
+    return await crud.update_card(db, card_id, card)
 
 @router.delete("/cards/{card_id}")
-def delete_card(card_id: int, db: Session = Depends(get_db)):
-    db_card = crud.get_card(db, card_id)
+async def delete_card(card_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_card = await crud.get_card(db, card_id)
     if not db_card:
         raise HTTPException(status_code=404, detail="Card not found")
-    crud.delete_card(db, card_id)
+    await crud.delete_card(db, card_id)
     return {"message": "Card deleted successfully"}
 
 # ------------------------ 노트 API ------------------------
 @router.post("/notes/", response_model=schemas.Note)
-def create_note(note: schemas.NoteCreate, db: Session = Depends(get_db)):
-    return crud.create_note(db=db, note=note)
+async def create_note(note: schemas.NoteCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud.create_note(db=db, note=note)
 
 @router.get("/notes/", response_model=List[schemas.Note])
-def read_notes(concept_id: Optional[int] = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def read_notes(
+    response: Response,
+    concept_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    after_id = pagination.decode_id_cursor(cursor)
     if concept_id:
-        return crud.get_notes_by_concept(db, concept_id, skip, limit)
-    return crud.get_notes(db, skip, limit)
+        notes = await crud.get_notes_by_concept(db, concept_id, skip, limit, after_id)
+    else:
+        notes = await crud.get_notes(db, skip, limit, after_id)
+    pagination.set_next_cursor(response, notes, limit)
+    return notes
+
+@router.get("/notes/summaries", response_model=List[schemas.NoteSummary])
+async def read_note_summaries(
+    response: Response,
+    concept_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    본문 없이 제목과 짧은 미리보기만 담은 노트 목록을 반환합니다.
+    """
+    notes = await crud.get_note_summaries(db, concept_id, skip, limit, pagination.decode_id_cursor(cursor))
+    pagination.set_next_cursor(response, notes, limit)
+    return notes
+
+def _parse_byte_range(header: Optional[str], size: int):
+    """
+    단일 Range 헤더(bytes=start-end, bytes=start-, bytes=-suffix)를 (start, end)로 변환합니다.
+    헤더가 없거나 여러 구간이면 None (전체 응답), 만족할 수 없는 구간이면 ValueError.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start, _, end = header[len("bytes="):].strip().partition("-")
+    try:
+        if start:
+            start, end = int(start), int(end) if end else size - 1
+        else:
+            start, end = max(size - int(end), 0), size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
+
+@router.get("/notes/{note_id}/content")
+async def read_note_content(note_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    노트 본문 전체를 text/plain으로 스트리밍합니다. 압축된 본문은 보내는 만큼만 점진적으로 풉니다.
+    Range 헤더로 UTF-8 바이트 구간을 요청하면 206 부분 응답을 반환합니다.
+    """
+    stored = await crud.get_note_content(db, note_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Note not found")
+    text, compressed, size = stored
+
+    headers = {"Accept-Ranges": "bytes"}
+    try:
+        byte_range = _parse_byte_range(request.headers.get("range"), size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    status_code = 200
+    start, end = 0, size - 1
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(max(end - start + 1, 0))
+    return StreamingResponse(
+        note_storage.iter_content(text, compressed, start, end),
+        status_code=status_code,
+        media_type="text/plain; charset=utf-8",
+        headers=headers,
+    )
 
 @router.get("/notes/{note_id}", response_model=schemas.Note)
-def read_note(note_id: int, db: Session = Depends(get_db)):
-    db_note = crud.get_note(db, note_id)
+async def read_note(note_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_note = await crud.get_note(db, note_id)
     if not db_note:
         raise HTTPException(status_code=404, detail="Note not found")
     return db_note
 
 @router.put("/notes/{note_id}", response_model=schemas.Note)
-def update_note(note_id: int, note: schemas.NoteUpdate, db: Session = Depends(get_db)):
-    db_note = crud.get_note(db, note_id)
+async def update_note(note_id: int, note: schemas.NoteUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_note = await crud.get_note(db, note_id)
     if not db_note:
         raise HTTPException(status_code=404, detail="Note not found")
-    return crud.update_note(db, note_id, note)
+    return await crud.update_note(db, note_id, note)
 
 @router.delete("/notes/{note_id}")
-def delete_note(note_id: int, db: Session = Depends(get_db)):
-    db_note = crud.get_note(db, note_id)
+async def delete_note(note_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_note = await crud.get_note(db, note_id)
     if not db_note:
         raise HTTPException(status_code=404, detail="Note not found")
-    crud.delete_note(db, note_id)
+    await crud.delete_note(db, note_id)
     return {"message": "Note deleted successfully"}
 
-# 라우터 등록
-app.include_router(router, prefix="/api")
-app.include_router(connections.router, prefix="/api/connections")
-app.include_router(reviews.router, prefix="/api/reviews")
-app.include_router(llm.router, prefix="/api/llm")
+def create_app() -> FastAPI:
+    """
+    FastAPI 애플리케이션을 구성합니다.
+    임포트 시점에는 DB에 접근하지 않으며, 스키마 확인은 lifespan 시작 훅에서 워커마다 한 번 실행됩니다.
+    """
+    # 라우터 모듈은 앱을 만들 때 임포트
+    from routers import batch, connections, exports, graph, imports, llm, reviews, search, statistics
+
+    app = FastAPI(title="개념 그래프 학습 시스템 API", lifespan=lifespan)
+
+    # CORS 설정
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # 모든 오리진 허용 (개발 환경)
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[pagination.NEXT_CURSOR_HEADER, "ETag", "Content-Range"],
+    )
+    app.add_exception_handler(OperationalError, handle_operational_error)
+    app.add_api_route("/", read_root, methods=["GET"])
+
+    # 라우터 등록
+    app.include_router(router, prefix="/api")
+    app.include_router(connections.router, prefix="/api/connections")
+    app.include_router(reviews.router, prefix="/api/reviews")
+    app.include_router(llm.router, prefix="/api/llm")
+    app.include_router(graph.router, prefix="/api/graph")
+    app.include_router(imports.router, prefix="/api/import")
+    app.include_router(exports.router, prefix="/api/export")
+    app.include_router(batch.router, prefix="/api/batch")
+    app.include_router(statistics.router, prefix="/api/stats")
+    app.include_router(search.router, prefix="/api/search")
+    return app
+
+# 모듈 임포트만으로는 라우터를 불러오지 않도록 app은 처음 접근할 때 만듦 (uvicorn app:app과 기존 임포트 호환).
+# 서버는 uvicorn --factory app:create_app으로도 실행할 수 있음
+_app: Optional[FastAPI] = None
 
+def __getattr__(name: str):
+    global _app
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _app is None:
+        _app = create_app()
+    return _app
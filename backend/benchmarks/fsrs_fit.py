@@ -0,0 +1,76 @@
+"""
+FSRS 파라미터 적합 벤치마크
+
+카드 --cards개에 복습 기록을 카드당 --reviews개씩 만든 뒤, 복습 기록을 읽어 배치로 펼치고
+Adam으로 파라미터를 적합하는 시간을 단계별로 측정합니다.
+
+    python benchmarks/fsrs_fit.py --cards 100000 --reviews 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import fsrs
+import models
+from config import settings
+from database import create_db_engine
+
+
+def _seed(engine, cards: int, reviews: int):
+    models.Base.metadata.create_all(bind=engine)
+    rng = np.random.default_rng(0)
+    total = cards * reviews
+    card_ids = np.repeat(np.arange(1, cards + 1), reviews)
+    # 복습 간격이 길수록 실패가 잦은 기록
+    gaps = rng.exponential(10.0, total)
+    gaps[::reviews] = 0.0
+    days = np.cumsum(gaps) - np.repeat(np.cumsum(gaps)[::reviews], reviews)
+    recalled = rng.random(total) < 0.95 / (1 + gaps / 40)
+    difficulties = np.where(recalled, rng.integers(3, 6, total), rng.integers(1, 3, total))
+    reviewed_at = np.datetime64("2024-01-01T00:00:00", "us") + (days * 86400e6).astype("timedelta64[us]")
+    reviewed_text = np.char.replace(np.datetime_as_string(reviewed_at, unit="us"), "T", " ")
+
+    with engine.begin() as connection:
+        connection.exec_driver_sql("INSERT INTO concepts (id, name, description) VALUES (1, '벤치마크', '')")
+        connection.exec_driver_sql(
+            "INSERT INTO cards (id, concept_id, question, answer) VALUES (?, 1, 'Q', 'A')",
+            [(card_id,) for card_id in range(1, cards + 1)],
+        )
+        # ORM 이벤트(스케줄 갱신)를 거치지 않고 기록만 넣음
+        connection.exec_driver_sql(
+            "INSERT INTO reviews (card_id, difficulty, created_at) VALUES (?, ?, ?)",
+            list(zip(card_ids.tolist(), difficulties.tolist(), reviewed_text.tolist())),
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FSRS 파라미터 적합 시간 측정")
+    parser.add_argument("--cards", type=int, default=100_000)
+    parser.add_argument("--reviews", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=settings.FSRS_FIT_ITERATIONS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        started = time.perf_counter()
+        _seed(engine, args.cards, args.reviews)
+        print(f"seeded {args.cards * args.reviews} reviews in {time.perf_counter() - started:.1f}s")
+
+        with engine.connect() as connection:
+            started = time.perf_counter()
+            arrays = fsrs.load_reviews(connection, np)
+            loaded = time.perf_counter()
+            batches = fsrs.make_batches(np, *arrays, settings.FSRS_FIT_BATCH_CARDS)
+            prepared = time.perf_counter()
+            result = fsrs.fit_parameters(np, batches, args.iterations)
+            finished = time.perf_counter()
+        print(f"load {loaded - started:.2f}s, batches {prepared - loaded:.2f}s, fit {finished - prepared:.2f}s "
+              f"(total {finished - started:.2f}s)")
+        print(f"{result.review_count} predicted reviews, loss {result.default_loss:.4f} -> {result.loss:.4f}")
+        engine.dispose()
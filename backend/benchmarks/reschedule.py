@@ -0,0 +1,69 @@
+"""
+전체 카드 복습 간격 재계산 벤치마크
+
+카드와 card_schedule 행을 --cards개 만든 뒤 scheduling.reschedule_cards로 모든 카드의 간격과
+예정일을 다시 계산해 쓰는 시간을 청크 크기별로 측정합니다.
+
+    python benchmarks/reschedule.py --cards 1000000 --chunks 5000 10000 50000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import models
+import scheduling
+from database import create_db_engine
+
+
+def _seed(engine, cards: int):
+    models.Base.metadata.create_all(bind=engine)
+    now = datetime.now()
+    rng = random.Random(0)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("INSERT INTO concepts (id, name, description) VALUES (1, '벤치마크', '')")
+        connection.exec_driver_sql(
+            "INSERT INTO cards (id, concept_id, question, answer) VALUES (?, 1, 'Q', 'A')",
+            [(card_id,) for card_id in range(1, cards + 1)],
+        )
+        rows = []
+        for card_id in range(1, cards + 1):
+            repetitions = rng.randint(0, 8)
+            interval = rng.randint(1, 200)
+            reviewed_at = now - timedelta(days=rng.randint(0, 60))
+            rows.append({
+                "card_id": card_id,
+                "ease": 2.5,
+                "interval_days": interval,
+                "repetitions": repetitions,
+                "lapses": 0,
+                "due_at": reviewed_at + timedelta(days=interval),
+                "last_reviewed_at": reviewed_at,
+            })
+        connection.execute(models.CardSchedule.__table__.insert(), rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="전체 카드 간격 재계산 시간 측정")
+    parser.add_argument("--cards", type=int, default=1_000_000)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[10_000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        started = time.perf_counter()
+        _seed(engine, args.cards)
+        print(f"seeded {args.cards} cards in {time.perf_counter() - started:.1f}s")
+
+        for chunk_size in args.chunks:
+            started = time.perf_counter()
+            with engine.begin() as connection:
+                count = scheduling.reschedule_cards(connection, scale=1.1, chunk_size=chunk_size)
+            elapsed = time.perf_counter() - started
+            print(f"chunk {chunk_size:>6}: {count} cards in {elapsed:.2f}s ({count / elapsed:,.0f} cards/s)")
+        engine.dispose()
@@ -0,0 +1,126 @@
+"""
+SQLite 엔진 설정별 읽기/쓰기 동시성 벤치마크
+
+복습 제출(INSERT + 커밋)을 반복하는 쓰기 스레드와 통계 조회를 반복하는 읽기 스레드를
+동시에 실행하고, 기본 롤백 저널 설정과 운영 설정(WAL 등)의 처리량을 비교합니다.
+
+    python benchmarks/sqlite_concurrency.py --seconds 5 --readers 4 --writers 2
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import func, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+import models
+from config import Settings
+from database import create_db_engine
+
+PROFILES = {
+    # SQLite 기본값에 가까운 설정 (롤백 저널, 매 커밋 fsync)
+    "rollback-journal": Settings(
+        SQLITE_JOURNAL_MODE="DELETE",
+        SQLITE_SYNCHRONOUS="FULL",
+        SQLITE_CACHE_SIZE=-2000,
+        SQLITE_MMAP_SIZE=0,
+    ),
+    "production": Settings(),
+}
+
+
+def _seed(Session, cards: int):
+    db = Session()
+    concept = models.Concept(name="벤치마크", description="")
+    db.add(concept)
+    db.flush()
+    db.add_all(models.Card(concept_id=concept.id, question=f"Q{i}", answer="A") for i in range(cards))
+    db.commit()
+    db.close()
+
+
+def run_profile(name: str, config: Settings, seconds: float, readers: int, writers: int, cards: int):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}", config)
+        models.Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        _seed(Session, cards)
+
+        counts = {"reads": 0, "writes": 0, "errors": 0}
+        read_latency = []
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+
+        def writer(offset: int):
+            db = Session()
+            i = offset
+            while time.perf_counter() < deadline:
+                try:
+                    db.add(models.Review(
+                        card_id=i % cards + 1,
+                        difficulty=i % 5 + 1,
+                        next_review_date=datetime.now() + timedelta(days=1),
+                    ))
+                    db.commit()
+                    with lock:
+                        counts["writes"] += 1
+                except OperationalError:
+                    db.rollback()
+                    with lock:
+                        counts["errors"] += 1
+                i += writers
+            db.close()
+
+        def reader():
+            db = Session()
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    db.query(models.Review.difficulty, func.count(models.Review.id)).group_by(
+                        models.Review.difficulty
+                    ).all()
+                    db.execute(text("SELECT count(*) FROM cards")).scalar()
+                    db.rollback()
+                    with lock:
+                        counts["reads"] += 1
+                        read_latency.append(time.perf_counter() - started)
+                except OperationalError:
+                    db.rollback()
+                    with lock:
+                        counts["errors"] += 1
+            db.close()
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+        threads += [threading.Thread(target=reader) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    read_latency.sort()
+    p99 = read_latency[int(len(read_latency) * 0.99)] * 1000 if read_latency else float("nan")
+    print(
+        f"{name:>17}: writes {counts['writes'] / seconds:8.1f}/s  "
+        f"reads {counts['reads'] / seconds:8.1f}/s  "
+        f"read p99 {p99:7.2f}ms  errors {counts['errors']}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQLite 엔진 설정별 동시성 비교")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--cards", type=int, default=1000)
+    args = parser.parse_args()
+
+    for profile_name, profile in PROFILES.items():
+        run_profile(profile_name, profile, args.seconds, args.readers, args.writers, args.cards)
@@ -0,0 +1,74 @@
+"""
+워커 콜드 스타트 벤치마크
+
+새 인터프리터를 반복해서 띄워 app 모듈 임포트와 시작 훅(스키마 확인)까지 걸리는 시간을 측정합니다.
+멀티 워커 배포에서 워커 하나가 요청을 받을 준비가 되기까지의 시간에 해당합니다.
+
+    python benchmarks/startup.py --runs 20
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# 자식 프로세스에서 실행할 측정 코드
+PROBE = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+
+async def _startup():
+    async with app.app.router.lifespan_context(app.app):
+        pass
+
+asyncio.run(_startup())
+ready = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "ready_ms": (ready - start) * 1000,
+    "heavy_modules": sorted(name for name in ("requests", "numpy") if name in sys.modules),
+}))
+"""
+
+
+def measure(runs: int, database_url: str):
+    env = dict(os.environ, DATABASE_URL=database_url)
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=BACKEND_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return samples
+
+
+def _summary(values):
+    values = sorted(values)
+    return f"median {statistics.median(values):7.1f}ms  p90 {values[int(len(values) * 0.9) - 1]:7.1f}ms"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="app 임포트/시작 시간 측정")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        # 첫 실행에서 스키마를 만든 뒤 이미 초기화된 DB로 측정 (재시작하는 워커 기준)
+        measure(1, database_url)
+        samples = measure(args.runs, database_url)
+
+    print(f"import: {_summary([sample['import_ms'] for sample in samples])}")
+    print(f"ready:  {_summary([sample['ready_ms'] for sample in samples])}")
+    print(f"heavy modules loaded at import: {', '.join(samples[-1]['heavy_modules']) or 'none'}")
@@ -0,0 +1,286 @@
+import argparse
+import csv
+import json
+import logging
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+import models
+
+logger = logging.getLogger(__name__)
+
+# 한 트랜잭션에서 처리할 행 수
+CHUNK_SIZE = 1000
+# IN 절 하나에 넣을 최대 값 개수 (SQLite 바인드 변수 제한 대비)
+LOOKUP_BATCH = 400
+# 응답에 포함할 최대 오류 수
+MAX_REPORTED_ERRORS = 1000
+
+FORMATS = ("ndjson", "csv")
+
+
+class ImportReport:
+    def __init__(self):
+        self.concepts_created = 0
+        self.concepts_skipped = 0
+        self.connections_created = 0
+        self.connections_skipped = 0
+        self.error_count = 0
+        self.errors: List[Dict] = []
+
+    def error(self, line: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def merge(self, other: "ImportReport"):
+        self.concepts_created += other.concepts_created
+        self.concepts_skipped += other.concepts_skipped
+        self.connections_created += other.connections_created
+        self.connections_skipped += other.connections_skipped
+        self.error_count += other.error_count
+        self.errors.extend(other.errors[:MAX_REPORTED_ERRORS - len(self.errors)])
+
+    def as_dict(self) -> Dict:
+        return {
+            "concepts_created": self.concepts_created,
+            "concepts_skipped": self.concepts_skipped,
+            "connections_created": self.connections_created,
+            "connections_skipped": self.connections_skipped,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+
+# ------------------------ 입력 파싱 ------------------------
+def read_ndjson(stream: TextIO) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """
+    NDJSON 입력을 (줄 번호, 행, 오류) 단위로 읽습니다.
+    """
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Each line must be a JSON object"
+            continue
+        yield line_number, row, None
+
+
+def read_csv(stream: TextIO) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """
+    헤더가 있는 CSV 입력을 (줄 번호, 행, 오류) 단위로 읽습니다. 빈 값은 None으로 취급합니다.
+    """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, {key: (value if value != "" else None) for key, value in row.items()}, None
+
+
+def _row_type(row: Dict) -> Optional[str]:
+    row_type = row.get("type")
+    if row_type:
+        return row_type
+    if row.get("name"):
+        return "concept"
+    if row.get("source") or row.get("source_id"):
+        return "connection"
+    return None
+
+
+def _batched(values: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(values)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+# ------------------------ 청크 처리 ------------------------
+def _import_concepts(db: Session, rows: List[Tuple[int, Dict]], report: ImportReport):
+    pending: Dict[str, Dict] = {}
+    for line, row in rows:
+        name = row.get("name")
+        if not isinstance(name, str) or not name.strip():
+            report.error(line, "Concept name is required")
+            continue
+        name = name.strip()
+        if name in pending:
+            report.concepts_skipped += 1
+            continue
+        pending[name] = {"name": name, "description": row.get("description") or ""}
+
+    # 이미 존재하는 이름은 한 번의 조회로 걸러냄
+    for batch in _batched(list(pending), LOOKUP_BATCH):
+        for (name,) in db.query(models.Concept.name).filter(models.Concept.name.in_(batch)):
+            del pending[name]
+            report.concepts_skipped += 1
+
+    if pending:
+        db.execute(insert(models.Concept), list(pending.values()))
+        report.concepts_created += len(pending)
+
+
+def _resolve_concept_ids(db: Session, names: Set[str]) -> Dict[str, int]:
+    ids = {}
+    for batch in _batched(names, LOOKUP_BATCH):
+        for concept_id, name in db.query(models.Concept.id, models.Concept.name).filter(models.Concept.name.in_(batch)):
+            ids[name] = concept_id
+    return ids
+
+
+def _existing_concept_ids(db: Session, concept_ids: Set[int]) -> Set[int]:
+    existing = set()
+    for batch in _batched(concept_ids, LOOKUP_BATCH):
+        existing.update(concept_id for (concept_id,) in db.query(models.Concept.id).filter(models.Concept.id.in_(batch)))
+    return existing
+
+
+def _import_connections(db: Session, rows: List[Tuple[int, Dict]], report: ImportReport):
+    names = set()
+    raw_ids = set()
+    for _, row in rows:
+        for key in ("source", "target"):
+            if row.get(key) is not None:
+                names.add(str(row[key]).strip())
+            elif row.get(f"{key}_id") is not None:
+                try:
+                    raw_ids.add(int(row[f"{key}_id"]))
+                except (TypeError, ValueError):
+                    pass
+
+    # 이름 -> ID, ID 존재 여부를 청크 단위로 한 번에 조회
+    ids_by_name = _resolve_concept_ids(db, names)
+    known_ids = _existing_concept_ids(db, raw_ids)
+
+    def resolve(row: Dict, key: str) -> Tuple[Optional[int], Optional[str]]:
+        if row.get(key) is not None:
+            name = str(row[key]).strip()
+            concept_id = ids_by_name.get(name)
+            return concept_id, None if concept_id else f"Concept '{name}' not found"
+        if row.get(f"{key}_id") is not None:
+            try:
+                concept_id = int(row[f"{key}_id"])
+            except (TypeError, ValueError):
+                return None, f"Invalid {key}_id"
+            return (concept_id, None) if concept_id in known_ids else (None, f"Concept with id {concept_id} not found")
+        return None, f"{key} is required"
+
+    pending: Dict[Tuple[int, int], Dict] = {}
+    for line, row in rows:
+        source_id, error = resolve(row, "source")
+        if error is None:
+            target_id, error = resolve(row, "target")
+        if error is None and source_id == target_id:
+            error = "Cannot create a connection to itself"
+        strength = row.get("strength")
+        if error is None:
+            try:
+                strength = 1.0 if strength is None else float(strength)
+            except (TypeError, ValueError):
+                error = "Invalid strength"
+        if error is not None:
+            report.error(line, error)
+            continue
+        if (source_id, target_id) in pending:
+            report.connections_skipped += 1
+            continue
+        pending[(source_id, target_id)] = {
+            "source_id": source_id,
+            "target_id": target_id,
+            "relation": row.get("relation"),
+            "strength": strength,
+        }
+
+    # 중복 연결 검사: source_id로 유니크 인덱스를 탐색한 뒤 (source_id, target_id) 쌍을 거름
+    for batch in _batched({source_id for source_id, _ in pending}, LOOKUP_BATCH):
+        existing = db.query(models.Connection.source_id, models.Connection.target_id).filter(
+            models.Connection.source_id.in_(batch)
+        )
+        for pair in existing:
+            if tuple(pair) in pending:
+                del pending[tuple(pair)]
+                report.connections_skipped += 1
+
+    if pending:
+        db.execute(insert(models.Connection), list(pending.values()))
+        report.connections_created += len(pending)
+
+
+def _import_chunk(db: Session, chunk: List[Tuple[int, Optional[Dict], Optional[str]]], report: ImportReport):
+    concepts, connections = [], []
+    for line, row, error in chunk:
+        if error is not None:
+            report.error(line, error)
+            continue
+        row_type = _row_type(row)
+        if row_type == "concept":
+            concepts.append((line, row))
+        elif row_type == "connection":
+            connections.append((line, row))
+        else:
+            report.error(line, "Unknown row type")
+
+    # 같은 청크의 연결이 새 개념을 참조할 수 있도록 개념을 먼저 처리.
+    # 청크의 결과는 커밋이 성공한 뒤에만 합산하고, 실패하면 청크의 모든 행을 한 번씩 오류로 보고
+    chunk_report = ImportReport()
+    try:
+        if concepts:
+            _import_concepts(db, concepts, chunk_report)
+        if connections:
+            _import_connections(db, connections, chunk_report)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"가져오기 청크 실패: {e}")
+        for line, _ in concepts + connections:
+            report.error(line, f"Database error: {e.__class__.__name__}")
+    else:
+        report.merge(chunk_report)
+
+
+def import_stream(db: Session, stream: TextIO, format: str = "ndjson", chunk_size: int = CHUNK_SIZE) -> Dict:
+    """
+    개념/연결 행 스트림을 청크 단위 트랜잭션으로 가져옵니다.
+    잘못된 행은 건너뛰고 줄 번호와 함께 보고하며, 나머지 행의 적재는 계속됩니다.
+
+    행 형식:
+        {"type": "concept", "name": ..., "description": ...}
+        {"type": "connection", "source": 이름 | "source_id": ID, "target": ..., "relation": ..., "strength": ...}
+    """
+    rows = read_csv(stream) if format == "csv" else read_ndjson(stream)
+    report = ImportReport()
+    for chunk in _batched(rows, chunk_size):
+        _import_chunk(db, chunk, report)
+    return report.as_dict()
+
+
+# 직접 실행 시 파일 가져오기
+if __name__ == "__main__":
+    import migrations
+    from database import SessionLocal, engine
+
+    migrations.init_db(engine)
+
+    parser = argparse.ArgumentParser(description="개념/연결 NDJSON 또는 CSV 파일을 일괄 가져옵니다.")
+    parser.add_argument("path", help="가져올 파일 경로")
+    parser.add_argument("--format", choices=FORMATS, help="입력 형식 (기본값: 확장자로 판단)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="트랜잭션당 행 수")
+    args = parser.parse_args()
+
+    input_format = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    db = SessionLocal()
+    try:
+        with open(args.path, encoding="utf-8", newline="") as f:
+            result = import_stream(db, f, input_format, args.chunk_size)
+    finally:
+        db.close()
+    print(json.dumps(result, ensure_ascii=False, indent=2))
@@ -1,5 +1,10 @@
 import os
-from pydantic_settings import BaseSettings
+
+try:
+    from pydantic_settings import BaseSettings
+except ImportError:
+    # pydantic 1.x에서는 BaseSettings가 pydantic에 포함됨
+    from pydantic import BaseSettings
 
 class Settings(BaseSettings):
     """
@@ -7,7 +12,57 @@ class Settings(BaseSettings):
     """
     # 데이터베이스 설정
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./concept_graph.db")
+
+    # SQLite 연결 설정 (파일 DB에만 적용)
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    # 음수는 KiB 단위 (기본 64MB)
+    SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_FOREIGN_KEYS: bool = os.getenv("SQLITE_FOREIGN_KEYS", "true").lower() == "true"
+
+    # 커넥션 풀 설정
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+    # 통계/내보내기용 읽기 전용 연결 설정 (READ_DATABASE_URL이 비어 있으면 DATABASE_URL을 읽기 전용으로 엶)
+    READ_DATABASE_URL: str = os.getenv("READ_DATABASE_URL", "")
+    READ_DB_POOL_SIZE: int = int(os.getenv("READ_DB_POOL_SIZE", "3"))
+    READ_DB_MAX_OVERFLOW: int = int(os.getenv("READ_DB_MAX_OVERFLOW", "2"))
+    # 0이면 제한 없음
+    READ_STATEMENT_TIMEOUT_MS: int = int(os.getenv("READ_STATEMENT_TIMEOUT_MS", "10000"))
     
+    # 노트 본문 저장 설정: 이 바이트 수를 넘는 본문은 압축 저장
+    NOTE_COMPRESSION_THRESHOLD: int = int(os.getenv("NOTE_COMPRESSION_THRESHOLD", "4096"))
+    NOTE_COMPRESSION_LEVEL: int = int(os.getenv("NOTE_COMPRESSION_LEVEL", "6"))
+    # 노트 목록 미리보기 글자 수
+    NOTE_PREVIEW_LENGTH: int = int(os.getenv("NOTE_PREVIEW_LENGTH", "200"))
+
+    # SM-2 복습 스케줄 설정 (간격은 일 단위)
+    SM2_INITIAL_EASE: float = float(os.getenv("SM2_INITIAL_EASE", "2.5"))
+    SM2_MINIMUM_EASE: float = float(os.getenv("SM2_MINIMUM_EASE", "1.3"))
+    SM2_FIRST_INTERVAL_DAYS: int = int(os.getenv("SM2_FIRST_INTERVAL_DAYS", "1"))
+    SM2_SECOND_INTERVAL_DAYS: int = int(os.getenv("SM2_SECOND_INTERVAL_DAYS", "6"))
+    SM2_MAXIMUM_INTERVAL_DAYS: int = int(os.getenv("SM2_MAXIMUM_INTERVAL_DAYS", "36500"))
+    # 전체 재계산 시 한 번에 읽고 쓰는 카드 수
+    RESCHEDULE_CHUNK_SIZE: int = int(os.getenv("RESCHEDULE_CHUNK_SIZE", "10000"))
+
+    # 복습 간격 계산 방식: sm2(고정 ease 규칙) 또는 fsrs(복습 기록으로 적합한 기억 모델)
+    SCHEDULER: str = os.getenv("SCHEDULER", "sm2")
+    # fsrs: 다음 복습 시점에 기억하고 있을 목표 확률
+    FSRS_DESIRED_RETENTION: float = float(os.getenv("FSRS_DESIRED_RETENTION", "0.9"))
+    FSRS_MAXIMUM_INTERVAL_DAYS: int = int(os.getenv("FSRS_MAXIMUM_INTERVAL_DAYS", "36500"))
+    # 파라미터 적합: Adam 반복 횟수와 한 번의 반복에 사용하는 카드 수
+    FSRS_FIT_ITERATIONS: int = int(os.getenv("FSRS_FIT_ITERATIONS", "80"))
+    FSRS_FIT_BATCH_CARDS: int = int(os.getenv("FSRS_FIT_BATCH_CARDS", "2000"))
+    # 적합된 파라미터를 DB에서 다시 읽기 전까지 캐시하는 시간(초)
+    FSRS_MODEL_CACHE_SECONDS: int = int(os.getenv("FSRS_MODEL_CACHE_SECONDS", "60"))
+
+    # 개념 상세 조회 시 반환할 최대 관련 개념 수
+    RELATED_CONCEPTS_LIMIT: int = int(os.getenv("RELATED_CONCEPTS_LIMIT", "50"))
+
     # LLM 서비스 설정
     USE_MOCK_LLM: bool = os.getenv("USE_MOCK_LLM", "false").lower() == "true"
     LLM_API_URL: str = os.getenv("LLM_API_URL", "http://localhost:1234/v1")
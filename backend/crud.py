@@ -1,204 +1,354 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel
+from sqlalchemy import literal, or_, select, tuple_, union_all
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
 import models
 import schemas
-import math
+# 복습 기록이 바뀔 때 카드 스케줄을 함께 갱신하는 ORM 이벤트 등록
+import scheduling
+
+async def _first(db: AsyncSession, statement):
+    return (await db.execute(statement.limit(1))).scalars().first()
+
+async def _all(db: AsyncSession, statement):
+    return (await db.execute(statement)).scalars().all()
+
+def _page(statement, model, after_id: Optional[int], skip: int, limit: int):
+    # ID 순서 키셋 페이지네이션: 이전 페이지의 마지막 ID 다음부터 인덱스로 바로 탐색
+    if after_id is not None:
+        statement = statement.where(model.id > after_id)
+    return statement.order_by(model.id).offset(skip).limit(limit)
+
+def _key(values, *columns):
+    # 커서 값을 컬럼 타입으로 바인딩해 DB에 저장된 형식과 같게 비교
+    return tuple_(*values, types=[column.type for column in columns])
+
+async def _save(db: AsyncSession, instance):
+    db.add(instance)
+    await db.commit()
+    await db.refresh(instance)
+    return instance
+
+async def _update(db: AsyncSession, instance, update: BaseModel):
+    update_data = update.dict(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(instance, key, value)
+    await db.commit()
+    await db.refresh(instance)
+    return instance
+
+async def _delete(db: AsyncSession, instance):
+    await db.delete(instance)
+    await db.commit()
+    return instance
 
 # 개념 CRUD 함수
-def get_concept(db: Session, concept_id: int):
-    return db.query(models.Concept).filter(models.Concept.id == concept_id).first()
+async def get_concept(db: AsyncSession, concept_id: int):
+    return await db.get(models.Concept, concept_id)
+
+async def get_concept_by_name(db: AsyncSession, name: str):
+    return await _first(db, select(models.Concept).where(models.Concept.name == name))
 
-def get_concept_by_name(db: Session, name: str):
-    return db.query(models.Concept).filter(models.Concept.name == name).first()
+async def get_concepts(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    return await _all(db, _page(select(models.Concept), models.Concept, after_id, skip, limit))
 
-def get_concepts(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Concept).offset(skip).limit(limit).all()
+async def get_related_concepts(db: AsyncSession, concept_id: int, limit: int = 50):
+    """
+    개념과 연결된 관련 개념을 양방향 모두 한 번의 쿼리로 가져옵니다 (강한 연결 순).
+    방향별 조회가 각각 연결 인덱스를 타도록 OR 대신 UNION ALL로 합칩니다.
+    """
+    def neighbors(own_column, other_column, direction):
+        return (
+            select(
+                models.Concept.id.label("id"),
+                models.Concept.name.label("name"),
+                models.Connection.relation.label("relation"),
+                models.Connection.strength.label("strength"),
+                models.Connection.id.label("connection_id"),
+                literal(direction).label("direction"),
+            )
+            .join(models.Concept, models.Concept.id == other_column)
+            .where(own_column == concept_id)
+        )
+
+    related = union_all(
+        neighbors(models.Connection.source_id, models.Connection.target_id, "outgoing"),
+        neighbors(models.Connection.target_id, models.Connection.source_id, "incoming"),
+    ).subquery()
+    rows = await db.execute(
+        select(related).order_by(related.c.strength.desc(), related.c.connection_id).limit(limit)
+    )
+    return [dict(row._mapping) for row in rows]
 
-def create_concept(db: Session, concept: schemas.ConceptCreate):
+async def create_concept(db: AsyncSession, concept: schemas.ConceptCreate):
     db_concept = models.Concept(name=concept.name, description=concept.description)
-    db.add(db_concept)
-    db.commit()
-    db.refresh(db_concept)
-    return db_concept
-
-def update_concept(db: Session, concept_id: int, concept: schemas.ConceptUpdate):
-    db_concept = get_concept(db, concept_id)
-    update_data = concept.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_concept, key, value)
-    db.commit()
-    db.refresh(db_concept)
-    return db_concept
+    return await _save(db, db_concept)
+
+async def update_concept(db: AsyncSession, concept_id: int, concept: schemas.ConceptUpdate):
+    db_concept = await get_concept(db, concept_id)
+    return await _update(db, db_concept, concept)
 
-def delete_concept(db: Session, concept_id: int):
-    db_concept = get_concept(db, concept_id)
-    db.delete(db_concept)
-    db.commit()
-    return db_concept
+async def delete_concept(db: AsyncSession, concept_id: int):
+    db_concept = await get_concept(db, concept_id)
+    return await _delete(db, db_concept)
 
 # 연결 CRUD 함수
-def get_connection(db: Session, connection_id: int):
-    return db.query(models.Connection).filter(models.Connection.id == connection_id).first()
+async def get_connection(db: AsyncSession, connection_id: int):
+    return await db.get(models.Connection, connection_id)
 
-def get_connections(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Connection).offset(skip).limit(limit).all()
+async def get_connections(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: Optional[int] = None,
+                          source_id: Optional[int] = None, target_id: Optional[int] = None):
+    statement = select(models.Connection)
+    if source_id is not None:
+        statement = statement.where(models.Connection.source_id == source_id)
+    if target_id is not None:
+        statement = statement.where(models.Connection.target_id == target_id)
+    return await _all(db, _page(statement, models.Connection, after_id, skip, limit))
 
-def get_connections_by_concept(db: Session, concept_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Connection).filter(
+async def get_connections_by_concept(db: AsyncSession, concept_id: int, skip: int = 0, limit: int = 100,
+                                     after_id: Optional[int] = None):
+    return await _all(db, _page(select(models.Connection).where(
         or_(
             models.Connection.source_id == concept_id,
             models.Connection.target_id == concept_id
         )
-    ).offset(skip).limit(limit).all()
+    ), models.Connection, after_id, skip, limit))
 
-def create_connection(db: Session, connection: schemas.ConnectionCreate):
+async def get_connection_by_pair(db: AsyncSession, source_id: int, target_id: int):
+    return await _first(db, select(models.Connection).where(
+        models.Connection.source_id == source_id,
+        models.Connection.target_id == target_id
+    ))
+
+async def create_connection(db: AsyncSession, connection: schemas.ConnectionCreate):
     db_connection = models.Connection(
         source_id=connection.source_id,
         target_id=connection.target_id,
         relation=connection.relation,
         strength=connection.strength
     )
-    db.add(db_connection)
-    db.commit()
-    db.refresh(db_connection)
-    return db_connection
+    return await _save(db, db_connection)
+
+async def update_connection(db: AsyncSession, connection_id: int, connection: schemas.ConnectionUpdate):
+    db_connection = await get_connection(db, connection_id)
+    return await _update(db, db_connection, connection)
+
+async def delete_connection(db: AsyncSession, connection_id: int):
+    db_connection = await get_connection(db, connection_id)
+    return await _delete(db, db_connection)
+
+# IN 절 하나에 넣을 최대 값 개수 (SQLite 바인드 변수 제한 대비)
+IN_CLAUSE_BATCH = 400
 
-def delete_connection(db: Session, connection_id: int):
-    db_connection = get_connection(db, connection_id)
-    db.delete(db_connection)
-    db.commit()
-    return db_connection
+def _chunks(values, size: int = IN_CLAUSE_BATCH):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+async def get_existing_concept_ids(db: AsyncSession, concept_ids):
+    existing = set()
+    for chunk in _chunks(set(concept_ids)):
+        existing.update(await _all(db, select(models.Concept.id).where(models.Concept.id.in_(chunk))))
+    return existing
+
+async def get_connections_by_ids(db: AsyncSession, connection_ids):
+    connections = {}
+    for chunk in _chunks(set(connection_ids)):
+        for connection in await _all(db, select(models.Connection).where(models.Connection.id.in_(chunk))):
+            connections[connection.id] = connection
+    return connections
+
+async def get_existing_connection_pairs(db: AsyncSession, pairs):
+    # 행 값 IN 비교는 인덱스 전체를 훑으므로 source_id로 인덱스를 탐색한 뒤 쌍을 거름
+    pairs = set(pairs)
+    existing = {}
+    for chunk in _chunks({source_id for source_id, _ in pairs}):
+        rows = await db.execute(
+            select(models.Connection.id, models.Connection.source_id, models.Connection.target_id).where(
+                models.Connection.source_id.in_(chunk)
+            )
+        )
+        for connection_id, source_id, target_id in rows:
+            if (source_id, target_id) in pairs:
+                existing[(source_id, target_id)] = connection_id
+    return existing
 
 # 카드 CRUD 함수
-def get_card(db: Session, card_id: int):
-    return db.query(models.Card).filter(models.Card.id == card_id).first()
+async def get_card(db: AsyncSession, card_id: int):
+    return await db.get(models.Card, card_id)
 
-def get_cards(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Card).offset(skip).limit(limit).all()
+async def get_cards(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    return await _all(db, _page(select(models.Card), models.Card, after_id, skip, limit))
 
-def get_cards_by_concept(db: Session, concept_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Card).filter(models.Card.concept_id == concept_id).offset(skip).limit(limit).all()
+async def get_cards_by_concept(db: AsyncSession, concept_id: int, skip: int = 0, limit: int = 100,
+                               after_id: Optional[int] = None):
+    statement = select(models.Card).where(models.Card.concept_id == concept_id)
+    return await _all(db, _page(statement, models.Card, after_id, skip, limit))
 
-def create_card(db: Session, card: schemas.CardCreate):
+async def create_card(db: AsyncSession, card: schemas.CardCreate):
     db_card = models.Card(
         concept_id=card.concept_id,
         question=card.question,
         answer=card.answer,
         explanation=card.explanation
     )
-    db.add(db_card)
-    db.commit()
-    db.refresh(db_card)
-    return db_card
-
-def update_card(db: Session, card_id: int, card: schemas.CardUpdate):
-    db_card = get_card(db, card_id)
-    update_data = card.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_card, key, value)
-    db.commit()
-    db.refresh(db_card)
-    return db_card
+    return await _save(db, db_card)
 
-def delete_card(db: Session, card_id: int):
-    db_card = get_card(db, card_id)
-    db.delete(db_card)
-    db.commit()
-    return db_card
+async def update_card(db: AsyncSession, card_id: int, card: schemas.CardUpdate):
+    db_card = await get_card(db, card_id)
+    return await _update(db, db_card, card)
+
+async def delete_card(db: AsyncSession, card_id: int):
+    db_card = await get_card(db, card_id)
+    return await _delete(db, db_card)
 
 # 복습 CRUD 함수
-def get_review(db: Session, review_id: int):
-    return db.query(models.Review).filter(models.Review.id == review_id).first()
+async def get_review(db: AsyncSession, review_id: int):
+    return await db.get(models.Review, review_id)
 
-def get_reviews(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Review).offset(skip).limit(limit).all()
+async def get_reviews(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    return await _all(db, _page(select(models.Review), models.Review, after_id, skip, limit))
 
-def get_reviews_by_card(db: Session, card_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Review).filter(models.Review.card_id == card_id).offset(skip).limit(limit).all()
+async def get_reviews_by_card(db: AsyncSession, card_id: int, skip: int = 0, limit: int = 100,
+                              after_id: Optional[int] = None):
+    statement = select(models.Review).where(models.Review.card_id == card_id)
+    return await _all(db, _page(statement, models.Review, after_id, skip, limit))
 
-def get_due_reviews(db: Session, skip: int = 0, limit: int = 100):
+async def get_due_reviews(db: AsyncSession, skip: int = 0, limit: int = 100,
+                          after: Optional[Tuple[datetime, int]] = None):
+    """
+    예정일이 지난 카드마다 최신 복습 기록 하나를 반환합니다.
+    card_schedule의 (due_at, card_id) 인덱스를 범위 탐색하고 기록은 기본 키로 한 건씩 찾습니다.
+    """
+    schedule = models.CardSchedule
     now = datetime.now()
-    return db.query(models.Review).filter(models.Review.next_review_date <= now).offset(skip).limit(limit).all()
-
-def create_review(db: Session, review: schemas.ReviewCreate):
-    db_review = models.Review(
-        card_id=review.card_id,
-        difficulty=review.difficulty,
-        next_review_date=review.next_review_date
+    statement = (
+        select(models.Review)
+        .join(schedule, schedule.last_review_id == models.Review.id)
+        .where(schedule.due_at <= now)
     )
-    db.add(db_review)
-    db.commit()
-    db.refresh(db_review)
-    return db_review
+    if after is not None:
+        statement = statement.where(tuple_(schedule.due_at, schedule.card_id) > _key(after, schedule.due_at, schedule.card_id))
+    statement = statement.order_by(schedule.due_at, schedule.card_id)
+    return await _all(db, statement.offset(skip).limit(limit))
+
+async def create_review(db: AsyncSession, review: schemas.ReviewCreate):
+    # 다음 복습일은 flush 시 scheduling이 카드의 현재 스케줄 상태로 계산해 채움
+    db_review = models.Review(card_id=review.card_id, difficulty=review.difficulty)
+    return await _save(db, db_review)
+
+async def delete_review(db: AsyncSession, review_id: int):
+    db_review = await get_review(db, review_id)
+    return await _delete(db, db_review)
+
+# 복습 세션 함수
+async def get_card_concept_ids(db: AsyncSession, card_ids):
+    # 카드 ID -> 개념 ID (존재하는 카드만)
+    concept_ids = {}
+    for chunk in _chunks(set(card_ids)):
+        rows = await db.execute(select(models.Card.id, models.Card.concept_id).where(models.Card.id.in_(chunk)))
+        concept_ids.update(rows.all())
+    return concept_ids
+
+async def get_review_session(db: AsyncSession, session_id: str):
+    return await db.get(models.ReviewSession, session_id)
+
+async def get_session_reviews(db: AsyncSession, session_id: str):
+    statement = select(models.Review).where(models.Review.session_id == session_id).order_by(models.Review.id)
+    return await _all(db, statement)
+
+async def submit_review_session(db: AsyncSession, session: schemas.ReviewSessionSubmit, concept_ids):
+    """
+    세션의 복습 기록, 카드 스케줄 갱신, 학습 이력을 한 트랜잭션으로 반영합니다.
+    세션 행을 먼저 flush하므로 같은 세션 ID가 이미 있으면 다른 행을 쓰기 전에 IntegrityError가 납니다.
+    """
+    db.add(models.ReviewSession(id=session.session_id, entry_count=len(session.entries)))
+    await db.flush()
+    # 같은 카드를 여러 번 답했으면 답한 순서대로 스케줄에 반영
+    for entry in sorted(session.entries, key=lambda entry: entry.answered_at):
+        db.add(models.Review(
+            card_id=entry.card_id,
+            difficulty=entry.difficulty,
+            answered_at=entry.answered_at,
+            response_ms=entry.response_ms,
+            session_id=session.session_id,
+        ))
+        db.add(models.LearningHistory(
+            concept_id=concept_ids[entry.card_id],
+            activity_type="review",
+            created_at=entry.answered_at,
+        ))
+    await db.commit()
+    return await get_session_reviews(db, session.session_id)
 
 # SM-2 알고리즘을 사용한 다음 복습 날짜 계산
 def calculate_next_review_date(difficulty: int, repetitions: int = 0):
-    if difficulty < 3:
-        repetitions = 0
-    else:
-        repetitions += 1
-    
-    easiness = max(1.3, 2.5 - 0.8 * difficulty + 0.2)
-    interval = 1
-    
-    if repetitions == 1:
-        interval = 1
-    elif repetitions == 2:
-        interval = 6
-    else:
-        interval = math.ceil(interval * easiness)
-    
+    # 카드 상태 없이 반복 횟수만으로 미리 계산 (실제 복습은 카드에 저장된 상태를 사용)
+    state = scheduling.initial_state()._replace(repetitions=repetitions)
+    interval = scheduling.next_state(state, difficulty).interval_days
     return datetime.now() + timedelta(days=interval)
 
 # 노트 CRUD 함수
-def get_note(db: Session, note_id: int):
-    return db.query(models.Note).filter(models.Note.id == note_id).first()
+async def get_note(db: AsyncSession, note_id: int):
+    return await db.get(models.Note, note_id)
+
+async def get_notes(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    return await _all(db, _page(select(models.Note), models.Note, after_id, skip, limit))
 
-def get_notes(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Note).offset(skip).limit(limit).all()
+# 노트 목록 요약에 필요한 컬럼 (본문 제외)
+NOTE_SUMMARY_COLUMNS = (
+    models.Note.id,
+    models.Note.concept_id,
+    models.Note.title,
+    models.Note.preview,
+    models.Note.content_length,
+    models.Note.created_at,
+    models.Note.updated_at,
+)
 
-def get_notes_by_concept(db: Session, concept_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Note).filter(models.Note.concept_id == concept_id).offset(skip).limit(limit).all()
+async def get_note_summaries(db: AsyncSession, concept_id: Optional[int] = None, skip: int = 0, limit: int = 100,
+                             after_id: Optional[int] = None):
+    statement = select(*NOTE_SUMMARY_COLUMNS)
+    if concept_id:
+        statement = statement.where(models.Note.concept_id == concept_id)
+    return (await db.execute(_page(statement, models.Note, after_id, skip, limit))).all()
 
-def create_note(db: Session, note: schemas.NoteCreate):
+async def get_note_content(db: AsyncSession, note_id: int):
+    # 스트리밍용 저장 형식 본문 (평문, 압축 본문, 바이트 수)
+    statement = select(models.Note.content_text, models.Note.content_compressed, models.Note.content_length)
+    return (await db.execute(statement.where(models.Note.id == note_id))).first()
+
+async def get_notes_by_concept(db: AsyncSession, concept_id: int, skip: int = 0, limit: int = 100,
+                               after_id: Optional[int] = None):
+    statement = select(models.Note).where(models.Note.concept_id == concept_id)
+    return await _all(db, _page(statement, models.Note, after_id, skip, limit))
+
+async def create_note(db: AsyncSession, note: schemas.NoteCreate):
     db_note = models.Note(
         concept_id=note.concept_id,
         title=note.title,
         content=note.content
     )
-    db.add(db_note)
-    db.commit()
-    db.refresh(db_note)
-    return db_note
-
-def update_note(db: Session, note_id: int, note: schemas.NoteUpdate):
-    db_note = get_note(db, note_id)
-    update_data = note.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_note, key, value)
-    db.commit()
-    db.refresh(db_note)
-    return db_note
+    return await _save(db, db_note)
+
+async def update_note(db: AsyncSession, note_id: int, note: schemas.NoteUpdate):
+    db_note = await get_note(db, note_id)
+    return await _update(db, db_note, note)
 
-def delete_note(db: Session, note_id: int):
-    db_note = get_note(db, note_id)
-    db.delete(db_note)
-    db.commit()
-    return db_note
+async def delete_note(db: AsyncSession, note_id: int):
+    db_note = await get_note(db, note_id)
+    return await _delete(db, db_note)
 
 # 학습 이력 CRUD 함수
-def create_learning_history(db: Session, history: schemas.LearningHistoryCreate):
+async def create_learning_history(db: AsyncSession, history: schemas.LearningHistoryCreate):
     db_history = models.LearningHistory(
         concept_id=history.concept_id,
         activity_type=history.activity_type
     )
-    db.add(db_history)
-    db.commit()
-    db.refresh(db_history)
-    return db_history
+    return await _save(db, db_history)
 
-def get_learning_history_by_concept(db: Session, concept_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.LearningHistory).filter(
+async def get_learning_history_by_concept(db: AsyncSession, concept_id: int, skip: int = 0, limit: int = 100):
+    return await _all(db, select(models.LearningHistory).where(
         models.LearningHistory.concept_id == concept_id
-    ).order_by(models.LearningHistory.created_at.desc()).offset(skip).limit(limit).all()
+    ).order_by(models.LearningHistory.created_at.desc()).offset(skip).limit(limit))
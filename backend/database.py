@@ -1,18 +1,201 @@
-from sqlalchemy import create_engine
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from config import Settings, settings
+
+# 데이터베이스 URL (설정의 DATABASE_URL 사용)
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+
+
+def is_memory_sqlite(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+def sqlite_pragmas(config: Settings = settings) -> dict:
+    """
+    새 SQLite 연결마다 적용할 PRAGMA 목록
+    """
+    return {
+        "journal_mode": config.SQLITE_JOURNAL_MODE,
+        "synchronous": config.SQLITE_SYNCHRONOUS,
+        "cache_size": config.SQLITE_CACHE_SIZE,
+        "mmap_size": config.SQLITE_MMAP_SIZE,
+        "busy_timeout": config.SQLITE_BUSY_TIMEOUT_MS,
+        "foreign_keys": "ON" if config.SQLITE_FOREIGN_KEYS else "OFF",
+    }
+
+
+def read_pragmas(config: Settings = settings) -> dict:
+    """
+    읽기 전용 SQLite 연결에 적용할 PRAGMA 목록 (저널 모드는 쓰기 연결이 정함)
+    """
+    return {
+        "query_only": "ON",
+        "cache_size": config.SQLITE_CACHE_SIZE,
+        "mmap_size": config.SQLITE_MMAP_SIZE,
+        "busy_timeout": config.SQLITE_BUSY_TIMEOUT_MS,
+    }
+
+
+def to_read_only_url(url: str) -> str:
+    """
+    파일 SQLite URL을 읽기 전용(mode=ro) URI 형식으로 변환합니다.
+    """
+    if not url.startswith("sqlite:///") or is_memory_sqlite(url) or "mode=ro" in url:
+        return url
+    path, _, query = url[len("sqlite:///"):].partition("?")
+    if not path.startswith("file:"):
+        path = "file:" + path
+    params = [param for param in query.split("&") if param and param != "uri=true"]
+    return f"sqlite:///{path}?" + "&".join(params + ["mode=ro", "uri=true"])
+
+
+def to_async_url(url: str) -> str:
+    """
+    동기 드라이버 URL을 비동기 드라이버 URL로 변환합니다 (sqlite -> sqlite+aiosqlite).
+    """
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    if url.startswith("postgresql:"):
+        return "postgresql+asyncpg:" + url[len("postgresql:"):]
+    return url
+
+
+def _engine_options(url: str, config: Settings, pool_size: int = None, max_overflow: int = None) -> dict:
+    pool = {
+        "pool_size": config.DB_POOL_SIZE if pool_size is None else pool_size,
+        "max_overflow": config.DB_MAX_OVERFLOW if max_overflow is None else max_overflow,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+    }
+    if not url.startswith("sqlite"):
+        return {**pool, "pool_pre_ping": True}
+    if is_memory_sqlite(url):
+        return {"connect_args": {"check_same_thread": False}, "poolclass": StaticPool}
+    return {
+        "connect_args": {"check_same_thread": False, "timeout": config.SQLITE_BUSY_TIMEOUT_MS / 1000},
+        **pool,
+    }
+
+
+def _apply_sqlite_pragmas(engine: Engine, config: Settings, pragmas: dict = None):
+    pragmas = sqlite_pragmas(config) if pragmas is None else pragmas
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def create_db_engine(url: str = SQLALCHEMY_DATABASE_URL, config: Settings = settings) -> Engine:
+    """
+    설정에 따라 데이터베이스 엔진을 생성합니다.
+
+    파일 SQLite는 WAL 저널과 PRAGMA를 적용한 커넥션 풀을 사용하고,
+    in-memory SQLite는 모든 세션이 같은 DB를 보도록 단일 연결을 공유합니다.
+    """
+    engine = create_engine(url, **_engine_options(url, config))
+    if url.startswith("sqlite") and not is_memory_sqlite(url):
+        _apply_sqlite_pragmas(engine, config)
+    return engine
+
+
+def create_async_db_engine(url: str = SQLALCHEMY_DATABASE_URL, config: Settings = settings) -> AsyncEngine:
+    """
+    create_db_engine과 같은 설정의 비동기 엔진을 생성합니다.
+    """
+    engine = create_async_engine(to_async_url(url), **_engine_options(url, config))
+    if url.startswith("sqlite") and not is_memory_sqlite(url):
+        _apply_sqlite_pragmas(engine.sync_engine, config)
+    return engine
+
+
+# SQLite VM 명령을 이 횟수만큼 실행할 때마다 문장 제한 시간을 확인
+SQLITE_PROGRESS_STEPS = 10000
+
+
+def _apply_sqlite_statement_timeout(engine: Engine, timeout_ms: int):
+    """
+    SQLite에는 문장 제한 시간이 없으므로 progress handler로 기한이 지난 문장을 중단시킵니다.
+    연결 단위 execution option statement_timeout_ms로 제한을 바꾸거나 0으로 끌 수 있습니다.
+    """
+    @event.listens_for(engine, "connect")
+    def _install_progress_handler(dbapi_connection, connection_record):
+        info = connection_record.info
+
+        def _check_deadline():
+            deadline = info.get("statement_deadline")
+            return 1 if deadline is not None and time.monotonic() > deadline else 0
+
+        dbapi_connection.set_progress_handler(_check_deadline, SQLITE_PROGRESS_STEPS)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_deadline(connection, cursor, statement, parameters, context, executemany):
+        timeout = connection.get_execution_options().get("statement_timeout_ms", timeout_ms)
+        connection.info["statement_deadline"] = time.monotonic() + timeout / 1000 if timeout else None
+
+    @event.listens_for(engine, "checkin")
+    def _clear_deadline(dbapi_connection, connection_record):
+        connection_record.info.pop("statement_deadline", None)
+
+
+def create_read_engine(url: str = None, config: Settings = settings) -> Engine:
+    """
+    통계와 내보내기처럼 무거운 조회를 위한 읽기 전용 엔진을 생성합니다.
+
+    쓰기 엔진과 커넥션 풀을 나눠 대시보드 조회가 복습 기록 같은 쓰기 요청의 연결을 차지하지 않게 합니다.
+    파일 SQLite는 mode=ro URI와 query_only로 열고, PostgreSQL은 읽기 전용 트랜잭션을 기본값으로 씁니다.
+    두 경우 모두 READ_STATEMENT_TIMEOUT_MS를 넘는 문장은 중단됩니다.
+    """
+    url = url or config.READ_DATABASE_URL or config.DATABASE_URL
+    options = _engine_options(url, config, config.READ_DB_POOL_SIZE, config.READ_DB_MAX_OVERFLOW)
+    timeout_ms = config.READ_STATEMENT_TIMEOUT_MS
+
+    if url.startswith("postgresql"):
+        options["connect_args"] = {
+            "options": f"-c default_transaction_read_only=on -c statement_timeout={timeout_ms}"
+        }
+        return create_engine(url, **options)
+
+    engine = create_engine(to_read_only_url(url), **options)
+    if url.startswith("sqlite") and not is_memory_sqlite(url):
+        _apply_sqlite_pragmas(engine, config, read_pragmas(config))
+        _apply_sqlite_statement_timeout(engine, timeout_ms)
+    return engine
+
+
+def is_statement_timeout(error: OperationalError) -> bool:
+    """
+    읽기 전용 엔진의 문장 제한 시간 초과로 발생한 오류인지 확인합니다.
+    """
+    # SQLite: progress handler 중단, PostgreSQL: query_canceled (57014)
+    return "interrupted" in str(error.orig) or getattr(error.orig, "pgcode", None) == "57014"
 
-# SQLite 데이터베이스 URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./concept_graph.db"
 
 # 데이터베이스 엔진 생성
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+engine = create_db_engine()
 
 # 세션 팩토리 생성
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 비동기 엔진과 세션 팩토리 (커밋 후 속성 접근 시 지연 로딩이 일어나지 않도록 만료하지 않음)
+async_engine = create_async_db_engine()
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# 읽기 전용 엔진과 세션 팩토리 (in-memory SQLite는 다른 연결에서 같은 DB를 볼 수 없으므로 쓰기 엔진 공유)
+read_engine = engine if is_memory_sqlite(SQLALCHEMY_DATABASE_URL) and not settings.READ_DATABASE_URL else create_read_engine()
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
 # 모델 기본 클래스 생성
 Base = declarative_base()
 
@@ -23,3 +206,14 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,391 @@
+"""
+FSRS 방식 기억 모델 스케줄러
+
+카드마다 기억 상태(안정성 S, 난이도 D)를 두고, 마지막 복습 후 t일이 지났을 때 기억하고 있을 확률을
+망각 곡선 R(t, S) = (1 + FACTOR * t / S) ^ DECAY 로 추정합니다. 다음 복습일은 R이 목표 기억률
+(settings.FSRS_DESIRED_RETENTION)까지 떨어지는 날입니다. 상태 갱신 규칙과 17개 파라미터는 FSRS-4.5와 같습니다.
+
+파라미터는 복습 기록(reviews)에서 각 복습 시점의 예측 기억 확률과 실제 성공 여부(난이도 3 이상)의
+로그 손실을 줄이도록 적합합니다. 모든 카드의 같은 회차 복습을 NumPy 배열 연산 한 번으로 계산하고,
+파라미터를 하나씩 조금 바꾼 17개 묶음도 같은 연산에 함께 넣어 기울기를 구합니다 (전진 차분 + Adam).
+적합은 백그라운드 작업으로 실행되며 결과는 scheduler_models 테이블에 저장되고 프로세스별로 캐시됩니다.
+
+복습 한 건을 반영할 때는 NumPy 없이 math로 같은 식을 계산합니다 (scheduling 모듈에서 사용).
+"""
+import logging
+import math
+import threading
+import time
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Connection, Engine
+
+from config import settings
+import models
+
+logger = logging.getLogger(__name__)
+
+DECAY = -0.5
+# t = S일 때 기억 확률이 90%가 되도록 정한 상수 (19/81)
+FACTOR = 0.9 ** (1 / DECAY) - 1
+
+# FSRS-4.5 기본 파라미터 (적합된 모델이 없을 때 사용)
+DEFAULT_PARAMETERS = (
+    0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031, 1.6474,
+    0.1367, 1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755,
+)
+# 파라미터별 허용 범위 (최소, 최대)
+PARAMETER_BOUNDS = (
+    (0.1, 100.0), (0.1, 100.0), (0.1, 100.0), (0.1, 100.0),
+    (1.0, 10.0), (0.1, 5.0), (0.1, 5.0), (0.0, 0.75), (0.0, 4.0),
+    (0.0, 0.8), (0.01, 3.0), (0.5, 5.0), (0.01, 0.2), (0.01, 0.9),
+    (0.01, 2.0), (0.0, 1.0), (1.0, 6.0),
+)
+
+MIN_STABILITY = 0.01
+MAX_STABILITY = 36500.0
+MIN_DIFFICULTY = 1.0
+MAX_DIFFICULTY = 10.0
+
+# 파라미터 적합 설정
+FIT_LEARNING_RATE = 0.05
+# 기본 파라미터에서 멀어지는 데 대한 벌점 (복습 기록 수 단위). 기록이 적으면 기본값 근처에 머무름
+FIT_PRIOR_WEIGHT = 50.0
+# 전진 차분 간격 (파라미터 크기 대비)
+FIT_PROBE = 1e-4
+# log(0)을 피하기 위한 기억 확률 하한/상한 여백
+PROBABILITY_EPSILON = 1e-6
+
+
+class MemoryState(NamedTuple):
+    stability: float
+    difficulty: float
+
+
+class FitResult(NamedTuple):
+    parameters: tuple
+    loss: float
+    default_loss: float
+    review_count: int
+
+
+def grade(difficulty: int) -> int:
+    """
+    난이도(1-5, 클수록 쉽게 기억)를 FSRS 평가(1 다시, 2 어려움, 3 알맞음, 4 쉬움)로 바꿉니다.
+    SM-2와 같이 3 미만은 실패입니다.
+    """
+    return max(1, min(max(difficulty, 1), 5) - 1)
+
+
+def _clip(value: float, lower: float, upper: float) -> float:
+    return min(max(value, lower), upper)
+
+
+def retrievability(elapsed_days: float, stability: float) -> float:
+    return (1 + FACTOR * max(elapsed_days, 0.0) / stability) ** DECAY
+
+
+def next_memory_state(
+    state: Optional[MemoryState], elapsed_days: float, difficulty: int, parameters: Sequence[float]
+) -> MemoryState:
+    """
+    마지막 복습 후 elapsed_days일 뒤 복습한 결과(난이도)를 반영한 기억 상태를 계산합니다.
+    state가 None이면 첫 복습입니다.
+    """
+    w = parameters
+    g = grade(difficulty)
+    if state is None:
+        return MemoryState(
+            _clip(w[g - 1], MIN_STABILITY, MAX_STABILITY),
+            _clip(w[4] - (g - 3) * w[5], MIN_DIFFICULTY, MAX_DIFFICULTY),
+        )
+
+    s, d = state
+    r = retrievability(elapsed_days, s)
+    if g > 1:
+        bonus = (w[15] if g == 2 else 1.0) * (w[16] if g == 4 else 1.0)
+        stability = s * (1 + math.exp(w[8]) * (11 - d) * s ** -w[9] * math.expm1(w[10] * (1 - r)) * bonus)
+    else:
+        stability = min(w[11] * d ** -w[12] * ((s + 1) ** w[13] - 1) * math.exp(w[14] * (1 - r)), s)
+    # 난이도는 평가에 따라 움직이되 첫 복습 '알맞음'의 난이도 쪽으로 조금씩 돌아감
+    difficulty = w[7] * w[4] + (1 - w[7]) * (d - w[6] * (g - 3))
+    return MemoryState(
+        _clip(stability, MIN_STABILITY, MAX_STABILITY),
+        _clip(difficulty, MIN_DIFFICULTY, MAX_DIFFICULTY),
+    )
+
+
+def next_interval(stability: float, scale: float = 1.0) -> int:
+    """
+    기억 확률이 목표 기억률로 떨어질 때까지의 일수 (scale배, 1일 이상 최대 간격 이하).
+    """
+    interval = stability / FACTOR * (settings.FSRS_DESIRED_RETENTION ** (1 / DECAY) - 1) * scale
+    return int(_clip(round(interval), 1, settings.FSRS_MAXIMUM_INTERVAL_DAYS))
+
+
+# ------------------------ 적합된 모델 캐시 ------------------------
+_cache_lock = threading.Lock()
+_cache = {"parameters": None, "loaded_at": 0.0}
+
+
+def _set_cache(parameters: Optional[tuple]):
+    with _cache_lock:
+        _cache["parameters"] = parameters
+        _cache["loaded_at"] = time.monotonic()
+
+
+def clear_cache():
+    _set_cache(None)
+
+
+def get_parameters(connection: Connection) -> tuple:
+    """
+    가장 최근에 적합된 파라미터 (없으면 기본값). 복습마다 DB를 읽지 않도록 설정한 시간 동안 캐시하며,
+    다른 워커에서 적합한 모델도 캐시가 만료되면 반영됩니다.
+    """
+    with _cache_lock:
+        if (
+            _cache["parameters"] is not None
+            and time.monotonic() - _cache["loaded_at"] < settings.FSRS_MODEL_CACHE_SECONDS
+        ):
+            return _cache["parameters"]
+    stored = connection.execute(
+        select(models.SchedulerModel.parameters).order_by(models.SchedulerModel.id.desc()).limit(1)
+    ).scalar()
+    parameters = tuple(stored) if stored and len(stored) == len(DEFAULT_PARAMETERS) else DEFAULT_PARAMETERS
+    _set_cache(parameters)
+    return parameters
+
+
+# ------------------------ 파라미터 적합 ------------------------
+class _Batch(NamedTuple):
+    # 회차 순서로 펼친 복습 기록: 회차 k는 offsets[k]:offsets[k + 1] 구간이며
+    # 기록이 긴 카드부터 놓았으므로 항상 앞쪽 카드들의 연속 구간
+    grades: "np.ndarray"
+    elapsed: "np.ndarray"
+    recalled: "np.ndarray"
+    offsets: List[int]
+    review_count: int
+
+
+# 복습 기록을 읽어 담을 배열 형식
+_REVIEW_DTYPE = [("card_id", "i8"), ("difficulty", "i8"), ("day", "f8")]
+
+
+def load_reviews(connection: Connection, np):
+    """
+    복습 기록을 카드, 기록 순서로 읽어 (카드 ID, 난이도, 복습 시각(일 단위 실수)) 배열로 반환합니다.
+    """
+    review = models.Review.__table__
+    if connection.dialect.name == "sqlite":
+        # 행 객체를 만들지 않고 DBAPI 커서에서 바로 배열로 읽음. 날짜는 SQLite가 율리우스일로 변환하고,
+        # 테이블을 rowid 순서로 훑은 뒤 카드 순서 정렬은 NumPy로 함 (안정 정렬이라 카드 안에서는 기록 순서 유지)
+        cursor = connection.connection.cursor()
+        try:
+            cursor.execute(
+                "SELECT card_id, difficulty, julianday(COALESCE(answered_at, created_at)) FROM reviews "
+                "WHERE card_id IS NOT NULL AND difficulty IS NOT NULL ORDER BY id"
+            )
+            rows = np.fromiter(cursor, dtype=_REVIEW_DTYPE)
+        finally:
+            cursor.close()
+    else:
+        result = connection.execute(
+            select(review.c.card_id, review.c.difficulty, func.coalesce(review.c.answered_at, review.c.created_at))
+            .where(review.c.card_id.is_not(None), review.c.difficulty.is_not(None))
+            .order_by(review.c.id)
+        )
+        epoch = datetime(1970, 1, 1)
+        rows = np.fromiter(
+            (
+                (card_id, difficulty, (reviewed_at.replace(tzinfo=None) - epoch).total_seconds() / 86400)
+                for card_id, difficulty, reviewed_at in result
+            ),
+            dtype=_REVIEW_DTYPE,
+        )
+    rows = rows[np.argsort(rows["card_id"], kind="stable")]
+    return rows["card_id"], rows["difficulty"], rows["day"]
+
+
+def make_batches(np, card_ids, difficulties, days, batch_cards: int, seed: int = 0) -> List[_Batch]:
+    """
+    카드별로 정렬된 복습 기록(복습 시각은 일 단위 실수)을 batch_cards개 카드씩 나눠 회차 순서 배열로 펼칩니다.
+    한 번만 복습한 카드는 예측할 복습이 없으므로 제외합니다.
+    """
+    total = len(card_ids)
+    if total == 0:
+        return []
+    first = np.ones(total, dtype=bool)
+    first[1:] = card_ids[1:] != card_ids[:-1]
+    starts = np.flatnonzero(first)
+    lengths = np.diff(np.append(starts, total))
+
+    elapsed = np.zeros(total)
+    elapsed[1:] = np.diff(days)
+    elapsed[first] = 0.0
+    np.maximum(elapsed, 0.0, out=elapsed)
+    grades = np.maximum(np.clip(difficulties, 1, 5) - 1, 1)
+    recalled = (grades > 1).astype(np.float64)
+
+    repeated = np.flatnonzero(lengths >= 2)
+    np.random.default_rng(seed).shuffle(repeated)
+    batches = []
+    for chunk in np.array_split(repeated, max(1, math.ceil(len(repeated) / batch_cards))):
+        if len(chunk) == 0:
+            continue
+        chunk = chunk[np.argsort(-lengths[chunk], kind="stable")]
+        chunk_lengths = lengths[chunk]
+        rank = np.repeat(np.arange(len(chunk)), chunk_lengths)
+        position = np.arange(chunk_lengths.sum()) - np.repeat(np.cumsum(chunk_lengths) - chunk_lengths, chunk_lengths)
+        source = (np.repeat(starts[chunk], chunk_lengths) + position)[np.lexsort((rank, position))]
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(position))])
+        batches.append(_Batch(
+            grades[source],
+            elapsed[source],
+            recalled[source],
+            offsets.tolist(),
+            int(chunk_lengths.sum()) - len(chunk),
+        ))
+    return batches
+
+
+def _forward(np, weights, batch: _Batch):
+    """
+    파라미터 묶음 weights (P, 17) 각각으로 배치의 기록을 재생해 로그 손실 합 (P,)을 계산합니다.
+    next_memory_state와 같은 식을 모든 카드와 파라미터 묶음에 대해 한 번에 계산합니다.
+    """
+    w = [weights[:, [i]] for i in range(weights.shape[1])]
+    offsets = batch.offsets
+    g = batch.grades[:offsets[1]]
+    stability = np.clip(weights[:, g - 1], MIN_STABILITY, MAX_STABILITY)
+    difficulty = np.clip(w[4] - (g - 3) * w[5], MIN_DIFFICULTY, MAX_DIFFICULTY)
+    loss = np.zeros(weights.shape[0])
+
+    for start, end in zip(offsets[1:-1], offsets[2:]):
+        n = end - start
+        g = batch.grades[start:end]
+        s = stability[:, :n]
+        d = difficulty[:, :n]
+        # DECAY = -0.5이므로 거듭제곱 대신 제곱근으로 계산 (같은 값, 훨씬 빠름)
+        r = 1 / np.sqrt(1 + FACTOR * batch.elapsed[start:end] / s)
+        # 성공이면 r, 실패면 1 - r의 로그
+        p = np.where(batch.recalled[start:end] > 0, r, 1 - r)
+        loss -= np.log(np.maximum(p, PROBABILITY_EPSILON)).sum(axis=1)
+
+        bonus = np.where(g == 2, w[15], np.where(g == 4, w[16], 1.0))
+        new_stability = s * (1 + np.exp(w[8] - w[9] * np.log(s)) * (11 - d) * np.expm1(w[10] * (1 - r)) * bonus)
+        # 실패한 카드(보통 일부)만 망각 후 안정성을 계산
+        failed = np.flatnonzero(g == 1)
+        if len(failed):
+            fs, fd, fr = s[:, failed], d[:, failed], r[:, failed]
+            new_stability[:, failed] = np.minimum(
+                w[11] * np.exp(w[14] * (1 - fr) - w[12] * np.log(fd)) * np.expm1(w[13] * np.log1p(fs)),
+                fs,
+            )
+        stability[:, :n] = np.clip(new_stability, MIN_STABILITY, MAX_STABILITY)
+        difficulty[:, :n] = np.clip(w[7] * w[4] + (1 - w[7]) * (d - w[6] * (g - 3)), MIN_DIFFICULTY, MAX_DIFFICULTY)
+    return loss
+
+
+def fit_parameters(np, batches: List[_Batch], iterations: Optional[int] = None) -> FitResult:
+    """
+    배치를 돌아가며 Adam으로 파라미터를 조정합니다. 기울기는 기준 파라미터와 파라미터를 하나씩 조금 바꾼
+    17개 묶음을 함께 재생한 손실의 차이로 구합니다. 마지막에 전체 기록의 손실이 기본 파라미터보다
+    나빠졌다면 기본 파라미터를 그대로 사용합니다.
+    """
+    iterations = settings.FSRS_FIT_ITERATIONS if iterations is None else iterations
+    review_count = sum(batch.review_count for batch in batches)
+    if review_count == 0:
+        raise ValueError("No cards with two or more reviews to fit")
+
+    defaults = np.array(DEFAULT_PARAMETERS)
+    lower, upper = np.array(PARAMETER_BOUNDS).T
+    scale = np.maximum(np.abs(defaults), 0.05)
+    weights = defaults.copy()
+    first_moment = np.zeros_like(weights)
+    second_moment = np.zeros_like(weights)
+    beta1, beta2 = 0.9, 0.999
+
+    for iteration in range(iterations):
+        batch = batches[iteration % len(batches)]
+        # 범위 끝에 있는 파라미터는 안쪽으로 바꿔서 차분
+        probe = np.where(weights + FIT_PROBE * scale > upper, -FIT_PROBE, FIT_PROBE) * scale
+        candidates = np.vstack([weights, weights + np.diag(probe)])
+        losses = _forward(np, candidates, batch) / batch.review_count
+        losses += FIT_PRIOR_WEIGHT / review_count * (((candidates - defaults) / scale) ** 2).sum(axis=1)
+        # 파라미터 크기로 정규화한 공간에서 Adam 갱신
+        gradient = (losses[1:] - losses[0]) / probe * scale
+
+        first_moment = beta1 * first_moment + (1 - beta1) * gradient
+        second_moment = beta2 * second_moment + (1 - beta2) * gradient ** 2
+        step = first_moment / (1 - beta1 ** (iteration + 1))
+        step /= np.sqrt(second_moment / (1 - beta2 ** (iteration + 1))) + 1e-8
+        learning_rate = FIT_LEARNING_RATE * (1 - 0.9 * iteration / iterations)
+        weights = np.clip(weights - learning_rate * step * scale, lower, upper)
+
+    both = np.vstack([defaults, weights])
+    default_loss, loss = sum(_forward(np, both, batch) for batch in batches) / review_count
+    if loss > default_loss:
+        weights, loss = defaults, default_loss
+    return FitResult(tuple(weights.tolist()), float(loss), float(default_loss), review_count)
+
+
+def fit(connection: Connection, iterations: Optional[int] = None) -> FitResult:
+    # numpy는 적합할 때만 필요하므로 앱 시작 시 임포트하지 않음
+    import numpy as np
+
+    card_ids, difficulties, days = load_reviews(connection, np)
+    batches = make_batches(np, card_ids, difficulties, days, settings.FSRS_FIT_BATCH_CARDS)
+    return fit_parameters(np, batches, iterations)
+
+
+def save_model(connection: Connection, result: FitResult):
+    connection.execute(insert(models.SchedulerModel).values(
+        parameters=list(result.parameters),
+        review_count=result.review_count,
+        loss=result.loss,
+        default_loss=result.default_loss,
+    ))
+
+
+# ------------------------ 백그라운드 적합 작업 ------------------------
+_job_lock = threading.Lock()
+_job = {"status": "idle", "started_at": None, "finished_at": None, "error": None}
+
+
+def start_fit_job() -> bool:
+    """
+    적합 작업을 실행 중으로 표시합니다. 이미 실행 중이면 False를 반환합니다.
+    """
+    with _job_lock:
+        if _job["status"] == "running":
+            return False
+        _job.update(status="running", started_at=datetime.now(), finished_at=None, error=None)
+        return True
+
+
+def fit_job_status() -> dict:
+    with _job_lock:
+        return dict(_job)
+
+
+def run_fit_job(engine: Engine):
+    """
+    복습 기록 전체로 파라미터를 적합해 저장하고 이 프로세스의 캐시를 바로 갱신합니다.
+    start_fit_job으로 실행 중 표시를 한 뒤 호출합니다.
+    """
+    try:
+        with engine.connect() as connection:
+            result = fit(connection)
+        with engine.begin() as connection:
+            save_model(connection, result)
+        _set_cache(result.parameters)
+        outcome = {"status": "done", "error": None}
+        logger.info(f"FSRS 파라미터 적합 완료: 복습 {result.review_count}건, 손실 {result.default_loss:.4f} -> {result.loss:.4f}")
+    except Exception as e:
+        logger.exception("FSRS 파라미터 적합 실패")
+        outcome = {"status": "failed", "error": str(e)}
+    with _job_lock:
+        _job.update(finished_at=datetime.now(), **outcome)
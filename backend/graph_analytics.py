@@ -0,0 +1,210 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from graph_index import GraphIndex
+
+# 버전별로 보관할 계산 결과 수
+_CACHE_SIZE = 16
+
+
+class EdgeArrays:
+    """
+    그래프 인덱스를 정수 배열(COO 형태)로 변환한 결과
+
+    node_ids[i]: i번째 노드의 개념 ID
+    src[e], dst[e], weight[e]: e번째 연결의 양 끝 노드 인덱스와 strength
+    """
+
+    def __init__(self, index: GraphIndex, directed: bool = True):
+        with index.lock:
+            self.version = index.version
+            n_edges = len(index.edges)
+            self.node_ids = np.fromiter(index.nodes, dtype=np.int64, count=len(index.nodes))
+            edges = index.edges.values()
+            source_ids = np.fromiter((edge[0] for edge in edges), dtype=np.int64, count=n_edges)
+            target_ids = np.fromiter((edge[1] for edge in edges), dtype=np.int64, count=n_edges)
+            weight = np.fromiter((edge[3] for edge in edges), dtype=np.float64, count=n_edges)
+
+        # 개념 ID -> 노드 인덱스 변환을 정렬 + 이진 탐색으로 처리
+        order = np.argsort(self.node_ids)
+        sorted_ids = self.node_ids[order]
+        src = order[np.searchsorted(sorted_ids, source_ids)]
+        dst = order[np.searchsorted(sorted_ids, target_ids)]
+
+        if not directed:
+            src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+            weight = np.concatenate([weight, weight])
+
+        self.n = len(self.node_ids)
+        self.directed = directed
+        self.src = src
+        self.dst = dst
+        # 음수 강도는 0으로 취급
+        self.weight = np.clip(weight, 0.0, None)
+
+    def csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        중복 연결을 제거한 CSR 인접 구조 (indptr, indices)를 반환합니다.
+        """
+        keys = np.sort(self.src * max(self.n, 1) + self.dst)
+        keep = np.ones(keys.size, dtype=bool)
+        keep[1:] = keys[1:] != keys[:-1]
+        keys = keys[keep]
+        src, dst = np.divmod(keys, max(self.n, 1))
+        indptr = np.zeros(self.n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=self.n), out=indptr[1:])
+        return indptr, dst
+
+
+def pagerank(arrays: EdgeArrays, damping: float = 0.85, tol: float = 1e-8, max_iter: int = 100) -> np.ndarray:
+    """
+    strength를 가중치로 하는 PageRank를 거듭제곱법으로 계산합니다.
+    나가는 연결이 없는 노드의 점수는 모든 노드에 균등하게 분배합니다.
+    """
+    n = arrays.n
+    if n == 0:
+        return np.zeros(0)
+
+    out_weight = np.bincount(arrays.src, weights=arrays.weight, minlength=n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        transition = np.where(out_weight[arrays.src] > 0, arrays.weight / out_weight[arrays.src], 0.0)
+    dangling = out_weight == 0
+
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        spread = np.bincount(arrays.dst, weights=rank[arrays.src] * transition, minlength=n)
+        new_rank = (1.0 - damping) / n + damping * (spread + rank[dangling].sum() / n)
+        converged = np.abs(new_rank - rank).sum() < tol
+        rank = new_rank
+        if converged:
+            break
+    return rank
+
+
+def weighted_degree(arrays: EdgeArrays) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    strength 합으로 계산한 (들어오는 차수, 나가는 차수)를 반환합니다.
+    """
+    n = arrays.n
+    in_degree = np.bincount(arrays.dst, weights=arrays.weight, minlength=n)
+    out_degree = np.bincount(arrays.src, weights=arrays.weight, minlength=n)
+    return in_degree, out_degree
+
+
+def sampled_betweenness(arrays: EdgeArrays, samples: int = 32, seed: int = 0) -> np.ndarray:
+    """
+    무작위로 고른 출발 노드에서만 Brandes 알고리즘을 수행해 매개 중심성을 근사합니다.
+    BFS는 레벨 단위로 프론티어 전체를 한 번에 확장하며, 결과는 [0, 1]로 정규화됩니다.
+    """
+    n = arrays.n
+    betweenness = np.zeros(n)
+    if n < 3:
+        return betweenness
+
+    indptr, indices = arrays.csr()
+    rng = np.random.default_rng(seed)
+    sources = rng.choice(n, size=min(samples, n), replace=False)
+
+    for source in sources:
+        dist = np.full(n, -1, dtype=np.int64)
+        sigma = np.zeros(n)
+        dist[source] = 0
+        sigma[source] = 1.0
+        frontier = np.array([source])
+        level_edges = []
+        level = 0
+
+        # 순방향: 레벨별 최단 경로 수(sigma) 누적
+        while frontier.size:
+            starts = indptr[frontier]
+            counts = indptr[frontier + 1] - starts
+            total = counts.sum()
+            if total == 0:
+                break
+            offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            neighbors = indices[np.repeat(starts, counts) + offsets]
+            parents = np.repeat(frontier, counts)
+
+            dist[neighbors[dist[neighbors] == -1]] = level + 1
+            on_path = dist[neighbors] == level + 1
+            parents, neighbors = parents[on_path], neighbors[on_path]
+            sigma += np.bincount(neighbors, weights=sigma[parents], minlength=n)
+            level_edges.append((parents, neighbors))
+
+            frontier = np.flatnonzero(dist == level + 1)
+            level += 1
+
+        # 역방향: 깊은 레벨부터 의존도(delta) 누적
+        delta = np.zeros(n)
+        for parents, children in reversed(level_edges):
+            delta += np.bincount(
+                parents, weights=sigma[parents] / sigma[children] * (1.0 + delta[children]), minlength=n
+            )
+        delta[source] = 0.0
+        betweenness += delta
+
+    # 표본 비율만큼 보정한 뒤 (n-1)(n-2)로 정규화
+    # 무방향 그래프는 각 쌍이 양쪽에서 두 번 집계되므로 같은 분모로 정규화됨
+    return betweenness * (n / len(sources)) / ((n - 1) * (n - 2))
+
+
+class CentralityResult:
+    def __init__(self, version: int, node_ids: np.ndarray, scores: Dict[str, np.ndarray]):
+        self.version = version
+        self.node_ids = node_ids
+        self.scores = scores
+
+    def top(self, sort: str, limit: int):
+        """
+        sort 지표 기준 상위 limit개의 (개념 ID, 지표별 점수) 목록을 반환합니다.
+        """
+        order = np.argsort(-self.scores[sort], kind="stable")[:limit]
+        return [
+            (int(self.node_ids[i]), {name: float(values[i]) for name, values in self.scores.items()})
+            for i in order
+        ]
+
+    def score_by_id(self, metric: str) -> Dict[int, float]:
+        return dict(zip(self.node_ids.tolist(), self.scores[metric].tolist()))
+
+
+def compute_centrality(index: GraphIndex, directed: bool = True, damping: float = 0.85,
+                       samples: int = 32) -> CentralityResult:
+    arrays = EdgeArrays(index, directed)
+    in_degree, out_degree = weighted_degree(arrays)
+    return CentralityResult(arrays.version, arrays.node_ids, {
+        "pagerank": pagerank(arrays, damping),
+        "in_degree": in_degree,
+        "out_degree": out_degree,
+        "degree": in_degree + out_degree,
+        "betweenness": sampled_betweenness(arrays, samples),
+    })
+
+
+# 그래프 version별 계산 결과 캐시
+_cache_lock = threading.Lock()
+_cache: "OrderedDict[tuple, CentralityResult]" = OrderedDict()
+
+
+def get_centrality(index: GraphIndex, directed: bool = True, damping: float = 0.85,
+                   samples: int = 32) -> CentralityResult:
+    """
+    캐시된 중심성 결과를 반환합니다. 그래프 version이 바뀌면 다시 계산합니다.
+    """
+    key = (index.version, directed, damping, samples)
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+            return result
+
+    result = compute_centrality(index, directed, damping, samples)
+
+    with _cache_lock:
+        _cache[(result.version, directed, damping, samples)] = result
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
@@ -0,0 +1,199 @@
+import random
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+import graph_index
+from graph_index import GraphIndex
+
+# 버전별로 보관할 커뮤니티 탐지 결과 수
+_CACHE_SIZE = 8
+
+
+class ComponentIndex:
+    """
+    연결 방향을 무시한 연결 요소를 union-find로 유지합니다.
+
+    연결 추가는 즉시 합치고, 연결 삭제는 기록만 해 두었다가 다음 조회 때 한 번에 다시 계산합니다.
+    같은 두 개념 사이에 다른 연결이 남아 있으면 삭제해도 다시 계산하지 않습니다.
+    """
+
+    def __init__(self, index: Optional[GraphIndex] = None):
+        self.index = index
+        self.parent: Dict[int, int] = {}
+        self.size: Dict[int, int] = {}
+        # 정렬된 개념 쌍 -> 그 쌍을 잇는 연결 수
+        self.pair_count: Dict[Tuple[int, int], int] = {}
+        # 마지막으로 잇는 연결이 삭제된 쌍 (다시 계산 대기)
+        self.removed_pairs: Set[Tuple[int, int]] = set()
+
+    @classmethod
+    def build(cls, index: GraphIndex) -> "ComponentIndex":
+        components = cls(index)
+        for connection_id, edge in index.edges.items():
+            components.add(connection_id, edge)
+        return components
+
+    def find(self, concept_id: int) -> int:
+        parent = self.parent
+        if concept_id not in parent:
+            return concept_id
+        root = concept_id
+        while parent[root] != root:
+            # 경로 절반 압축
+            parent[root] = parent[parent[root]]
+            root = parent[root]
+        return root
+
+    def _union(self, a: int, b: int):
+        for concept_id in (a, b):
+            if concept_id not in self.parent:
+                self.parent[concept_id] = concept_id
+                self.size[concept_id] = 1
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        # 크기가 큰 쪽에 합침
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size.pop(root_b)
+
+    # ------------------------ 인덱스 변경 반영 ------------------------
+    def add(self, connection_id: int, edge: Tuple):
+        source_id, target_id = edge[0], edge[1]
+        pair = (min(source_id, target_id), max(source_id, target_id))
+        self.pair_count[pair] = self.pair_count.get(pair, 0) + 1
+        self.removed_pairs.discard(pair)
+        self._union(source_id, target_id)
+
+    def remove(self, connection_id: int, edge: Tuple):
+        source_id, target_id = edge[0], edge[1]
+        pair = (min(source_id, target_id), max(source_id, target_id))
+        count = self.pair_count.get(pair, 0) - 1
+        if count > 0:
+            self.pair_count[pair] = count
+            return
+        self.pair_count.pop(pair, None)
+        self.removed_pairs.add(pair)
+
+    def _rebuild(self):
+        self.parent.clear()
+        self.size.clear()
+        for source_id, target_id in self.pair_count:
+            self._union(source_id, target_id)
+        self.removed_pairs.clear()
+
+    # ------------------------ 조회 ------------------------
+    def components(self) -> List[List[int]]:
+        """
+        연결 요소별 개념 ID 목록을 크기가 큰 순서로 반환합니다. 연결이 없는 개념은 단독 요소입니다.
+        """
+        if self.removed_pairs:
+            self._rebuild()
+        groups: Dict[int, List[int]] = {}
+        for concept_id in self.index.nodes:
+            groups.setdefault(self.find(concept_id), []).append(concept_id)
+        return _sorted_groups(groups.values())
+
+
+def _sorted_groups(groups) -> List[List[int]]:
+    groups = [sorted(group) for group in groups]
+    groups.sort(key=lambda group: (-len(group), group[0]))
+    return groups
+
+
+def label_propagation(index: GraphIndex, max_iter: int = 20, seed: int = 0) -> Tuple[int, List[List[int]]]:
+    """
+    strength를 가중치로 하는 레이블 전파로 밀접하게 연결된 개념 묶음을 찾습니다.
+
+    각 개념은 이웃들의 레이블 중 가중치 합이 가장 큰 레이블을 따르며,
+    더 이상 바뀌는 레이블이 없거나 max_iter에 도달하면 멈춥니다. 동점이면 작은 레이블을 고릅니다.
+    (계산에 사용한 그래프 version, 개념 ID 묶음 목록)을 반환합니다.
+    """
+    with index.lock:
+        version = index.version
+        compact = index.compact()
+    n = len(compact.node_ids)
+    neighbors: List[Dict[int, float]] = [{} for _ in range(n)]
+    for node in range(n):
+        for neighbor, strength, _ in compact.out_adj[node]:
+            if neighbor == node or strength <= 0:
+                continue
+            neighbors[node][neighbor] = neighbors[node].get(neighbor, 0.0) + strength
+            neighbors[neighbor][node] = neighbors[neighbor].get(node, 0.0) + strength
+
+    labels = list(range(n))
+    order = list(range(n))
+    rng = random.Random(seed)
+    for _ in range(max_iter):
+        rng.shuffle(order)
+        changed = False
+        for node in order:
+            if not neighbors[node]:
+                continue
+            weights: Dict[int, float] = {}
+            for neighbor, weight in neighbors[node].items():
+                weights[labels[neighbor]] = weights.get(labels[neighbor], 0.0) + weight
+            best = max(weights.values())
+            # 현재 레이블이 최대 가중치 중 하나이면 유지해 진동을 막음
+            if weights.get(labels[node]) == best:
+                continue
+            labels[node] = min(label for label, weight in weights.items() if weight == best)
+            changed = True
+        if not changed:
+            break
+
+    groups: Dict[int, List[int]] = {}
+    for node, label in enumerate(labels):
+        groups.setdefault(label, []).append(compact.node_ids[node])
+    return version, _sorted_groups(groups.values())
+
+
+# 프로세스 단위 연결 요소 인덱스와 버전별 커뮤니티 캐시
+_lock = threading.Lock()
+_components: Optional[ComponentIndex] = None
+_communities: "OrderedDict[int, List[List[int]]]" = OrderedDict()
+
+
+def _on_graph_change(index: GraphIndex, kind: str, connection_id: int, edge: Tuple):
+    with _lock:
+        if _components is None or _components.index is not index:
+            return
+        if kind == "added":
+            _components.add(connection_id, edge)
+        elif kind == "removed":
+            _components.remove(connection_id, edge)
+
+
+graph_index.add_listener(_on_graph_change)
+
+
+def get_components(index: GraphIndex) -> List[List[int]]:
+    """
+    현재 인덱스의 연결 요소를 반환합니다. 인덱스가 새로 구성된 경우에만 처음부터 만듭니다.
+    """
+    global _components
+    with index.lock, _lock:
+        if _components is None or _components.index is not index:
+            _components = ComponentIndex.build(index)
+        return _components.components()
+
+
+def get_communities(index: GraphIndex) -> List[List[int]]:
+    """
+    그래프 version별로 캐시된 커뮤니티 탐지 결과를 반환합니다.
+    """
+    with _lock:
+        result = _communities.get(index.version)
+        if result is not None:
+            _communities.move_to_end(index.version)
+            return result
+
+    version, result = label_propagation(index)
+
+    with _lock:
+        _communities[version] = result
+        while len(_communities) > _CACHE_SIZE:
+            _communities.popitem(last=False)
+    return result
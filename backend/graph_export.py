@@ -0,0 +1,150 @@
+import json
+from typing import Iterator
+from xml.sax.saxutils import escape
+
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from sqlalchemy.engine import Connection, Engine
+
+import models
+
+# 한 번에 읽어 내보낼 행 수
+CHUNK_SIZE = 1000
+
+# 형식 -> (미디어 타입, 파일 확장자)
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "graphml": ("application/graphml+xml", "graphml"),
+    "edgelist": ("text/tab-separated-values", "tsv"),
+}
+
+_CONCEPT_COLUMNS = (models.Concept.id, models.Concept.name, models.Concept.description, models.Concept.created_at)
+_CONNECTION_COLUMNS = (
+    models.Connection.id,
+    models.Connection.source_id,
+    models.Connection.target_id,
+    models.Connection.relation,
+    models.Connection.strength,
+    models.Connection.created_at,
+)
+
+
+def _chunks(connection: Connection, model, columns, chunk_size: int = CHUNK_SIZE, statement=None):
+    """
+    테이블을 ID 순서로 chunk_size 행씩 읽습니다. 결과 전체를 메모리에 올리지 않습니다.
+    """
+    statement = select(*columns) if statement is None else statement
+    statement = statement.order_by(model.id).execution_options(yield_per=chunk_size)
+    return connection.execute(statement).partitions()
+
+
+def _connections(with_names: bool = False):
+    # 모든 형식이 두 끝점 개념이 있는 연결만 내보냄. 삭제된 개념을 가리키던 연결(끝점이 비어 있음)은
+    # 그래프 인덱스와 같이 제외해 내보낸 노드 목록에 없는 끝점이 생기지 않게 함.
+    # NDJSON은 가져올 DB에서 개념 ID가 새로 매겨지므로 끝점을 유일한 개념 이름으로도 내보냄
+    source, target = aliased(models.Concept), aliased(models.Concept)
+    columns = (*_CONNECTION_COLUMNS, source.name, target.name) if with_names else _CONNECTION_COLUMNS
+    return (
+        select(*columns)
+        .join(source, source.id == models.Connection.source_id)
+        .join(target, target.id == models.Connection.target_id)
+    )
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+# ------------------------ 형식별 직렬화 ------------------------
+def _ndjson(connection: Connection, chunk_size: int) -> Iterator[str]:
+    """
+    bulk_import가 읽을 수 있는 형식의 NDJSON (개념을 먼저, 연결을 나중에).
+    연결은 개념 이름(source, target)으로 끝점을 찾으므로 ID가 다른 빈 DB로도 복원됩니다.
+    """
+    for rows in _chunks(connection, models.Concept, _CONCEPT_COLUMNS, chunk_size=chunk_size):
+        yield "".join(
+            json.dumps({
+                "type": "concept",
+                "id": concept_id,
+                "name": name,
+                "description": description,
+                "created_at": _isoformat(created_at),
+            }, ensure_ascii=False) + "\n"
+            for concept_id, name, description, created_at in rows
+        )
+    statement = _connections(with_names=True)
+    for rows in _chunks(connection, models.Connection, None, chunk_size=chunk_size, statement=statement):
+        yield "".join(
+            json.dumps({
+                "type": "connection",
+                "id": connection_id,
+                "source": source,
+                "target": target,
+                "source_id": source_id,
+                "target_id": target_id,
+                "relation": relation,
+                "strength": strength,
+                "created_at": _isoformat(created_at),
+            }, ensure_ascii=False) + "\n"
+            for connection_id, source_id, target_id, relation, strength, created_at, source, target in rows
+        )
+
+
+def _graphml(connection: Connection, chunk_size: int) -> Iterator[str]:
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+        '  <key id="name" for="node" attr.name="name" attr.type="string"/>\n'
+        '  <key id="description" for="node" attr.name="description" attr.type="string"/>\n'
+        '  <key id="relation" for="edge" attr.name="relation" attr.type="string"/>\n'
+        '  <key id="strength" for="edge" attr.name="strength" attr.type="double"/>\n'
+        '  <graph id="concepts" edgedefault="directed">\n'
+    )
+    for rows in _chunks(connection, models.Concept, _CONCEPT_COLUMNS[:3], chunk_size=chunk_size):
+        parts = []
+        for concept_id, name, description in rows:
+            parts.append(f'    <node id="n{concept_id}">')
+            parts.append(f'<data key="name">{escape(name or "")}</data>')
+            if description:
+                parts.append(f'<data key="description">{escape(description)}</data>')
+            parts.append("</node>\n")
+        yield "".join(parts)
+    for rows in _chunks(connection, models.Connection, None, chunk_size=chunk_size, statement=_connections()):
+        parts = []
+        for connection_id, source_id, target_id, relation, strength, _ in rows:
+            parts.append(f'    <edge id="e{connection_id}" source="n{source_id}" target="n{target_id}">')
+            if relation is not None:
+                parts.append(f'<data key="relation">{escape(relation)}</data>')
+            if strength is not None:
+                parts.append(f'<data key="strength">{strength!r}</data>')
+            parts.append("</edge>\n")
+        yield "".join(parts)
+    yield "  </graph>\n</graphml>\n"
+
+
+def _edgelist(connection: Connection, chunk_size: int) -> Iterator[str]:
+    """
+    탭으로 구분한 "source_id target_id strength" 줄 목록
+    """
+    for rows in _chunks(connection, models.Connection, None, chunk_size=chunk_size, statement=_connections()):
+        yield "".join(
+            f"{source_id}\t{target_id}\t{strength!r}\n" for _, source_id, target_id, _, strength, _ in rows
+        )
+
+
+_WRITERS = {
+    "ndjson": _ndjson,
+    "graphml": _graphml,
+    "edgelist": _edgelist,
+}
+
+
+def export_graph(bind: Engine, format: str = "ndjson", chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    그래프 전체를 지정한 형식으로 조금씩 직렬화합니다.
+    요청 세션과 무관하게 응답 전송이 끝날 때까지 자체 연결을 사용합니다.
+    """
+    with bind.connect() as connection:
+        for text in _WRITERS[format](connection, chunk_size):
+            if text:
+                yield text.encode("utf-8")
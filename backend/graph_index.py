@@ -0,0 +1,447 @@
+import json
+import logging
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+from itertools import chain
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+import models
+
+logger = logging.getLogger(__name__)
+
+# 그래프 인덱스에 영향을 주는 모델
+_GRAPH_MODELS = (models.Concept, models.Connection)
+
+# 이웃 탐색 방향
+DIRECTIONS = ("outgoing", "incoming", "both")
+
+
+class CompactGraph:
+    """
+    개념 ID를 0..n-1 정수 인덱스로 치환한 인접 리스트
+
+    out_adj[i] / in_adj[i]: (이웃 인덱스, strength, 연결 ID) 목록
+    """
+
+    def __init__(self, index: "GraphIndex"):
+        self.node_ids: List[int] = list(index.nodes)
+        self.position: Dict[int, int] = {concept_id: i for i, concept_id in enumerate(self.node_ids)}
+        self.out_adj: List[List[Tuple[int, float, int]]] = [[] for _ in self.node_ids]
+        self.in_adj: List[List[Tuple[int, float, int]]] = [[] for _ in self.node_ids]
+        for connection_id, (source_id, target_id, _, strength) in index.edges.items():
+            source, target = self.position[source_id], self.position[target_id]
+            self.out_adj[source].append((target, strength, connection_id))
+            self.in_adj[target].append((source, strength, connection_id))
+
+
+class GraphIndex:
+    """
+    concepts/connections 테이블을 메모리에 올린 인접 리스트 인덱스
+
+    커밋된 변경은 apply_*/remove_* 메소드로 제자리에서 반영되며, 그때마다 version이 증가합니다.
+    db_version은 인덱스가 반영한 DB 변경 카운터(graph_version) 값입니다.
+    여러 단계에 걸친 읽기는 lock을 잡은 상태에서 수행합니다.
+    """
+
+    def __init__(self, version: int = 0, db_version: Optional[int] = None):
+        self.version = version
+        self.db_version = db_version
+        self.lock = threading.RLock()
+        # 개념 ID -> 개념 이름
+        self.nodes: Dict[int, str] = {}
+        # 연결 ID -> (source_id, target_id, relation, strength), 연결 ID 순서 유지
+        self.edges: Dict[int, Tuple[int, int, Optional[str], float]] = {}
+        self.edge_created: Dict[int, Optional[datetime]] = {}
+        # 개념 ID -> 나가는/들어오는 연결 ID 집합
+        self.out_edges: Dict[int, Set[int]] = {}
+        self.in_edges: Dict[int, Set[int]] = {}
+        self._snapshot: Optional[bytes] = None
+        self._compact: Optional[CompactGraph] = None
+
+    @classmethod
+    def load(cls, db: Session, version: int = 0) -> "GraphIndex":
+        """
+        DB에서 전체 노드와 엣지를 읽어 인덱스를 구성합니다.
+        ORM 객체 대신 필요한 컬럼만 튜플로 조회합니다.
+        """
+        # 읽는 도중 바뀐 내용이 섞여도 다음 조회에서 카운터가 달라 다시 구성되도록 카운터를 먼저 읽음
+        index = cls(version, read_db_version(db))
+        for concept_id, name in db.query(models.Concept.id, models.Concept.name):
+            index._add_node(concept_id, name)
+
+        rows = db.query(
+            models.Connection.id,
+            models.Connection.source_id,
+            models.Connection.target_id,
+            models.Connection.relation,
+            models.Connection.strength,
+            models.Connection.created_at,
+        ).order_by(models.Connection.id)
+        for connection_id, source_id, target_id, relation, strength, created_at in rows:
+            index._add_edge(connection_id, source_id, target_id, relation, strength, created_at)
+        return index
+
+    def _add_node(self, concept_id: int, name: str):
+        self.nodes[concept_id] = name
+        self.out_edges.setdefault(concept_id, set())
+        self.in_edges.setdefault(concept_id, set())
+
+    def _add_edge(self, connection_id: int, source_id: int, target_id: int,
+                  relation: Optional[str], strength: Optional[float],
+                  created_at: Optional[datetime] = None):
+        # 삭제된 개념을 가리키는 연결은 그래프에서 제외
+        if source_id not in self.nodes or target_id not in self.nodes:
+            return
+        self.edges[connection_id] = (
+            source_id, target_id, relation, 1.0 if strength is None else strength
+        )
+        self.edge_created[connection_id] = created_at
+        self.out_edges[source_id].add(connection_id)
+        self.in_edges[target_id].add(connection_id)
+
+    def _remove_edge(self, connection_id: int):
+        edge = self.edges.pop(connection_id, None)
+        if edge is None:
+            return
+        del self.edge_created[connection_id]
+        self.out_edges[edge[0]].discard(connection_id)
+        self.in_edges[edge[1]].discard(connection_id)
+
+    def _changed(self):
+        self.version += 1
+        self._snapshot = None
+        self._compact = None
+
+    def _notify(self, kind: str, connection_id: int, edge: Tuple):
+        # 리스너 오류가 커밋 후처리를 깨뜨리지 않도록 격리
+        for listener in _listeners:
+            try:
+                listener(self, kind, connection_id, edge)
+            except Exception:
+                logger.exception("그래프 인덱스 리스너 오류")
+
+    # ------------------------ 증분 반영 ------------------------
+    def apply_concept(self, concept_id: int, name: str):
+        with self.lock:
+            if self.nodes.get(concept_id) == name:
+                return
+            self._add_node(concept_id, name)
+            self._changed()
+
+    def remove_concept(self, concept_id: int):
+        with self.lock:
+            if concept_id not in self.nodes:
+                return
+            for connection_id in self.out_edges[concept_id] | self.in_edges[concept_id]:
+                self._notify("removed", connection_id, self.edges[connection_id])
+                self._remove_edge(connection_id)
+            del self.nodes[concept_id]
+            del self.out_edges[concept_id]
+            del self.in_edges[concept_id]
+            self._notify("concept_removed", concept_id, None)
+            self._changed()
+
+    def apply_connection(self, connection_id: int, source_id: int, target_id: int,
+                         relation: Optional[str], strength: Optional[float],
+                         created_at: Optional[datetime] = None):
+        strength = 1.0 if strength is None else strength
+        with self.lock:
+            existing = self.edges.get(connection_id)
+            if existing == (source_id, target_id, relation, strength):
+                return
+            if existing is not None:
+                self._notify("removed", connection_id, existing)
+            if existing is not None and existing[:2] == (source_id, target_id):
+                # 끝점이 같으면 순서를 유지한 채 값만 교체
+                self.edges[connection_id] = (source_id, target_id, relation, strength)
+            else:
+                if existing is not None:
+                    created_at = created_at or self.edge_created[connection_id]
+                    self._remove_edge(connection_id)
+                self._add_edge(connection_id, source_id, target_id, relation, strength, created_at)
+            if connection_id in self.edges:
+                self._notify("added", connection_id, self.edges[connection_id])
+            self._changed()
+
+    def remove_connection(self, connection_id: int):
+        with self.lock:
+            if connection_id not in self.edges:
+                return
+            self._notify("removed", connection_id, self.edges[connection_id])
+            self._remove_edge(connection_id)
+            self._changed()
+
+    # ------------------------ 조회 ------------------------
+    def edge_dict(self, connection_id: int) -> Dict:
+        source_id, target_id, relation, strength = self.edges[connection_id]
+        return {
+            "id": connection_id,
+            "source_id": source_id,
+            "target_id": target_id,
+            "relation": relation,
+            "strength": strength,
+            "created_at": self.edge_created[connection_id],
+        }
+
+    def neighborhood(
+        self,
+        concept_id: int,
+        depth: int = 1,
+        direction: str = "both",
+        relations: Optional[Iterable[str]] = None,
+        min_strength: Optional[float] = None,
+        max_nodes: Optional[int] = None,
+    ) -> Tuple[Dict[int, int], List[int], bool]:
+        """
+        개념에서 depth 홉 이내의 이웃 서브그래프를 BFS로 구합니다.
+
+        Returns:
+            (개념 ID -> 홉 수, 서브그래프에 포함된 연결 ID 목록, 노드 상한으로 잘렸는지 여부)
+        """
+        relations = set(relations) if relations else None
+        adjacency = []
+        if direction in ("outgoing", "both"):
+            adjacency.append((self.out_edges, 1))
+        if direction in ("incoming", "both"):
+            adjacency.append((self.in_edges, 0))
+
+        depths = {concept_id: 0}
+        edge_ids: Set[int] = set()
+        truncated = False
+        frontier = deque([concept_id])
+
+        with self.lock:
+            while frontier:
+                current = frontier.popleft()
+                current_depth = depths[current]
+                for edge_map, end in adjacency:
+                    for connection_id in edge_map[current]:
+                        edge = self.edges[connection_id]
+                        if relations is not None and edge[2] not in relations:
+                            continue
+                        if min_strength is not None and edge[3] < min_strength:
+                            continue
+                        neighbor = edge[end]
+                        if neighbor not in depths:
+                            if current_depth >= depth:
+                                continue
+                            if max_nodes is not None and len(depths) >= max_nodes:
+                                truncated = True
+                                continue
+                            depths[neighbor] = current_depth + 1
+                            frontier.append(neighbor)
+                        edge_ids.add(connection_id)
+
+        return depths, sorted(edge_ids), truncated
+
+    def compact(self) -> CompactGraph:
+        """
+        정수 인덱스 기반 인접 리스트를 반환합니다. 결과는 인덱스가 바뀔 때까지 재사용됩니다.
+        """
+        with self.lock:
+            if self._compact is None:
+                self._compact = CompactGraph(self)
+            return self._compact
+
+    def snapshot_json(self) -> bytes:
+        """
+        전체 그래프를 압축된 JSON으로 직렬화합니다. 결과는 인덱스가 바뀔 때까지 재사용됩니다.
+
+        nodes: [id, name], edges: [id, source_id, target_id, relation, strength]
+        """
+        with self.lock:
+            if self._snapshot is None:
+                payload = {
+                    "version": self.version,
+                    "nodes": [[concept_id, name] for concept_id, name in self.nodes.items()],
+                    "edges": [
+                        [connection_id, source_id, target_id, relation, strength]
+                        for connection_id, (source_id, target_id, relation, strength) in self.edges.items()
+                    ],
+                }
+                self._snapshot = json.dumps(
+                    payload, ensure_ascii=False, separators=(",", ":")
+                ).encode("utf-8")
+            return self._snapshot
+
+
+# 그래프 변경 리스너: listener(index, "added" | "removed", connection_id, edge)
+# 개념이 삭제되면 연결들의 "removed" 뒤에 listener(index, "concept_removed", concept_id, None)
+_listeners: List[Callable[[GraphIndex, str, int, Tuple], None]] = []
+
+# 프로세스 단위 인덱스 캐시
+_lock = threading.Lock()
+_index: Optional[GraphIndex] = None
+_generation = 0
+_last_version = 0
+
+# 프로세스마다 다른 값. 재시작 후의 version과 ETag가 겹치지 않도록 사용
+EPOCH = uuid.uuid4().hex[:8]
+
+
+def invalidate():
+    """
+    캐시된 인덱스를 폐기합니다. 다음 조회 시 DB에서 다시 구성됩니다.
+    개별 변경을 알 수 없는 벌크 구문 이후에만 사용합니다.
+    """
+    global _index, _generation, _last_version
+    with _lock:
+        if _index is not None:
+            _last_version = max(_last_version, _index.version)
+        _index = None
+        _generation += 1
+
+
+def read_db_version(db) -> Optional[int]:
+    """
+    DB의 그래프 변경 카운터를 읽습니다. 카운터 행이 없으면 None입니다.
+    """
+    return db.execute(select(models.GraphVersion.version)).scalar()
+
+
+def get_graph_index(db: Session) -> GraphIndex:
+    """
+    캐시된 그래프 인덱스를 반환하고, 없으면 DB에서 구성합니다.
+    DB 변경 카운터가 인덱스가 반영한 값과 다르면 (다른 워커, 가져오기 도구, 직접 실행한 SQL의 변경)
+    캐시를 버리고 다시 구성합니다.
+    """
+    global _index, _generation, _last_version
+    db_version = read_db_version(db)
+    index = _index
+    if index is not None and index.db_version == db_version:
+        return index
+
+    with _lock:
+        if _index is not None:
+            if _index.db_version == db_version:
+                return _index
+            _last_version = max(_last_version, _index.version)
+            _index = None
+            _generation += 1
+        generation = _generation
+        _last_version += 1
+        version = _last_version
+
+    index = GraphIndex.load(db, version)
+
+    with _lock:
+        # 구성 중에 테이블이 변경되었다면 캐시에 저장하지 않음
+        if generation == _generation:
+            _index = index
+    return index
+
+
+def add_listener(listener: Callable[[GraphIndex, str, int, Tuple], None]):
+    """
+    캐시된 인덱스에 연결이 추가/삭제되거나 개념이 삭제될 때마다 호출될 함수를 등록합니다.
+    호출은 인덱스 lock을 잡은 상태에서 이루어집니다. 인덱스가 새로 구성되면 호출되지 않으므로,
+    리스너는 자신이 따라가는 인덱스 객체와 다른 인덱스를 받으면 스스로 다시 구성해야 합니다.
+    """
+    _listeners.append(listener)
+
+
+def current_version() -> Optional[int]:
+    """
+    현재 캐시된 그래프의 version을 반환합니다. 다른 계층의 캐시 키로 사용합니다.
+    """
+    index = _index
+    return None if index is None else index.version
+
+
+# ------------------------ 변경 추적 ------------------------
+def lock_graph_version(session: Session):
+    """
+    그래프 변경 카운터 행을 잠그고 기준 값을 기록합니다 (트랜잭션마다 한 번, SQLite 쓰기 잠금, PostgreSQL 행 잠금).
+    커밋까지 다른 쓰기가 끼어들 수 없으므로, 기준 값이 인덱스의 값과 같으면 커밋 시 이 세션의 변경만 반영하면 됩니다.
+    첫 그래프 변경 flush 전에 자동으로 호출되며, 세이브포인트보다 먼저 바깥 트랜잭션을 시작할 때도 사용합니다.
+    """
+    if "graph_base_version" in session.info:
+        return
+    table = models.GraphVersion.__table__
+    connection = session.connection()
+    connection.execute(update(table).values(version=table.c.version))
+    session.info["graph_base_version"] = connection.execute(select(table.c.version)).scalar()
+
+
+@event.listens_for(Session, "before_flush")
+def _lock_before_graph_flush(session, flush_context, instances):
+    if any(isinstance(obj, _GRAPH_MODELS) for obj in chain(session.new, session.dirty, session.deleted)):
+        lock_graph_version(session)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_graph_changes(session, flush_context):
+    # 커밋 후에는 속성이 만료되므로 flush 시점의 값을 기록
+    changes = session.info.setdefault("graph_changes", [])
+    pending = list(chain(session.new, session.dirty))
+    for obj in pending:
+        if isinstance(obj, models.Concept):
+            changes.append(("concept", obj.id, obj.name))
+    for obj in pending:
+        if isinstance(obj, models.Connection):
+            changes.append((
+                "connection", obj.id, obj.source_id, obj.target_id,
+                obj.relation, obj.strength, obj.created_at,
+            ))
+    for obj in session.deleted:
+        if isinstance(obj, models.Connection):
+            changes.append(("connection_deleted", obj.id))
+    for obj in session.deleted:
+        if isinstance(obj, models.Concept):
+            changes.append(("concept_deleted", obj.id))
+    if "graph_base_version" in session.info:
+        # 트리거가 올린 뒤의 카운터 (커밋 후 인덱스의 db_version이 됨)
+        session.info["graph_db_version"] = read_db_version(session.connection())
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_graph_changes(orm_execute_state):
+    # query.update()/delete() 같은 벌크 구문은 개별 행을 알 수 없으므로 전체 재구성
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, _GRAPH_MODELS):
+        orm_execute_state.session.info.setdefault("graph_changes", []).append(("reload",))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_on_commit(session):
+    changes = session.info.pop("graph_changes", None)
+    base_version = session.info.pop("graph_base_version", None)
+    db_version = session.info.pop("graph_db_version", None)
+    if not changes:
+        return
+
+    index = _index
+    # 인덱스를 구성하는 중이었거나, 인덱스가 이 트랜잭션 이전의 다른 변경을 모르면 다시 구성
+    if (
+        index is None
+        or base_version is None
+        or index.db_version != base_version
+        or any(change[0] == "reload" for change in changes)
+    ):
+        invalidate()
+        return
+
+    with index.lock:
+        for kind, *values in changes:
+            if kind == "concept":
+                index.apply_concept(*values)
+            elif kind == "connection":
+                index.apply_connection(*values)
+            elif kind == "connection_deleted":
+                index.remove_connection(*values)
+            elif kind == "concept_deleted":
+                index.remove_concept(*values)
+        index.db_version = db_version
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    for key in ("graph_changes", "graph_base_version", "graph_db_version"):
+        session.info.pop(key, None)
@@ -0,0 +1,131 @@
+import heapq
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from graph_index import CompactGraph
+
+# 경로: (총 비용, 노드 인덱스 목록, 연결 ID 목록)
+Path = Tuple[float, List[int], List[int]]
+
+
+def edge_cost(strength: float) -> Optional[float]:
+    """
+    연결 강도를 경로 비용으로 변환합니다. 강한 연결일수록 비용이 낮습니다.
+    강도가 0 이하인 연결은 경로에 사용하지 않습니다.
+    """
+    if strength <= 0:
+        return None
+    return 1.0 / strength
+
+
+def _dijkstra(
+    graph: CompactGraph,
+    source: int,
+    target: int,
+    directed: bool = True,
+    max_cost: Optional[float] = None,
+    banned_nodes: FrozenSet[int] = frozenset(),
+    banned_edges: FrozenSet[int] = frozenset(),
+) -> Optional[Path]:
+    """
+    source에서 target까지의 최소 비용 경로를 찾습니다.
+    target이 확정되거나 max_cost를 넘으면 즉시 탐색을 멈춥니다.
+    """
+    dist: Dict[int, float] = {source: 0.0}
+    prev: Dict[int, Tuple[int, int]] = {}
+    heap = [(0.0, source)]
+    done = set()
+
+    while heap:
+        cost, node = heapq.heappop(heap)
+        if node in done:
+            continue
+        if node == target:
+            nodes, edges = [target], []
+            while node != source:
+                node, connection_id = prev[node]
+                nodes.append(node)
+                edges.append(connection_id)
+            nodes.reverse()
+            edges.reverse()
+            return cost, nodes, edges
+        done.add(node)
+
+        neighbors = graph.out_adj[node] if directed else graph.out_adj[node] + graph.in_adj[node]
+        for neighbor, strength, connection_id in neighbors:
+            if neighbor in done or neighbor in banned_nodes or connection_id in banned_edges:
+                continue
+            step = edge_cost(strength)
+            if step is None:
+                continue
+            new_cost = cost + step
+            if max_cost is not None and new_cost > max_cost:
+                continue
+            if new_cost < dist.get(neighbor, float("inf")):
+                dist[neighbor] = new_cost
+                prev[neighbor] = (node, connection_id)
+                heapq.heappush(heap, (new_cost, neighbor))
+    return None
+
+
+def shortest_paths(
+    graph: CompactGraph,
+    edges: Dict[int, Tuple[int, int, Optional[str], float]],
+    source: int,
+    target: int,
+    k: int = 1,
+    directed: bool = True,
+    max_cost: Optional[float] = None,
+) -> List[Path]:
+    """
+    비용이 낮은 순서대로 최대 k개의 단순 경로를 반환합니다 (Yen 알고리즘).
+
+    Args:
+        graph: 정수 인덱스 인접 리스트
+        edges: 연결 ID -> (source_id, target_id, relation, strength)
+        source, target: 노드 인덱스
+    """
+    first = _dijkstra(graph, source, target, directed, max_cost)
+    if first is None:
+        return []
+
+    paths = [first]
+    seen = {tuple(first[1])}
+    candidates: List[Tuple[float, List[int], List[int]]] = []
+
+    while len(paths) < k:
+        _, last_nodes, last_edges = paths[-1]
+        for i in range(len(last_nodes) - 1):
+            spur_node = last_nodes[i]
+            root_nodes = last_nodes[:i + 1]
+            root_edges = last_edges[:i]
+            root_cost = sum(edge_cost(edges[connection_id][3]) for connection_id in root_edges)
+
+            # 같은 루트를 공유하는 기존 경로의 다음 연결은 사용하지 않음
+            banned_edges = frozenset(
+                path_edges[i] for _, path_nodes, path_edges in paths
+                if len(path_edges) > i and path_nodes[:i + 1] == root_nodes
+            )
+            spur = _dijkstra(
+                graph,
+                spur_node,
+                target,
+                directed,
+                None if max_cost is None else max_cost - root_cost,
+                banned_nodes=frozenset(root_nodes[:-1]),
+                banned_edges=banned_edges,
+            )
+            if spur is None:
+                continue
+
+            spur_cost, spur_nodes, spur_edges = spur
+            nodes = root_nodes[:-1] + spur_nodes
+            if tuple(nodes) in seen:
+                continue
+            seen.add(tuple(nodes))
+            heapq.heappush(candidates, (root_cost + spur_cost, nodes, root_edges + spur_edges))
+
+        if not candidates:
+            break
+        paths.append(heapq.heappop(candidates))
+
+    return paths
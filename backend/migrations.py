@@ -0,0 +1,183 @@
+import logging
+from typing import Callable, List, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection, Engine
+
+import models
+import note_storage
+import scheduling
+
+logger = logging.getLogger(__name__)
+
+# (버전, 설명, 적용 함수) 목록. 스키마 버전은 SQLite PRAGMA user_version에 기록합니다.
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = []
+
+
+def migration(version: int, description: str):
+    def register(apply: Callable[[Connection], None]):
+        MIGRATIONS.append((version, description, apply))
+        MIGRATIONS.sort(key=lambda item: item[0])
+        return apply
+    return register
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def current_version(connection: Connection) -> int:
+    return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def _set_version(connection: Connection, version: int):
+    connection.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+
+
+# ------------------------ 마이그레이션 ------------------------
+@migration(1, "자주 필터링하는 컬럼 인덱스와 연결 중복 금지 제약 추가")
+def _add_filter_indexes(connection: Connection):
+    # 유니크 인덱스를 만들기 전에 중복 연결 정리 (가장 먼저 만든 연결 유지)
+    connection.exec_driver_sql(
+        "DELETE FROM connections WHERE id NOT IN "
+        "(SELECT MIN(id) FROM connections GROUP BY source_id, target_id)"
+    )
+    for statement in (
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_connections_source_target ON connections (source_id, target_id)",
+        "CREATE INDEX IF NOT EXISTS ix_connections_target_id ON connections (target_id)",
+        "CREATE INDEX IF NOT EXISTS ix_cards_concept_id ON cards (concept_id)",
+        "CREATE INDEX IF NOT EXISTS ix_reviews_card_id ON reviews (card_id)",
+        "CREATE INDEX IF NOT EXISTS ix_reviews_next_review_date ON reviews (next_review_date)",
+        "CREATE INDEX IF NOT EXISTS ix_notes_concept_id ON notes (concept_id)",
+        "CREATE INDEX IF NOT EXISTS ix_learning_history_concept_id_created_at "
+        "ON learning_history (concept_id, created_at)",
+    ):
+        connection.exec_driver_sql(statement)
+
+
+@migration(2, "개념/카드/노트 전문 검색(FTS5) 인덱스 추가")
+def _add_search_indexes(connection: Connection):
+    # 노트 색인은 본문 압축 컬럼을 추가하는 마이그레이션 3에서 만듦
+    if connection.dialect.name == "sqlite":
+        models.create_search_indexes(connection, rebuild=True, tables=["concepts", "cards"])
+
+
+# 기존 노트를 압축 형식으로 옮길 때 한 번에 읽을 행 수
+NOTE_BACKFILL_BATCH = 500
+
+
+@migration(3, "노트 본문 압축 저장과 목록 미리보기 컬럼 추가")
+def _compress_note_content(connection: Connection):
+    existing = {column["name"] for column in inspect(connection).get_columns(models.Note.__tablename__)}
+    for name, ddl in (
+        ("content_compressed", "BLOB"),
+        ("content_length", "INTEGER DEFAULT 0"),
+        ("preview", "VARCHAR"),
+    ):
+        if name not in existing:
+            connection.exec_driver_sql(f"ALTER TABLE notes ADD COLUMN {name} {ddl}")
+
+    # 압축 노트 본문은 note_text()로 풀어서 색인하도록 노트 검색 색인을 다시 만듦
+    if connection.dialect.name == "sqlite":
+        models.drop_search_indexes(connection, ["notes"])
+
+    last_id = 0
+    while True:
+        rows = connection.exec_driver_sql(
+            "SELECT id, content FROM notes WHERE id > ? AND content_compressed IS NULL ORDER BY id LIMIT ?",
+            (last_id, NOTE_BACKFILL_BATCH),
+        ).fetchall()
+        if not rows:
+            break
+        updates = []
+        for note_id, content in rows:
+            text, compressed, length = note_storage.encode_content(content)
+            updates.append((text, compressed, length, note_storage.make_preview(content), note_id))
+        connection.exec_driver_sql(
+            "UPDATE notes SET content = ?, content_compressed = ?, content_length = ?, preview = ? WHERE id = ?",
+            updates,
+        )
+        last_id = rows[-1][0]
+
+    if connection.dialect.name == "sqlite":
+        models.create_search_indexes(connection, rebuild=True, tables=["notes"])
+
+
+@migration(4, "카드별 스케줄 상태 테이블과 복습 예정일 인덱스 추가")
+def _add_card_schedule(connection: Connection):
+    # 기존 DB는 init_db의 create_all이 빈 테이블을 먼저 만들 수 있으므로 존재 여부를 확인.
+    # 스케줄 재구성은 복습 기록과 스케줄 행에 필요한 컬럼이 모두 추가된 뒤 마이그레이션 6에서 함
+    models.CardSchedule.__table__.create(connection, checkfirst=True)
+
+
+@migration(5, "복습 세션 제출(재시도 구분)과 답변 시각/응답 시간 컬럼 추가")
+def _add_review_sessions(connection: Connection):
+    models.ReviewSession.__table__.create(connection, checkfirst=True)
+    existing = {column["name"] for column in inspect(connection).get_columns(models.Review.__tablename__)}
+    for name, ddl in (
+        ("answered_at", "DATETIME"),
+        ("response_ms", "INTEGER"),
+        ("session_id", "VARCHAR REFERENCES review_sessions (id) ON DELETE SET NULL"),
+    ):
+        if name not in existing:
+            connection.exec_driver_sql(f"ALTER TABLE reviews ADD COLUMN {name} {ddl}")
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_reviews_session_id ON reviews (session_id)")
+
+
+@migration(6, "FSRS 기억 상태 컬럼과 적합된 스케줄러 모델 테이블 추가")
+def _add_memory_model(connection: Connection):
+    models.SchedulerModel.__table__.create(connection, checkfirst=True)
+    existing = {column["name"] for column in inspect(connection).get_columns(models.CardSchedule.__tablename__)}
+    for name in ("stability", "memory_difficulty"):
+        if name not in existing:
+            connection.exec_driver_sql(f"ALTER TABLE card_schedule ADD COLUMN {name} FLOAT")
+    # 복습 기록을 다시 적용해 카드별 SM-2 상태와 기억 상태를 채움
+    scheduling.rebuild_schedules(connection)
+
+
+@migration(7, "그래프 변경 카운터 테이블과 트리거 추가")
+def _add_graph_version(connection: Connection):
+    models.GraphVersion.__table__.create(connection, checkfirst=True)
+    models.create_graph_version(connection)
+
+
+@migration(8, "복습 큐 priority 정렬용 개념 점수 테이블 추가")
+def _add_concept_scores(connection: Connection):
+    models.ConceptScore.__table__.create(connection, checkfirst=True)
+
+
+# ------------------------ 실행 ------------------------
+def upgrade(engine: Engine) -> int:
+    """
+    아직 적용되지 않은 마이그레이션을 버전 순서대로 하나의 트랜잭션에서 적용합니다.
+    """
+    with engine.begin() as connection:
+        version = current_version(connection)
+        for target, description, apply in MIGRATIONS:
+            if target <= version:
+                continue
+            logger.info(f"마이그레이션 {target} 적용: {description}")
+            apply(connection)
+            _set_version(connection, target)
+            version = target
+    return version
+
+
+def init_db(engine: Engine) -> int:
+    """
+    새 DB는 모델 정의대로 테이블을 만들고 최신 버전으로 표시하며,
+    기존 DB는 누락된 테이블을 만든 뒤 마이그레이션을 적용합니다.
+    """
+    # 이미 최신 버전으로 표시된 DB는 PRAGMA 조회 한 번으로 끝냄 (워커마다 create_all을 반복하지 않음).
+    # 따라서 최신 버전 이후 추가되는 테이블은 반드시 마이그레이션으로 만들어야 함
+    with engine.connect() as connection:
+        if MIGRATIONS and current_version(connection) == latest_version():
+            return latest_version()
+
+    is_new = not inspect(engine).has_table(models.Concept.__tablename__)
+    models.Base.metadata.create_all(bind=engine)
+    if is_new:
+        with engine.begin() as connection:
+            _set_version(connection, latest_version())
+        return latest_version()
+    return upgrade(engine)
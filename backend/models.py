@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Boolean, Index, JSON, LargeBinary, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
+import note_storage
 
 class Concept(Base):
     __tablename__ = "concepts"
@@ -20,10 +22,16 @@ class Concept(Base):
 
 class Connection(Base):
     __tablename__ = "connections"
+    # 그래프 인덱스가 flush 시점에 created_at을 읽을 수 있도록 INSERT 시 함께 조회
+    __mapper_args__ = {"eager_defaults": True}
+    # 같은 방향의 중복 연결 금지 (source_id 단독 조회도 이 인덱스를 사용)
+    __table_args__ = (
+        Index("uq_connections_source_target", "source_id", "target_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     source_id = Column(Integer, ForeignKey("concepts.id", ondelete="CASCADE"))
-    target_id = Column(Integer, ForeignKey("concepts.id", ondelete="CASCADE"))
+    target_id = Column(Integer, ForeignKey("concepts.id", ondelete="CASCADE"), index=True)
     relation = Column(String)
     strength = Column(Float, default=1.0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -36,7 +44,7 @@ class Card(Base):
     __tablename__ = "cards"
 
     id = Column(Integer, primary_key=True, index=True)
-    concept_id = Column(Integer, ForeignKey("concepts.id", ondelete="CASCADE"))
+    concept_id = Column(Integer, ForeignKey("concepts.id", ondelete="CASCADE"), index=True)
     question = Column(Text)
     answer = Column(Text)
     explanation = Column(Text, nullable=True)
@@ -46,34 +54,109 @@ class Card(Base):
     # 관계 정의
     concept = relationship("Concept", back_populates="cards")
     reviews = relationship("Review", back_populates="card")
+    # 스케줄 행은 카드 삭제 시 DB의 ON DELETE CASCADE로 함께 삭제
+    schedule = relationship("CardSchedule", back_populates="card", uselist=False, passive_deletes=True)
 
 class Review(Base):
     __tablename__ = "reviews"
 
     id = Column(Integer, primary_key=True, index=True)
-    card_id = Column(Integer, ForeignKey("cards.id", ondelete="CASCADE"))
+    card_id = Column(Integer, ForeignKey("cards.id", ondelete="CASCADE"), index=True)
     difficulty = Column(Integer)  # 1-5 난이도 평가
-    next_review_date = Column(DateTime(timezone=True))
+    next_review_date = Column(DateTime(timezone=True), index=True)
+    # 학습자가 실제로 답한 시각과 응답 시간 (복습 세션으로 제출한 기록)
+    answered_at = Column(DateTime(timezone=True), nullable=True)
+    response_ms = Column(Integer, nullable=True)
+    session_id = Column(String, ForeignKey("review_sessions.id", ondelete="SET NULL"), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # 관계 정의
     card = relationship("Card", back_populates="reviews")
 
+class ReviewSession(Base):
+    """
+    제출된 복습 세션. 클라이언트가 정한 세션 ID로 재시도를 한 번만 반영합니다.
+    """
+    __tablename__ = "review_sessions"
+
+    id = Column(String, primary_key=True)
+    entry_count = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class CardSchedule(Base):
+    """
+    카드별 현재 복습 스케줄 상태 (카드당 한 행). 복습 기록이 바뀔 때 scheduling 모듈이 갱신합니다.
+    """
+    __tablename__ = "card_schedule"
+    # 복습 예정 큐: 예정일 범위를 인덱스 순서로 탐색하고 같은 예정일은 card_id로 이어서 페이지를 나눔
+    __table_args__ = (
+        Index("ix_card_schedule_due", "due_at", "card_id"),
+    )
+
+    card_id = Column(Integer, ForeignKey("cards.id", ondelete="CASCADE"), primary_key=True)
+    ease = Column(Float, default=2.5)
+    interval_days = Column(Integer, default=0)
+    repetitions = Column(Integer, default=0)
+    # 한 번 이상 성공한 뒤 다시 실패한 횟수
+    lapses = Column(Integer, default=0)
+    due_at = Column(DateTime(timezone=True))
+    # 현재 상태를 만든 마지막 복습 기록
+    last_review_id = Column(Integer, ForeignKey("reviews.id", ondelete="SET NULL"))
+    last_reviewed_at = Column(DateTime(timezone=True))
+    # FSRS 기억 상태: 안정성(기억 확률이 목표치로 떨어지기까지의 일수 척도)과 카드 난이도(1-10)
+    stability = Column(Float)
+    memory_difficulty = Column(Float)
+
+    # 관계 정의
+    card = relationship("Card", back_populates="schedule")
+
+class SchedulerModel(Base):
+    """
+    복습 기록으로 적합한 FSRS 기억 모델 파라미터. 가장 최근 행을 사용합니다.
+    """
+    __tablename__ = "scheduler_models"
+
+    id = Column(Integer, primary_key=True, index=True)
+    parameters = Column(JSON)
+    # 적합에 사용한 (첫 복습을 제외한) 복습 기록 수와 적합 전후의 평균 로그 손실
+    review_count = Column(Integer, default=0)
+    loss = Column(Float)
+    default_loss = Column(Float)
+    fitted_at = Column(DateTime(timezone=True), server_default=func.now())
+
 class Note(Base):
     __tablename__ = "notes"
 
     id = Column(Integer, primary_key=True, index=True)
-    concept_id = Column(Integer, ForeignKey("concepts.id", ondelete="CASCADE"))
+    concept_id = Column(Integer, ForeignKey("concepts.id", ondelete="CASCADE"), index=True)
     title = Column(String)
-    content = Column(Text)
+    # 본문은 크기에 따라 content_text(평문) 또는 content_compressed(압축) 중 한 곳에 저장
+    content_text = Column("content", Text)
+    content_compressed = Column(LargeBinary, nullable=True)
+    # 원래 본문의 UTF-8 바이트 수와 목록용 미리보기
+    content_length = Column(Integer, default=0)
+    preview = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # 관계 정의
     concept = relationship("Concept", back_populates="notes")
 
+    @property
+    def content(self):
+        return note_storage.decode_content(self.content_text, self.content_compressed)
+
+    @content.setter
+    def content(self, value):
+        self.content_text, self.content_compressed, self.content_length = note_storage.encode_content(value)
+        self.preview = note_storage.make_preview(value)
+
 class LearningHistory(Base):
     __tablename__ = "learning_history"
+    # 개념별 최근 활동 조회용
+    __table_args__ = (
+        Index("ix_learning_history_concept_id_created_at", "concept_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     concept_id = Column(Integer, ForeignKey("concepts.id", ondelete="CASCADE"))
@@ -82,3 +165,130 @@ class LearningHistory(Base):
 
     # 관계 정의
     concept = relationship("Concept")
+
+class GraphVersion(Base):
+    """
+    개념/연결 테이블의 변경 카운터 (행 하나). 트리거가 행이 바뀔 때마다 version을 올리므로
+    프로세스별 그래프 인덱스가 다른 워커, 가져오기 도구, 직접 실행한 SQL의 변경을 알아차릴 수 있습니다.
+    """
+    __tablename__ = "graph_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class ConceptScore(Base):
+    """
+    그래프 변경 카운터 값(graph_version)별 개념 PageRank. 복습 큐의 priority 정렬이 SQL에서 조인합니다.
+    """
+    __tablename__ = "concept_scores"
+
+    graph_version = Column(Integer, primary_key=True)
+    concept_id = Column(Integer, primary_key=True)
+    score = Column(Float, nullable=False)
+
+# ------------------------ 그래프 변경 카운터 (SQLite 트리거) ------------------------
+# 그래프 인덱스가 사용하는 테이블과 컬럼. 다른 컬럼(개념 설명 등)만 바뀌면 카운터를 올리지 않음
+GRAPH_VERSION_COLUMNS = {
+    "concepts": ("name",),
+    "connections": ("source_id", "target_id", "relation", "strength"),
+}
+
+def create_graph_version(connection):
+    """
+    카운터 행을 만들고, SQLite에서는 개념/연결 변경 시 카운터를 올리는 트리거를 만듭니다.
+    """
+    connection.exec_driver_sql(
+        "INSERT INTO graph_version (id, version) SELECT 1, 0 WHERE NOT EXISTS (SELECT 1 FROM graph_version)"
+    )
+    if connection.dialect.name != "sqlite":
+        return
+    bump = "UPDATE graph_version SET version = version + 1;"
+    for table, columns in GRAPH_VERSION_COLUMNS.items():
+        for statement in (
+            f"CREATE TRIGGER IF NOT EXISTS {table}_graph_version_ai AFTER INSERT ON {table} BEGIN {bump} END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_graph_version_ad AFTER DELETE ON {table} BEGIN {bump} END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_graph_version_au AFTER UPDATE OF {', '.join(columns)} "
+            f"ON {table} BEGIN {bump} END",
+        ):
+            connection.exec_driver_sql(statement)
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_graph_version(target, connection, **kw):
+    create_graph_version(connection)
+
+# ------------------------ 전문 검색 인덱스 (SQLite FTS5) ------------------------
+# 압축 저장된 노트 본문을 SQL에서 읽을 수 있도록 모든 SQLite 연결에 note_text 함수 등록
+@event.listens_for(Engine, "connect")
+def _register_sql_functions(dbapi_connection, connection_record):
+    if hasattr(dbapi_connection, "create_function"):
+        dbapi_connection.create_function("note_text", 2, note_storage.decode_content, deterministic=True)
+
+# 검색 대상: 원본 테이블 -> {색인할 컬럼: 행 값 식}. 식의 {row}는 트리거의 new/old로 바뀝니다.
+# FTS 테이블은 원본(또는 식을 풀어 둔 뷰)을 참조하는 external content 테이블이며
+# 트리거로 원본의 INSERT/UPDATE/DELETE를 따라갑니다.
+SEARCH_INDEXES = {
+    "concepts": {"name": "{row}.name", "description": "{row}.description"},
+    "cards": {"question": "{row}.question", "answer": "{row}.answer", "explanation": "{row}.explanation"},
+    "notes": {"title": "{row}.title", "content": "note_text({row}.content, {row}.content_compressed)"},
+}
+
+def search_table(table: str) -> str:
+    return f"{table}_fts"
+
+def _search_content(table: str, columns) -> str:
+    # 컬럼을 그대로 쓰는 테이블은 원본을, 식이 필요한 테이블은 식을 풀어 둔 뷰를 content로 사용
+    if all(expression == f"{{row}}.{column}" for column, expression in columns.items()):
+        return table
+    return f"{table}_search"
+
+def _search_index_ddl(table: str, columns) -> list:
+    fts = search_table(table)
+    content = _search_content(table, columns)
+    column_list = ", ".join(columns)
+    new_values = ", ".join(expression.format(row="new") for expression in columns.values())
+    old_values = ", ".join(expression.format(row="old") for expression in columns.values())
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});"
+    insert_new = f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values});"
+    statements = []
+    if content != table:
+        view_columns = ", ".join(
+            f"{expression.format(row=table)} AS {column}" for column, expression in columns.items()
+        )
+        statements.append(f"CREATE VIEW IF NOT EXISTS {content} AS SELECT {table}.id AS id, {view_columns} FROM {table}")
+    return statements + [
+        # 2, 3글자 접두어 색인으로 접두어 검색도 인덱스만으로 처리
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({column_list}, content='{content}', "
+        f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN {delete_old} {insert_new} END",
+    ]
+
+def create_search_indexes(connection, rebuild: bool = False, tables=None):
+    """
+    FTS5 테이블과 동기화 트리거를 만듭니다. rebuild이면 원본 테이블의 기존 행으로 색인을 다시 채웁니다.
+    """
+    for table in tables or SEARCH_INDEXES:
+        for statement in _search_index_ddl(table, SEARCH_INDEXES[table]):
+            connection.exec_driver_sql(statement)
+        if rebuild:
+            fts = search_table(table)
+            connection.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+def drop_search_indexes(connection, tables=None):
+    for table in tables or SEARCH_INDEXES:
+        fts = search_table(table)
+        for suffix in ("ai", "ad", "au"):
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {fts}")
+        connection.exec_driver_sql(f"DROP VIEW IF EXISTS {table}_search")
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_search_indexes(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        create_search_indexes(connection)
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_search_indexes(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        drop_search_indexes(connection)
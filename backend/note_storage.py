@@ -0,0 +1,96 @@
+import zlib
+from typing import Iterator, Optional, Tuple
+
+from config import settings
+
+# 압축 본문 앞에 붙이는 코덱 표시 (다른 코덱을 추가해도 기존 행을 구분할 수 있도록)
+ZLIB_CODEC = b"z"
+
+# 스트리밍 시 한 번에 내보낼 바이트 수
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def encode_content(text: Optional[str]) -> Tuple[Optional[str], Optional[bytes], int]:
+    """
+    노트 본문을 저장 형식 (평문, 압축 본문, UTF-8 바이트 수)으로 변환합니다.
+    NOTE_COMPRESSION_THRESHOLD 바이트를 넘고 압축 효과가 있는 본문만 zlib으로 압축합니다.
+    """
+    if text is None:
+        return None, None, 0
+    data = text.encode("utf-8")
+    if len(data) > settings.NOTE_COMPRESSION_THRESHOLD:
+        compressed = ZLIB_CODEC + zlib.compress(data, settings.NOTE_COMPRESSION_LEVEL)
+        if len(compressed) < len(data):
+            return None, compressed, len(data)
+    return text, None, len(data)
+
+
+def _decompress(compressed: bytes) -> bytes:
+    if compressed[:1] != ZLIB_CODEC:
+        raise ValueError("Unknown note compression codec")
+    return zlib.decompress(compressed[1:])
+
+
+def decode_content(text: Optional[str], compressed: Optional[bytes]) -> Optional[str]:
+    """
+    저장 형식의 본문을 원래 문자열로 복원합니다. SQLite 함수 note_text로도 등록됩니다.
+    """
+    if compressed is None:
+        return text
+    return _decompress(compressed).decode("utf-8")
+
+
+def make_preview(text: Optional[str]) -> str:
+    """
+    목록에 표시할 짧은 미리보기 (공백을 한 칸으로 줄인 앞부분)
+    """
+    if not text:
+        return ""
+    # 긴 본문 전체를 나누지 않도록 필요한 만큼만 잘라서 정리
+    length = settings.NOTE_PREVIEW_LENGTH
+    preview = " ".join(text[:length * 2].split())
+    return preview if len(preview) <= length else preview[:length - 1] + "…"
+
+
+def _blocks(text: Optional[str], compressed: Optional[bytes], chunk_size: int) -> Iterator[bytes]:
+    if compressed is None:
+        data = (text or "").encode("utf-8")
+        for offset in range(0, len(data), chunk_size):
+            yield data[offset:offset + chunk_size]
+        return
+
+    if compressed[:1] != ZLIB_CODEC:
+        raise ValueError("Unknown note compression codec")
+    # 출력 크기를 chunk_size로 제한하며 점진적으로 해제 (전체 본문을 메모리에 풀지 않음)
+    decompressor = zlib.decompressobj()
+    pending = compressed[1:]
+    while pending:
+        block = decompressor.decompress(pending, chunk_size)
+        pending = decompressor.unconsumed_tail
+        if block:
+            yield block
+    block = decompressor.flush()
+    if block:
+        yield block
+
+
+def iter_content(
+    text: Optional[str],
+    compressed: Optional[bytes],
+    start: int = 0,
+    end: Optional[int] = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    본문의 UTF-8 바이트 중 [start, end] 구간을 청크 단위로 내보냅니다 (end 포함, None이면 끝까지).
+    """
+    position = 0
+    for block in _blocks(text, compressed, chunk_size):
+        block_start, position = position, position + len(block)
+        if position <= start:
+            continue
+        if end is not None and block_start > end:
+            return
+        low = max(start - block_start, 0)
+        high = len(block) if end is None else min(end + 1 - block_start, len(block))
+        yield block[low:high]
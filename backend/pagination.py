@@ -0,0 +1,48 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence
+
+from fastapi import HTTPException, Response
+
+# 다음 페이지 커서를 담는 응답 헤더 (본문 형식은 기존 목록 그대로 유지)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    정렬 키 값들을 URL에 안전한 불투명 문자열로 인코딩합니다.
+    """
+    payload = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], *types: Callable) -> Optional[List]:
+    """
+    커서를 정렬 키 값 목록으로 디코딩합니다. types는 각 값의 변환 함수입니다 (예: int, datetime.fromisoformat).
+    """
+    if cursor is None:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError
+        return [convert(value) for convert, value in zip(types, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def decode_id_cursor(cursor: Optional[str]) -> Optional[int]:
+    values = decode_cursor(cursor, int)
+    return None if values is None else values[0]
+
+
+def set_next_cursor(response: Response, items: Sequence, limit: int, key: Callable = lambda item: (item.id,)):
+    """
+    페이지가 가득 찼으면 마지막 항목의 정렬 키로 다음 페이지 커서를 헤더에 설정합니다.
+    """
+    if limit > 0 and len(items) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(items[-1]))
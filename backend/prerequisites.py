@@ -0,0 +1,239 @@
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+import graph_index
+from graph_index import GraphIndex
+
+# 선행 관계를 나타내는 relation 값 -> 선행 개념이 연결의 어느 쪽인지
+# "A -[선행 개념]-> B": B를 먼저 학습, "A -[후행 개념]-> B": A를 먼저 학습
+PREREQUISITE_RELATIONS = {
+    "선행 개념": "target",
+    "후행 개념": "source",
+}
+
+
+def prerequisite_edge(edge: Tuple) -> Optional[Tuple[int, int]]:
+    """
+    연결을 (먼저 배울 개념, 나중에 배울 개념) 쌍으로 변환합니다. 선행 관계가 아니면 None.
+    """
+    source_id, target_id, relation, _ = edge
+    side = PREREQUISITE_RELATIONS.get(relation)
+    if side == "target":
+        return target_id, source_id
+    if side == "source":
+        return source_id, target_id
+    return None
+
+
+class PrerequisiteOrder:
+    """
+    선행 관계 서브그래프의 위상 순서를 연결 추가마다 갱신합니다 (Pearce-Kelly 알고리즘).
+
+    순환을 만드는 연결은 순서에 반영하지 않고 blocked에 보관하며,
+    연결이 삭제되면 보관된 연결을 다시 반영해 봅니다.
+    """
+
+    def __init__(self, index: Optional[GraphIndex] = None):
+        self.index = index
+        # 개념 ID -> 위상 순서 상의 위치
+        self.position: Dict[int, int] = {}
+        self._next_position = 0
+        # 반영된 선행 관계: 개념 ID -> {이웃 개념 ID: 연결 수}
+        self.successors: Dict[int, Dict[int, int]] = {}
+        self.predecessors: Dict[int, Dict[int, int]] = {}
+        # 연결 ID -> (선행 개념, 후행 개념)
+        self.accepted: Dict[int, Tuple[int, int]] = {}
+        self.blocked: Dict[int, Tuple[int, int]] = {}
+
+    @classmethod
+    def build(cls, index: GraphIndex) -> "PrerequisiteOrder":
+        order = cls(index)
+        for connection_id, edge in index.edges.items():
+            order.add(connection_id, edge)
+        return order
+
+    def _ensure_node(self, concept_id: int):
+        if concept_id not in self.position:
+            self.position[concept_id] = self._next_position
+            self._next_position += 1
+            self.successors[concept_id] = {}
+            self.predecessors[concept_id] = {}
+
+    def _link(self, before: int, after: int):
+        self.successors[before][after] = self.successors[before].get(after, 0) + 1
+        self.predecessors[after][before] = self.predecessors[after].get(before, 0) + 1
+
+    def _unlink(self, before: int, after: int):
+        for adjacency, key, other in ((self.successors, before, after), (self.predecessors, after, before)):
+            count = adjacency[key][other] - 1
+            if count:
+                adjacency[key][other] = count
+            else:
+                del adjacency[key][other]
+
+    def _try_insert(self, before: int, after: int) -> bool:
+        """
+        before -> after 관계를 반영합니다. 순환이 생기면 반영하지 않고 False를 반환합니다.
+        순서가 어긋난 경우 두 위치 사이에 영향받는 노드만 재배치합니다.
+        """
+        lower, upper = self.position[after], self.position[before]
+        if before == after:
+            return False
+        if lower > upper:
+            self._link(before, after)
+            return True
+
+        # after에서 upper 이하 범위로 전방 탐색
+        forward = self._reach(after, self.successors, lambda p: p <= upper)
+        if before in forward:
+            return False
+        # before에서 lower 이상 범위로 후방 탐색
+        backward = self._reach(before, self.predecessors, lambda p: p >= lower)
+
+        # 후방 집합을 앞에, 전방 집합을 뒤에 두도록 기존 위치들을 재할당
+        backward = sorted(backward, key=self.position.get)
+        forward = sorted(forward, key=self.position.get)
+        slots = sorted(self.position[node] for node in backward + forward)
+        for node, slot in zip(backward + forward, slots):
+            self.position[node] = slot
+
+        self._link(before, after)
+        return True
+
+    def _reach(self, start: int, adjacency: Dict[int, Dict[int, int]], within) -> Set[int]:
+        seen = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for neighbor in adjacency[node]:
+                if neighbor not in seen and within(self.position[neighbor]):
+                    seen.add(neighbor)
+                    stack.append(neighbor)
+        return seen
+
+    # ------------------------ 인덱스 변경 반영 ------------------------
+    def add(self, connection_id: int, edge: Tuple):
+        pair = prerequisite_edge(edge)
+        if pair is None:
+            return
+        before, after = pair
+        self._ensure_node(before)
+        self._ensure_node(after)
+        if self._try_insert(before, after):
+            self.accepted[connection_id] = pair
+        else:
+            self.blocked[connection_id] = pair
+
+    def remove(self, connection_id: int):
+        if connection_id in self.blocked:
+            del self.blocked[connection_id]
+            return
+        pair = self.accepted.pop(connection_id, None)
+        if pair is None:
+            return
+        self._unlink(*pair)
+        # 삭제로 순환이 풀렸을 수 있으므로 보류된 연결을 다시 시도
+        for blocked_id, (before, after) in list(self.blocked.items()):
+            if self._try_insert(before, after):
+                self.accepted[blocked_id] = self.blocked.pop(blocked_id)
+
+    def remove_node(self, concept_id: int):
+        """
+        삭제된 개념을 순서에서 뺍니다. 개념의 연결은 먼저 remove로 빠진 상태입니다.
+        """
+        if concept_id not in self.position:
+            return
+        del self.position[concept_id]
+        for neighbor in self.successors.pop(concept_id):
+            self.predecessors[neighbor].pop(concept_id, None)
+        for neighbor in self.predecessors.pop(concept_id):
+            self.successors[neighbor].pop(concept_id, None)
+
+    # ------------------------ 조회 ------------------------
+    def ancestors(self, concept_id: int) -> Set[int]:
+        """
+        concept_id를 배우기 전에 필요한 모든 선행 개념 (순환으로 보류된 관계 포함)
+        """
+        blocked_predecessors: Dict[int, List[int]] = {}
+        for before, after in self.blocked.values():
+            blocked_predecessors.setdefault(after, []).append(before)
+
+        seen = {concept_id}
+        queue = deque([concept_id])
+        while queue:
+            node = queue.popleft()
+            for before in list(self.predecessors.get(node, ())) + blocked_predecessors.get(node, []):
+                if before not in seen:
+                    seen.add(before)
+                    queue.append(before)
+        seen.discard(concept_id)
+        return seen
+
+    def order(self, concept_ids) -> List[int]:
+        return sorted(concept_ids, key=lambda concept_id: self.position.get(concept_id, -1))
+
+    def cycle(self, connection_id: int) -> List[int]:
+        """
+        보류된 연결이 만드는 순환을 학습 순서 방향의 개념 목록으로 반환합니다.
+        """
+        before, after = self.blocked[connection_id]
+        # after에서 before까지 반영된 관계만으로 가는 경로 + before -> after
+        previous = {after: None}
+        queue = deque([after])
+        while queue and before not in previous:
+            node = queue.popleft()
+            for neighbor in self.successors[node]:
+                if neighbor not in previous:
+                    previous[neighbor] = node
+                    queue.append(neighbor)
+        if before not in previous:
+            return [before, after]
+        path = []
+        node = before
+        while node is not None:
+            path.append(node)
+            node = previous[node]
+        return path[::-1]
+
+    def cycles(self, concept_ids: Optional[Set[int]] = None) -> List[List[int]]:
+        """
+        보류된 연결마다 순환을 구합니다. concept_ids가 주어지면 그 개념들이 포함된 순환만 반환합니다.
+        """
+        result = []
+        for connection_id, (before, after) in self.blocked.items():
+            if concept_ids is not None and before not in concept_ids and after not in concept_ids:
+                continue
+            result.append(self.cycle(connection_id))
+        return result
+
+
+# 프로세스 단위 위상 순서 캐시
+_lock = threading.Lock()
+_order: Optional[PrerequisiteOrder] = None
+
+
+def _on_graph_change(index: GraphIndex, kind: str, connection_id: int, edge: Tuple):
+    with _lock:
+        if _order is None or _order.index is not index:
+            return
+        if kind == "added":
+            _order.add(connection_id, edge)
+        elif kind == "removed":
+            _order.remove(connection_id)
+        elif kind == "concept_removed":
+            _order.remove_node(connection_id)
+
+
+graph_index.add_listener(_on_graph_change)
+
+
+def get_prerequisite_order(index: GraphIndex) -> PrerequisiteOrder:
+    """
+    인덱스를 따라가는 위상 순서를 반환합니다. 인덱스가 새로 구성된 경우에만 처음부터 만듭니다.
+    """
+    global _order
+    with index.lock, _lock:
+        if _order is None or _order.index is not index:
+            _order = PrerequisiteOrder.build(index)
+        return _order
@@ -0,0 +1,171 @@
+"""
+복습 큐: 지금 복습할 카드를 내용과 함께 한 번에 가져옵니다.
+
+정렬 방식
+- overdue: 예정일이 오래 지난 카드부터 (card_schedule 예정일 인덱스 순서)
+- priority: 그래프에서 중요한 개념(PageRank)의 카드부터, 같은 개념 안에서는 overdue 순서.
+  개념 점수는 그래프 변경 카운터(graph_version) 값별로 concept_scores 테이블에 저장해 SQL에서 조인하고,
+  커서에 점수 버전을 담아 다음 배치도 같은 점수로 정렬합니다
+- random: 시드로 고정한 무작위 순서. 여러 개념의 카드가 섞여 나오도록 교차 학습용
+
+다음 배치 커서는 카드별로 변하지 않는 정렬 키를 담으므로, 학습자가 앞 배치를 답하는 동안
+다음 배치를 미리 가져와도 빠지거나 중복되는 카드가 없습니다 (답한 카드는 예정일이 미래로 옮겨져 빠짐).
+"""
+import random
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+import crud
+import graph_index
+import models
+
+QUEUE_ORDERS = ("overdue", "priority", "random")
+
+# random 순서용 곱셈 해시 (card_id * 황금비 상수 mod 2^32)
+SHUFFLE_MULTIPLIER = 2654435761
+SHUFFLE_MODULUS = 2 ** 32
+
+# 보관할 개념 점수 버전 수. 더 오래된 버전을 담은 priority 커서는 만료됨
+SCORE_VERSIONS_KEPT = 8
+
+
+def _queue_select(now: datetime):
+    schedule = models.CardSchedule
+    return (
+        select(
+            schedule.card_id,
+            models.Card.concept_id,
+            models.Concept.name.label("concept_name"),
+            models.Card.question,
+            models.Card.answer,
+            models.Card.explanation,
+            schedule.due_at,
+            schedule.interval_days,
+            schedule.repetitions,
+            schedule.lapses,
+        )
+        .join(models.Card, models.Card.id == schedule.card_id)
+        .outerjoin(models.Concept, models.Concept.id == models.Card.concept_id)
+        .where(schedule.due_at <= now)
+    )
+
+
+def _items(rows, now: datetime) -> List[dict]:
+    return [
+        {
+            "priority": None,
+            **row._asdict(),
+            "overdue_days": (now - row.due_at).total_seconds() / 86400,
+        }
+        for row in rows
+    ]
+
+
+def _shuffle_key(seed: int):
+    return (models.CardSchedule.card_id * SHUFFLE_MULTIPLIER + seed) % SHUFFLE_MODULUS
+
+
+def _has_scores(db: Session, score_version: int) -> bool:
+    scores = models.ConceptScore
+    return db.execute(select(scores.concept_id).where(scores.graph_version == score_version).limit(1)).first() is not None
+
+
+def _store_scores(db: Session) -> int:
+    """
+    현재 그래프의 개념 PageRank를 concept_scores에 저장하고 점수 버전을 반환합니다 (이미 있으면 그대로 사용).
+    """
+    # numpy를 쓰는 분석 모듈은 priority 순서를 처음 요청할 때 임포트 (결과는 그래프 version별로 캐시됨)
+    import graph_analytics
+
+    index = graph_index.get_graph_index(db)
+    score_version = index.db_version
+    if _has_scores(db, score_version):
+        return score_version
+
+    scores = models.ConceptScore
+    priorities = graph_analytics.get_centrality(index).score_by_id("pagerank")
+    if priorities:
+        # 여러 워커가 같은 버전을 동시에 저장해도 충돌하지 않도록 이미 있는 행은 건너뜀
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        db.execute(
+            dialect.insert(scores).on_conflict_do_nothing(),
+            [
+                {"graph_version": score_version, "concept_id": concept_id, "score": score}
+                for concept_id, score in priorities.items()
+            ],
+        )
+    kept = (
+        select(scores.graph_version).distinct()
+        .order_by(scores.graph_version.desc())
+        .limit(SCORE_VERSIONS_KEPT)
+    )
+    db.execute(delete(scores).where(scores.graph_version.not_in(kept)))
+    db.commit()
+    return score_version
+
+
+def get_queue(db: Session, n: int, order: str = "overdue", after: Optional[Sequence] = None):
+    """
+    다음 n개의 복습 카드와 다음 배치 커서 키를 계산하는 함수를 반환합니다.
+    after는 이전 배치 커서를 디코딩한 값입니다 (정렬 방식별 형식은 cursor_types 참고).
+    priority 커서의 점수 버전이 이미 정리되었으면 LookupError를 발생시킵니다.
+    """
+    schedule = models.CardSchedule
+    now = datetime.now()
+
+    if order == "overdue":
+        statement = _queue_select(now)
+        if after is not None:
+            statement = statement.where(
+                tuple_(schedule.due_at, schedule.card_id) > crud._key(after, schedule.due_at, schedule.card_id)
+            )
+        rows = db.execute(statement.order_by(schedule.due_at, schedule.card_id).limit(n)).all()
+        return _items(rows, now), lambda item: (item["due_at"], item["card_id"])
+
+    if order == "random":
+        seed = after[0] if after is not None else random.randrange(SHUFFLE_MODULUS)
+        shuffle_key = _shuffle_key(seed)
+        statement = _queue_select(now).add_columns(shuffle_key.label("shuffle_key"))
+        if after is not None:
+            statement = statement.where(tuple_(shuffle_key, schedule.card_id) > tuple_(after[1], after[2]))
+        rows = db.execute(statement.order_by(shuffle_key, schedule.card_id).limit(n)).all()
+        items = _items(rows, now)
+        for item in items:
+            item.pop("shuffle_key")
+        keys = {row.card_id: row.shuffle_key for row in rows}
+        return items, lambda item: (seed, keys[item["card_id"]], item["card_id"])
+
+    # priority: 저장된 개념 점수를 조인해 정렬과 LIMIT까지 한 번의 쿼리로 처리
+    if after is None:
+        score_version = _store_scores(db)
+    else:
+        score_version = after[0]
+        if not _has_scores(db, score_version):
+            raise LookupError(score_version)
+    scores = models.ConceptScore
+    negated = -func.coalesce(scores.score, 0.0)
+    statement = (
+        _queue_select(now)
+        .add_columns(func.coalesce(scores.score, 0.0).label("priority"))
+        .outerjoin(scores, (scores.graph_version == score_version) & (scores.concept_id == models.Card.concept_id))
+    )
+    if after is not None:
+        statement = statement.where(
+            tuple_(negated, schedule.due_at, schedule.card_id)
+            > crud._key(after[1:], scores.score, schedule.due_at, schedule.card_id)
+        )
+    rows = db.execute(statement.order_by(negated, schedule.due_at, schedule.card_id).limit(n)).all()
+    return _items(rows, now), lambda item: (score_version, -item["priority"], item["due_at"], item["card_id"])
+
+
+def cursor_types(order: str):
+    # 정렬 방식별 커서 값의 변환 함수
+    if order == "overdue":
+        return (datetime.fromisoformat, int)
+    if order == "random":
+        return (int, int, int)
+    return (int, float, datetime.fromisoformat, int)
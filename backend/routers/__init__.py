@@ -1,5 +1,2 @@
 # routers/__init__.py
-# 라우터 모듈 가져오기
-from . import llm
-from . import reviews
-from . import connections
\ No newline at end of file
+# 라우터 모듈은 app.create_app()이 앱을 만들 때 임포트합니다 (패키지 임포트만으로는 불러오지 않음)
@@ -0,0 +1,265 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_async_db
+import models
+import schemas
+import crud
+
+# APIRouter 생성
+router = APIRouter()
+
+# 요청당 최대 작업 수
+MAX_BATCH_OPERATIONS = 1000
+
+BATCH_OPERATIONS = ("create", "update", "delete")
+
+# 엔티티 -> (모델, 생성 스키마, 수정 스키마)
+ENTITIES = {
+    "concept": (models.Concept, schemas.ConceptCreate, schemas.ConceptUpdate),
+    "card": (models.Card, schemas.CardCreate, schemas.CardUpdate),
+    "note": (models.Note, schemas.NoteCreate, schemas.NoteUpdate),
+    "connection": (models.Connection, schemas.ConnectionCreate, schemas.ConnectionUpdate),
+    "review": (models.Review, schemas.ReviewCreate, None),
+}
+
+# 엔티티 -> {외래 키 필드: (관계 속성, 참조 엔티티)}
+REFERENCES = {
+    "card": {"concept_id": ("concept", "concept")},
+    "note": {"concept_id": ("concept", "concept")},
+    "connection": {"source_id": ("source", "concept"), "target_id": ("target", "concept")},
+    "review": {"card_id": ("card", "card")},
+}
+
+
+def _ref_name(value: Any) -> Optional[str]:
+    if isinstance(value, str) and value.startswith("$"):
+        return value[1:]
+    return None
+
+
+class _Plan:
+    """
+    검증을 마친 작업 하나
+    """
+
+    def __init__(self, index: int, operation: schemas.BatchOperation, fields: Dict[str, Any], refs: Dict[str, str]):
+        self.index = index
+        self.operation = operation
+        # 스키마 검증을 거친 필드 (참조 필드는 제외)
+        self.fields = fields
+        # 외래 키 필드 -> 임시 ID
+        self.refs = refs
+        self.instance = None
+
+
+def _fail(index: int, message: str, status_code: int = 400):
+    raise HTTPException(status_code=status_code, detail=f"Operation {index}: {message}")
+
+
+def _validate(index: int, operation: schemas.BatchOperation) -> _Plan:
+    if operation.op not in BATCH_OPERATIONS:
+        _fail(index, f"Operation must be one of {', '.join(BATCH_OPERATIONS)}")
+    if operation.entity not in ENTITIES:
+        _fail(index, f"Entity must be one of {', '.join(ENTITIES)}")
+    _, create_schema, update_schema = ENTITIES[operation.entity]
+
+    if operation.op == "create":
+        data = dict(operation.data)
+        refs = {}
+        for field in REFERENCES.get(operation.entity, {}):
+            name = _ref_name(data.get(field))
+            if name is not None:
+                refs[field] = name
+                # 스키마 검증용 자리 표시 값
+                data[field] = 0
+        try:
+            fields = create_schema(**data).dict()
+        except ValidationError as e:
+            _fail(index, f"Invalid data: {e.errors()[0]['msg']}")
+        for field in refs:
+            del fields[field]
+        return _Plan(index, operation, fields, refs)
+
+    if operation.id is None:
+        _fail(index, "id is required")
+    if isinstance(operation.id, str) and _ref_name(operation.id) is None:
+        _fail(index, "id must be an integer or a \"$ref\"")
+    if operation.op == "update":
+        if update_schema is None:
+            _fail(index, f"{operation.entity} cannot be updated")
+        try:
+            fields = update_schema(**operation.data).dict(exclude_unset=True)
+        except ValidationError as e:
+            _fail(index, f"Invalid data: {e.errors()[0]['msg']}")
+        return _Plan(index, operation, fields, {})
+    return _Plan(index, operation, {}, {})
+
+
+async def _load_existing(db: AsyncSession, plans: List[_Plan]) -> Dict[str, Dict[int, Any]]:
+    """
+    수정/삭제 대상과 외래 키로 참조하는 기존 행을 엔티티별로 한 번씩 조회합니다.
+    """
+    wanted: Dict[str, Set[int]] = {}
+    for plan in plans:
+        operation = plan.operation
+        if operation.op != "create" and isinstance(operation.id, int):
+            wanted.setdefault(operation.entity, set()).add(operation.id)
+        for field, (_, target) in REFERENCES.get(operation.entity, {}).items():
+            if operation.op == "create" and field not in plan.refs:
+                wanted.setdefault(target, set()).add(plan.fields[field])
+
+    existing: Dict[str, Dict[int, Any]] = {}
+    for entity, ids in wanted.items():
+        model = ENTITIES[entity][0]
+        existing[entity] = {}
+        for chunk in crud._chunks(ids):
+            for instance in (await db.execute(select(model).where(model.id.in_(chunk)))).scalars():
+                existing[entity][instance.id] = instance
+    return existing
+
+
+async def _check_uniqueness(db: AsyncSession, plans: List[_Plan]):
+    """
+    개념 이름과 연결 (source_id, target_id) 중복을 요청 전체에 대해 한 번에 검사합니다.
+    """
+    names = {plan.fields["name"]: plan for plan in plans
+             if plan.operation.op == "create" and plan.operation.entity == "concept"}
+    for plan in plans:
+        if plan.operation.op == "update" and plan.operation.entity == "concept" and "name" in plan.fields:
+            names.setdefault(plan.fields["name"], plan)
+    if names:
+        taken = set((await db.execute(
+            select(models.Concept.name).where(models.Concept.name.in_(list(names)))
+        )).scalars())
+        for name in taken:
+            _fail(names[name].index, f"Concept '{name}' already exists")
+
+    pairs = {}
+    for plan in plans:
+        if plan.operation.op == "create" and plan.operation.entity == "connection" and not plan.refs:
+            pairs.setdefault((plan.fields["source_id"], plan.fields["target_id"]), plan)
+    if pairs:
+        existing = await crud.get_existing_connection_pairs(db, pairs)
+        deleted = {plan.operation.id for plan in plans
+                   if plan.operation.op == "delete" and plan.operation.entity == "connection"}
+        for pair, connection_id in existing.items():
+            if connection_id not in deleted:
+                _fail(pairs[pair].index, "Connection already exists")
+
+
+@router.post("", response_model=schemas.BatchResult)
+async def run_batch(batch: schemas.BatchRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    여러 엔티티의 생성/수정/삭제 작업을 하나의 작업 단위로 처리합니다.
+
+    생성 작업에 ref를 지정하면 이후 작업에서 "$ref"로 외래 키나 수정/삭제 대상을 참조할 수 있습니다.
+    모든 변경은 한 번의 flush와 한 번의 커밋으로 반영되며, 하나라도 실패하면 아무것도 반영되지 않습니다.
+    결과에는 항목별 ID만 담기므로 항목마다 다시 조회하지 않습니다.
+    """
+    operations = batch.operations
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_OPERATIONS} operations are allowed per batch")
+
+    plans = [_validate(index, operation) for index, operation in enumerate(operations)]
+    existing = await _load_existing(db, plans)
+    await _check_uniqueness(db, plans)
+
+    # 임시 ID -> (엔티티, ORM 객체)
+    created: Dict[str, Tuple[str, Any]] = {}
+    deleted: Set[int] = set()
+    # 이 요청에서 삭제한 기존 연결 쌍
+    deleted_pairs: Set[Tuple[int, int]] = set()
+    # 같은 요청에서 만드는 개념 이름 / 연결 쌍 (객체 기준)
+    new_names: Set[str] = set()
+    new_pairs: Set[Tuple[int, int]] = set()
+
+    def resolve(index: int, entity: str, value) -> Any:
+        name = _ref_name(value)
+        if name is not None:
+            if name not in created or created[name][0] != entity:
+                _fail(index, f"Unknown {entity} reference '${name}'")
+            instance = created[name][1]
+        else:
+            instance = existing.get(entity, {}).get(value)
+            if instance is None:
+                _fail(index, f"{entity.capitalize()} with id {value} not found", 404)
+        if id(instance) in deleted:
+            _fail(index, f"{entity.capitalize()} {value} was deleted earlier in this batch")
+        return instance
+
+    for plan in plans:
+        operation = plan.operation
+        entity = operation.entity
+        model = ENTITIES[entity][0]
+
+        if operation.op == "create":
+            instance = model(**plan.fields)
+            references = {}
+            for field, (attribute, target) in REFERENCES.get(entity, {}).items():
+                parent = resolve(plan.index, target, f"${plan.refs[field]}" if field in plan.refs else plan.fields[field])
+                references[field] = parent
+                # 새로 만든 부모는 관계로 연결해 flush 시 외래 키가 채워지도록 함
+                setattr(instance, attribute, parent)
+
+            if entity == "concept":
+                if instance.name in new_names:
+                    _fail(plan.index, f"Concept '{instance.name}' already exists")
+                new_names.add(instance.name)
+            elif entity == "connection":
+                pair = (id(references["source_id"]), id(references["target_id"]))
+                if pair[0] == pair[1]:
+                    _fail(plan.index, "Cannot create a connection to itself")
+                if pair in new_pairs:
+                    _fail(plan.index, "Connection already exists")
+                new_pairs.add(pair)
+                # 앞에서 삭제한 쌍을 다시 만들면 삭제가 먼저 반영되도록 flush
+                if (references["source_id"].id, references["target_id"].id) in deleted_pairs:
+                    await db.flush()
+            elif entity == "review" and not 1 <= instance.difficulty <= 5:
+                _fail(plan.index, "Difficulty must be between 1 and 5")
+
+            db.add(instance)
+            if operation.ref is not None:
+                if operation.ref in created:
+                    _fail(plan.index, f"Duplicate ref '{operation.ref}'")
+                created[operation.ref] = (entity, instance)
+            plan.instance = instance
+
+        elif operation.op == "update":
+            instance = resolve(plan.index, entity, operation.id)
+            for key, value in plan.fields.items():
+                setattr(instance, key, value)
+            plan.instance = instance
+
+        else:
+            instance = resolve(plan.index, entity, operation.id)
+            await db.delete(instance)
+            deleted.add(id(instance))
+            if entity == "connection":
+                deleted_pairs.add((instance.source_id, instance.target_id))
+            plan.instance = instance
+
+    try:
+        await db.flush()
+    except IntegrityError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"Batch violates a constraint: {e.orig}")
+
+    results = [
+        {
+            "index": plan.index,
+            "op": plan.operation.op,
+            "entity": plan.operation.entity,
+            "id": plan.instance.id,
+            "ref": plan.operation.ref,
+        }
+        for plan in plans
+    ]
+    await db.commit()
+    return {"results": results}
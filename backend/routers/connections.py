@@ -1,29 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from database import get_db
+from database import get_async_db
+import graph_index
 import models
 import schemas
 import crud
+import pagination
 
 # APIRouter 생성
 router = APIRouter()
 
+# 일괄 처리 작업 종류와 요청당 최대 작업 수
+CONNECTION_OPERATIONS = ("create", "update", "delete")
+MAX_BATCH_OPERATIONS = 1000
+
 @router.post("/", response_model=schemas.Connection)
-def create_connection(
+async def create_connection(
     connection: schemas.ConnectionCreate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     새로운 개념 간 연결을 생성합니다.
     """
     # 소스 개념과 타겟 개념이 존재하는지 확인
-    source_concept = crud.get_concept(db, connection.source_id)
+    source_concept = await crud.get_concept(db, connection.source_id)
     if not source_concept:
         raise HTTPException(status_code=404, detail=f"Source concept with id {connection.source_id} not found")
     
-    target_concept = crud.get_concept(db, connection.target_id)
+    target_concept = await crud.get_concept(db, connection.target_id)
     if not target_concept:
         raise HTTPException(status_code=404, detail=f"Target concept with id {connection.target_id} not found")
     
@@ -32,113 +39,227 @@ def create_connection(
         raise HTTPException(status_code=400, detail="Cannot create a connection to itself")
     
     # 이미 동일한 연결이 존재하는지 확인
-    existing_connection = db.query(models.Connection).filter(
-        models.Connection.source_id == connection.source_id,
-        models.Connection.target_id == connection.target_id
-    ).first()
+    existing_connection = await crud.get_connection_by_pair(db, connection.source_id, connection.target_id)
     
     if existing_connection:
         raise HTTPException(status_code=400, detail="Connection already exists")
     
-    # 연결 생성
-    return crud.create_connection(db=db, connection=connection)
+    # 연결 생성 (동시에 같은 연결이 만들어진 경우 유니크 인덱스가 막음)
+    try:
+        return await crud.create_connection(db=db, connection=connection)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Connection already exists")
+
+@router.post("/batch", response_model=schemas.ConnectionBatchResult)
+async def batch_connections(batch: schemas.ConnectionBatch, db: AsyncSession = Depends(get_async_db)):
+    """
+    연결 생성/수정/삭제 작업 목록을 하나의 트랜잭션으로 처리하고 작업별 결과를 반환합니다.
+    존재 여부와 중복 검사는 작업마다가 아니라 요청 전체에 대해 한 번씩 조회합니다.
+    atomic이 아니면 작업마다 세이브포인트 안에서 반영하므로, 동시에 만들어진 연결과 충돌한 작업만 실패합니다.
+    같은 요청에서 나중에 삭제한 연결의 수정 결과에는 연결을 담지 않습니다.
+    """
+    operations = batch.operations
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_OPERATIONS} operations are allowed per batch")
+
+    creates = [operation for operation in operations if operation.op == "create"]
+    known_concepts = await crud.get_existing_concept_ids(
+        db, {concept_id for operation in creates for concept_id in (operation.source_id, operation.target_id)
+             if concept_id is not None}
+    )
+    pairs = await crud.get_existing_connection_pairs(
+        db, {(operation.source_id, operation.target_id) for operation in creates
+             if operation.source_id is not None and operation.target_id is not None}
+    )
+    connections = await crud.get_connections_by_ids(
+        db, {operation.id for operation in operations if operation.op != "create" and operation.id is not None}
+    )
+
+    if not batch.atomic:
+        # pysqlite는 DML 전에만 BEGIN을 보내므로 카운터 행을 먼저 잠가 세이브포인트를 감쌀 바깥 트랜잭션을 시작
+        await db.run_sync(graph_index.lock_graph_version)
+
+    results = []
+    # 아직 flush되지 않은 삭제 대상 (source_id, target_id)와 이 요청에서 삭제한 연결 ID
+    deleted_pairs = set()
+    deleted_ids = set()
+
+    async def apply(operation):
+        error = None
+        connection = None
+
+        if operation.op == "create":
+            pair = (operation.source_id, operation.target_id)
+            if operation.source_id is None or operation.target_id is None:
+                error = "source_id and target_id are required"
+            elif operation.source_id not in known_concepts:
+                error = f"Source concept with id {operation.source_id} not found"
+            elif operation.target_id not in known_concepts:
+                error = f"Target concept with id {operation.target_id} not found"
+            elif operation.source_id == operation.target_id:
+                error = "Cannot create a connection to itself"
+            elif pair in pairs:
+                error = "Connection already exists"
+            else:
+                # 같은 요청에서 삭제한 연결을 다시 만드는 경우 삭제를 먼저 반영
+                if pair in deleted_pairs:
+                    await db.flush()
+                    deleted_pairs.clear()
+                connection = models.Connection(
+                    source_id=operation.source_id,
+                    target_id=operation.target_id,
+                    relation=operation.relation,
+                    strength=1.0 if operation.strength is None else operation.strength,
+                )
+                db.add(connection)
+                pairs[pair] = None
+
+        elif operation.op in CONNECTION_OPERATIONS:
+            connection = connections.get(operation.id)
+            if connection is None:
+                error = f"Connection with id {operation.id} not found"
+            elif operation.op == "update":
+                for key, value in operation.dict(include={"relation", "strength"}, exclude_unset=True).items():
+                    setattr(connection, key, value)
+            else:
+                await db.delete(connection)
+                del connections[operation.id]
+                deleted_ids.add(operation.id)
+                pair = (connection.source_id, connection.target_id)
+                pairs.pop(pair, None)
+                deleted_pairs.add(pair)
+                connection = None
+
+        else:
+            error = f"Operation must be one of {', '.join(CONNECTION_OPERATIONS)}"
+        return error, connection
+
+    for position, operation in enumerate(operations):
+        if batch.atomic:
+            error, connection = await apply(operation)
+        else:
+            try:
+                async with db.begin_nested():
+                    error, connection = await apply(operation)
+                    await db.flush()
+            except IntegrityError:
+                # 미리 확인한 뒤 다른 요청이 같은 연결을 만든 경우: 이 작업만 되돌림
+                error, connection = "Connection already exists", None
+        results.append((position, operation.op, error, connection))
+
+    failed = sum(1 for _, _, error, _ in results if error is not None)
+    if batch.atomic and failed:
+        await db.rollback()
+        return {
+            "applied": 0,
+            "failed": failed,
+            "results": [
+                {"index": position, "op": op, "success": False, "error": error or "Batch was not applied"}
+                for position, op, error, _ in results
+            ],
+        }
+
+    # ID와 생성 시각을 받아 결과를 만든 뒤 한 번만 커밋 (atomic이 아니면 작업마다 이미 flush됨)
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Connection already exists")
+    # 나중 작업에서 삭제된 연결의 수정 결과는 삭제된 객체를 담지 않음
+    results = [
+        (position, op, error, None if connection is not None and connection.id in deleted_ids else connection)
+        for position, op, error, connection in results
+    ]
+    response = {
+        "applied": len(results) - failed,
+        "failed": failed,
+        "results": [
+            {
+                "index": position,
+                "op": op,
+                "success": error is None,
+                "connection": schemas.Connection.from_orm(connection) if connection is not None and error is None else None,
+                "error": error,
+            }
+            for position, op, error, connection in results
+        ],
+    }
+    await db.commit()
+    return response
 
 @router.get("/", response_model=List[schemas.Connection])
-def read_connections(
+async def read_connections(
+    response: Response,
     source_id: Optional[int] = None,
     target_id: Optional[int] = None,
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     모든 연결을 조회하거나 소스/타겟 개념 ID로 필터링합니다.
     """
-    if source_id and target_id:
-        # 소스와 타겟 ID 모두로 필터링
-        connections = db.query(models.Connection).filter(
-            models.Connection.source_id == source_id,
-            models.Connection.target_id == target_id
-        ).offset(skip).limit(limit).all()
-    elif source_id:
-        # 소스 ID로만 필터링
-        connections = db.query(models.Connection).filter(
-            models.Connection.source_id == source_id
-        ).offset(skip).limit(limit).all()
-    elif target_id:
-        # 타겟 ID로만 필터링
-        connections = db.query(models.Connection).filter(
-            models.Connection.target_id == target_id
-        ).offset(skip).limit(limit).all()
-    else:
-        # 필터 없이 모든 연결 조회
-        connections = crud.get_connections(db, skip=skip, limit=limit)
-    
+    after_id = pagination.decode_id_cursor(cursor)
+    # 목록은 DB에서 바로 조회 (그래프 인덱스 캐시는 이 프로세스의 커밋만 반영하므로
+    # 다른 워커나 일괄 가져오기 도구가 추가한 연결이 빠질 수 있음)
+    connections = await crud.get_connections(db, skip, limit, after_id, source_id=source_id, target_id=target_id)
+    pagination.set_next_cursor(response, connections, limit)
     return connections
 
 @router.get("/{connection_id}", response_model=schemas.Connection)
-def read_connection(connection_id: int, db: Session = Depends(get_db)):
+async def read_connection(connection_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     특정 ID의 연결을 조회합니다.
     """
-    connection = crud.get_connection(db, connection_id)
+    connection = await crud.get_connection(db, connection_id)
     if not connection:
         raise HTTPException(status_code=404, detail=f"Connection with id {connection_id} not found")
     return connection
 
 @router.put("/{connection_id}", response_model=schemas.Connection)
-def update_connection(
+async def update_connection(
     connection_id: int, 
     connection_update: schemas.ConnectionUpdate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     특정 ID의 연결을 업데이트합니다.
     """
     # 연결이 존재하는지 확인
-    connection = crud.get_connection(db, connection_id)
+    connection = await crud.get_connection(db, connection_id)
     if not connection:
         raise HTTPException(status_code=404, detail=f"Connection with id {connection_id} not found")
     
-    # 연결 업데이트
-    updated_connection = db.query(models.Connection).filter(models.Connection.id == connection_id)
-    
-    # 업데이트할 필드 지정
-    update_data = connection_update.dict(exclude_unset=True)
-    
-    # 연결 업데이트
-    updated_connection.update(update_data)
-    db.commit()
-    
-    # 업데이트된 연결 반환
-    return crud.get_connection(db, connection_id)
+    # 연결 업데이트 (그래프 인덱스에 변경분만 반영되도록 ORM 객체로 수정)
+    return await crud.update_connection(db, connection_id, connection_update)
 
 @router.delete("/{connection_id}")
-def delete_connection(connection_id: int, db: Session = Depends(get_db)):
+async def delete_connection(connection_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     특정 ID의 연결을 삭제합니다.
     """
-    connection = crud.get_connection(db, connection_id)
+    connection = await crud.get_connection(db, connection_id)
     if not connection:
         raise HTTPException(status_code=404, detail=f"Connection with id {connection_id} not found")
     
     # 연결 삭제
-    db.delete(connection)
-    db.commit()
+    await crud.delete_connection(db, connection_id)
     
     return {"message": "Connection deleted successfully"}
 
 @router.get("/concept/{concept_id}", response_model=List[schemas.Connection])
-def get_connections_by_concept(concept_id: int, db: Session = Depends(get_db)):
+async def get_connections_by_concept(concept_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     특정 개념과 관련된 모든 연결을 가져옵니다.
     """
     # 개념이 존재하는지 확인
-    concept = crud.get_concept(db, concept_id)
+    concept = await crud.get_concept(db, concept_id)
     if not concept:
         raise HTTPException(status_code=404, detail=f"Concept with id {concept_id} not found")
     
     # 개념이 소스 또는 타겟인 모든 연결 가져오기
-    connections = crud.get_connections_by_concept(db, concept_id)
+    connections = await crud.get_connections_by_concept(db, concept_id)
     
     return connections
\ No newline at end of file
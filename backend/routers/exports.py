@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from database import get_read_db
+import graph_export
+
+# APIRouter 생성
+router = APIRouter()
+
+@router.get("/graph")
+def export_graph(format: str = "ndjson", db: Session = Depends(get_read_db)):
+    """
+    전체 개념 그래프를 NDJSON, GraphML 또는 탭 구분 연결 목록으로 스트리밍합니다.
+    테이블을 고정 크기 청크로 읽으므로 그래프 크기와 관계없이 메모리 사용량이 일정합니다.
+    읽기 전용 엔진을 사용하며, 응답 전송 중 커서를 계속 읽으므로 문장 제한 시간은 적용하지 않습니다.
+    """
+    if format not in graph_export.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of {', '.join(graph_export.FORMATS)}")
+
+    media_type, extension = graph_export.FORMATS[format]
+    return StreamingResponse(
+        graph_export.export_graph(db.get_bind().execution_options(statement_timeout_ms=0), format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="concept_graph.{extension}"'},
+    )
@@ -0,0 +1,227 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from database import get_db
+import schemas
+import graph_components
+import graph_index
+import graph_paths
+import prerequisites
+
+# APIRouter 생성
+router = APIRouter()
+
+# 이웃 탐색 상한
+MAX_NEIGHBORHOOD_DEPTH = 5
+MAX_NEIGHBORHOOD_NODES = 5000
+
+# 대안 경로 최대 개수
+MAX_PATH_COUNT = 10
+
+# 중심성 정렬 기준
+CENTRALITY_METRICS = ("pagerank", "degree", "in_degree", "out_degree", "betweenness")
+MAX_BETWEENNESS_SAMPLES = 256
+
+@router.get("", response_model=schemas.GraphSnapshot)
+def read_graph(request: Request, db: Session = Depends(get_db)):
+    """
+    전체 개념 그래프의 노드와 연결을 한 번에 반환합니다.
+    메모리 인덱스에서 직렬화된 결과를 그대로 내려보내며, 그래프 version을 ETag로 사용합니다.
+    """
+    index = graph_index.get_graph_index(db)
+    with index.lock:
+        etag = f'"{graph_index.EPOCH}-{index.version}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        content = index.snapshot_json()
+    return Response(content=content, media_type="application/json", headers={"ETag": etag})
+
+@router.get("/neighborhood/{concept_id}", response_model=schemas.Neighborhood)
+def read_neighborhood(
+    concept_id: int,
+    depth: int = 1,
+    direction: str = "both",
+    relation: Optional[List[str]] = Query(None),
+    min_strength: Optional[float] = None,
+    max_nodes: int = 500,
+    db: Session = Depends(get_db)
+):
+    """
+    개념을 중심으로 depth 홉 이내의 이웃 서브그래프를 반환합니다.
+    """
+    if not 1 <= depth <= MAX_NEIGHBORHOOD_DEPTH:
+        raise HTTPException(status_code=400, detail=f"Depth must be between 1 and {MAX_NEIGHBORHOOD_DEPTH}")
+    if direction not in graph_index.DIRECTIONS:
+        raise HTTPException(status_code=400, detail=f"Direction must be one of {', '.join(graph_index.DIRECTIONS)}")
+    if not 1 <= max_nodes <= MAX_NEIGHBORHOOD_NODES:
+        raise HTTPException(status_code=400, detail=f"max_nodes must be between 1 and {MAX_NEIGHBORHOOD_NODES}")
+
+    index = graph_index.get_graph_index(db)
+    with index.lock:
+        if concept_id not in index.nodes:
+            raise HTTPException(status_code=404, detail=f"Concept with id {concept_id} not found")
+
+        depths, edge_ids, truncated = index.neighborhood(
+            concept_id,
+            depth=depth,
+            direction=direction,
+            relations=relation,
+            min_strength=min_strength,
+            max_nodes=max_nodes,
+        )
+
+        return {
+            "center_id": concept_id,
+            "nodes": [
+                {"id": node_id, "name": index.nodes[node_id], "depth": node_depth}
+                for node_id, node_depth in depths.items()
+            ],
+            "edges": [index.edge_dict(connection_id) for connection_id in edge_ids],
+            "truncated": truncated,
+        }
+
+@router.get("/path", response_model=schemas.LearningPaths)
+def read_learning_path(
+    source_id: int,
+    target_id: int,
+    k: int = 1,
+    directed: bool = True,
+    max_cost: Optional[float] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    두 개념 사이의 최적 학습 경로를 반환합니다.
+    연결 비용은 1 / strength이며, k > 1이면 비용 순으로 대안 경로를 함께 반환합니다.
+    """
+    if not 1 <= k <= MAX_PATH_COUNT:
+        raise HTTPException(status_code=400, detail=f"k must be between 1 and {MAX_PATH_COUNT}")
+
+    index = graph_index.get_graph_index(db)
+    with index.lock:
+        for concept_id in (source_id, target_id):
+            if concept_id not in index.nodes:
+                raise HTTPException(status_code=404, detail=f"Concept with id {concept_id} not found")
+
+        compact = index.compact()
+        paths = graph_paths.shortest_paths(
+            compact,
+            index.edges,
+            compact.position[source_id],
+            compact.position[target_id],
+            k=k,
+            directed=directed,
+            max_cost=max_cost,
+        )
+
+        return {
+            "source_id": source_id,
+            "target_id": target_id,
+            "paths": [
+                {
+                    "cost": round(cost, 6),
+                    "nodes": [
+                        {"id": compact.node_ids[i], "name": index.nodes[compact.node_ids[i]]}
+                        for i in nodes
+                    ],
+                    "edges": [index.edge_dict(connection_id) for connection_id in edges],
+                }
+                for cost, nodes, edges in paths
+            ],
+        }
+
+@router.get("/centrality", response_model=schemas.Centrality)
+def read_centrality(
+    sort: str = "pagerank",
+    limit: int = 50,
+    directed: bool = True,
+    damping: float = 0.85,
+    samples: int = 32,
+    db: Session = Depends(get_db)
+):
+    """
+    구조적 중요도(PageRank, 가중 차수, 표본 매개 중심성) 기준 상위 개념을 반환합니다.
+    계산 결과는 그래프 version별로 캐시됩니다.
+    """
+    if sort not in CENTRALITY_METRICS:
+        raise HTTPException(status_code=400, detail=f"Sort must be one of {', '.join(CENTRALITY_METRICS)}")
+    if not 0 < damping < 1:
+        raise HTTPException(status_code=400, detail="Damping must be between 0 and 1")
+    if not 1 <= samples <= MAX_BETWEENNESS_SAMPLES:
+        raise HTTPException(status_code=400, detail=f"Samples must be between 1 and {MAX_BETWEENNESS_SAMPLES}")
+
+    # numpy를 쓰는 분석 모듈은 첫 중심성 요청 때 임포트
+    import graph_analytics
+
+    index = graph_index.get_graph_index(db)
+    result = graph_analytics.get_centrality(index, directed=directed, damping=damping, samples=samples)
+
+    with index.lock:
+        items = [
+            {"id": concept_id, "name": index.nodes[concept_id], **scores}
+            for concept_id, scores in result.top(sort, max(limit, 0))
+            if concept_id in index.nodes
+        ]
+    return {"version": result.version, "items": items}
+
+@router.get("/prerequisites", response_model=schemas.LearningOrder)
+def read_prerequisite_order(concept_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """
+    선행 관계로부터 학습 순서를 반환합니다.
+    concept_id가 주어지면 그 개념까지 필요한 선행 개념들만 순서대로 반환하고,
+    순서를 막는 순환을 함께 보고합니다.
+    """
+    index = graph_index.get_graph_index(db)
+    with index.lock:
+        if concept_id is not None and concept_id not in index.nodes:
+            raise HTTPException(status_code=404, detail=f"Concept with id {concept_id} not found")
+
+        order = prerequisites.get_prerequisite_order(index)
+        if concept_id is None:
+            concept_ids = set(order.position)
+            cycles = order.cycles()
+        else:
+            concept_ids = order.ancestors(concept_id) | {concept_id}
+            cycles = order.cycles(concept_ids)
+
+        def to_nodes(ids):
+            return [{"id": node_id, "name": index.nodes[node_id]} for node_id in ids]
+
+        return {
+            "concept_id": concept_id,
+            "order": to_nodes(order.order(concept_ids)),
+            "cycles": [to_nodes(cycle) for cycle in cycles],
+        }
+
+@router.get("/components", response_model=schemas.GraphComponents)
+def read_components(min_size: int = 1, limit: int = 100, db: Session = Depends(get_db)):
+    """
+    방향을 무시한 연결 요소(고립된 개념 묶음)와 레이블 전파로 찾은 커뮤니티를 반환합니다.
+    두 목록 모두 크기가 큰 순서이며, min_size 미만인 묶음은 제외합니다.
+    """
+    if min_size < 1:
+        raise HTTPException(status_code=400, detail="min_size must be at least 1")
+
+    index = graph_index.get_graph_index(db)
+    communities = graph_components.get_communities(index)
+
+    with index.lock:
+        components = graph_components.get_components(index)
+
+        def to_groups(groups):
+            return [
+                {
+                    "size": len(group),
+                    "nodes": [{"id": node_id, "name": index.nodes[node_id]} for node_id in group if node_id in index.nodes],
+                }
+                for group in groups[:max(limit, 0)]
+                if len(group) >= min_size
+            ]
+
+        return {
+            "version": index.version,
+            "component_count": len(components),
+            "isolated_count": sum(1 for group in components if len(group) == 1),
+            "components": to_groups(components),
+            "communities": to_groups(communities),
+        }
@@ -0,0 +1,36 @@
+import io
+import tempfile
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from database import get_db
+import schemas
+import bulk_import
+
+# APIRouter 생성
+router = APIRouter()
+
+# 이 크기를 넘는 요청 본문은 메모리 대신 임시 파일에 보관
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+@router.post("/graph", response_model=schemas.ImportResult)
+async def import_graph(request: Request, format: str = "ndjson", db: Session = Depends(get_db)):
+    """
+    NDJSON 또는 CSV 요청 본문으로 개념과 연결을 일괄 가져옵니다.
+    잘못된 행은 줄 번호와 함께 보고되며 나머지 행의 적재는 계속됩니다.
+    """
+    if format not in bulk_import.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of {', '.join(bulk_import.FORMATS)}")
+
+    # 요청 본문을 메모리에 모두 올리지 않고 스풀 파일로 받음
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    try:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        stream = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+        return await run_in_threadpool(bulk_import.import_stream, db, stream, format)
+    finally:
+        spool.close()
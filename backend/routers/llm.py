@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 import logging
-import requests
 from pydantic import BaseModel
 
 import schemas
@@ -17,11 +17,17 @@ router = APIRouter()
 # LLM 서비스 URL (LM Studio 기본 설정)
 LLM_API_URL = "http://localhost:1234/v1"
 
+# HTTP 클라이언트는 첫 LLM 요청 때 만듦 (requests 임포트와 세션 생성을 워커 시작 시점에서 제외)
+@lru_cache(maxsize=None)
+def get_http_client():
+    import requests
+    return requests.Session()
+
 # LLM 서비스가 제대로 동작하는지 확인하는 함수
 def check_llm_service():
     try:
         # LM Studio API 연결 확인
-        response = requests.get(f"{LLM_API_URL}/models", timeout=3)
+        response = get_http_client().get(f"{LLM_API_URL}/models", timeout=3)
         if response.status_code == 200:
             return True
         return False
@@ -31,7 +37,7 @@ def check_llm_service():
 # LM Studio와 통신하는 함수
 def generate_llm_response(prompt: str, max_tokens: int = 1024, temperature: float = 0.7):
     try:
-        response = requests.post(
+        response = get_http_client().post(
             f"{LLM_API_URL}/chat/completions",
             json={
                 "model": "local-model",  # LM Studio는 일반적으로 local-model을 사용
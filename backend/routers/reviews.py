@@ -1,62 +1,103 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import List, Optional
 
 import models
 import schemas
-from database import get_db
+from config import settings
+from database import get_async_db, get_db
 import crud
+import fsrs
+import pagination
+import review_queue
+import scheduling
 
 # APIRouter 생성
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.Review])
-def get_reviews(
+async def get_reviews(
+    response: Response,
     card_id: Optional[int] = None,
-    db: Session = Depends(get_db), 
+    db: AsyncSession = Depends(get_async_db), 
     skip: int = 0, 
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None
 ):
     """
     모든 복습 기록 또는 특정 카드의 복습 기록을 가져옵니다.
+    다음 페이지는 X-Next-Cursor 헤더의 값을 cursor로 넘겨 조회합니다.
     """
+    after_id = pagination.decode_id_cursor(cursor)
     if card_id:
-        return crud.get_reviews_by_card(db, card_id, skip, limit)
-    return crud.get_reviews(db, skip, limit)
+        reviews = await crud.get_reviews_by_card(db, card_id, skip, limit, after_id)
+    else:
+        reviews = await crud.get_reviews(db, skip, limit, after_id)
+    pagination.set_next_cursor(response, reviews, limit)
+    return reviews
 
 @router.get("/due", response_model=List[schemas.Review])
-def get_due_reviews(
-    db: Session = Depends(get_db), 
+async def get_due_reviews(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db), 
     skip: int = 0, 
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None
 ):
     """
-    오늘 복습해야 할 카드들의 복습 기록을 가져옵니다.
+    예정일이 지난 카드의 최신 복습 기록을 복습 예정일 순서로 가져옵니다 (카드마다 한 번).
     """
+    after = pagination.decode_cursor(cursor, datetime.fromisoformat, int)
     try:
-        now = datetime.now()
-        due_reviews = (
-            db.query(models.Review)
-            .filter(models.Review.next_review_date <= now)
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
-        return due_reviews
+        reviews = await crud.get_due_reviews(db, skip, limit, after)
+        pagination.set_next_cursor(response, reviews, limit, key=lambda review: (review.next_review_date, review.card_id))
+        return reviews
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"데이터를 가져오는 중 오류 발생: {str(e)}")
 
+# 복습 큐 한 번에 가져올 수 있는 최대 카드 수
+MAX_QUEUE_SIZE = 100
+
+@router.get("/queue", response_model=List[schemas.QueueCard])
+def get_review_queue(
+    response: Response,
+    n: int = 20,
+    order: str = "overdue",
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    지금 복습할 카드 n개를 질문/답과 함께 반환합니다 (카드마다 따로 조회하지 않음).
+    order: overdue(오래 밀린 순), priority(개념 PageRank 순), random(개념이 섞인 무작위 순)
+    다음 배치는 X-Next-Cursor 헤더의 값을 cursor로 넘겨 미리 가져올 수 있습니다.
+    """
+    if order not in review_queue.QUEUE_ORDERS:
+        raise HTTPException(status_code=400, detail=f"Order must be one of {', '.join(review_queue.QUEUE_ORDERS)}")
+    if not 1 <= n <= MAX_QUEUE_SIZE:
+        raise HTTPException(status_code=400, detail=f"n must be between 1 and {MAX_QUEUE_SIZE}")
+    after = pagination.decode_cursor(cursor, *review_queue.cursor_types(order))
+    try:
+        items, key = review_queue.get_queue(db, n, order, after)
+    except LookupError:
+        # priority 커서가 담은 개념 점수 버전이 이미 정리됨
+        raise HTTPException(status_code=400, detail="Queue cursor expired; request the queue again without a cursor")
+    pagination.set_next_cursor(response, items, n, key=key)
+    return items
+
 @router.post("/", response_model=schemas.Review)
-def create_review(
+async def create_review(
     review: schemas.ReviewCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     새로운 복습 기록을 생성합니다.
+    다음 복습일은 카드에 저장된 스케줄 상태로 서버에서 계산합니다 (SM-2 또는 FSRS, settings.SCHEDULER).
     """
     # 카드가 존재하는지 확인
-    card = crud.get_card(db, review.card_id)
+    card = await crud.get_card(db, review.card_id)
     if not card:
         raise HTTPException(status_code=404, detail=f"Card with id {review.card_id} not found")
     
@@ -65,35 +106,121 @@ def create_review(
         raise HTTPException(status_code=400, detail="Difficulty must be between 1 and 5")
     
     # 복습 기록 생성
-    return crud.create_review(db, review)
+    return await crud.create_review(db, review)
+
+# 세션 한 번에 제출할 수 있는 최대 답변 수
+MAX_SESSION_ENTRIES = 1000
+MAX_SESSION_ID_LENGTH = 100
+
+@router.post("/sessions", response_model=schemas.ReviewSessionResult)
+async def submit_review_session(session: schemas.ReviewSessionSubmit, db: AsyncSession = Depends(get_async_db)):
+    """
+    복습 세션 전체의 답변을 한 번에 제출합니다.
+    카드 존재 여부는 한 번에 확인하고, 복습 기록/스케줄 갱신/학습 이력은 한 트랜잭션으로 반영합니다.
+    같은 session_id로 다시 제출하면 아무것도 반영하지 않고 처음 반영된 결과를 돌려줍니다 (재시도 안전).
+    """
+    if not session.session_id or len(session.session_id) > MAX_SESSION_ID_LENGTH:
+        raise HTTPException(status_code=400, detail=f"session_id must be 1 to {MAX_SESSION_ID_LENGTH} characters")
+
+    if await crud.get_review_session(db, session.session_id):
+        reviews = await crud.get_session_reviews(db, session.session_id)
+        return {"session_id": session.session_id, "duplicate": True, "reviews": reviews}
+
+    if not session.entries:
+        raise HTTPException(status_code=400, detail="entries must not be empty")
+    if len(session.entries) > MAX_SESSION_ENTRIES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SESSION_ENTRIES} entries are allowed per session")
+    for index, entry in enumerate(session.entries):
+        if not 1 <= entry.difficulty <= 5:
+            raise HTTPException(status_code=400, detail=f"Entry {index}: Difficulty must be between 1 and 5")
+        if entry.response_ms is not None and entry.response_ms < 0:
+            raise HTTPException(status_code=400, detail=f"Entry {index}: response_ms must not be negative")
+
+    concept_ids = await crud.get_card_concept_ids(db, [entry.card_id for entry in session.entries])
+    missing = sorted({entry.card_id for entry in session.entries} - concept_ids.keys())
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Cards not found: {', '.join(map(str, missing))}")
+
+    try:
+        reviews = await crud.submit_review_session(db, session, concept_ids)
+    except IntegrityError:
+        # 같은 세션을 동시에 재시도한 경우: 먼저 커밋된 쪽의 결과를 돌려줌
+        await db.rollback()
+        if not await crud.get_review_session(db, session.session_id):
+            raise
+        reviews = await crud.get_session_reviews(db, session.session_id)
+        return {"session_id": session.session_id, "duplicate": True, "reviews": reviews}
+    return {"session_id": session.session_id, "duplicate": False, "reviews": reviews}
+
+# 한 번의 재계산에서 허용하는 간격 배율 범위
+MAX_RESCHEDULE_SCALE = 10.0
+
+@router.post("/reschedule")
+def reschedule_cards(scale: float = 1.0, db: Session = Depends(get_db)):
+    """
+    모든 카드의 복습 간격과 예정일을 현재 스케줄러 설정으로 다시 계산합니다 (설정 변경 후 일괄 적용).
+    scale을 주면 간격을 그 배수로 늘이거나 줄입니다. 전체 변경은 한 트랜잭션으로 반영됩니다.
+    """
+    if not 0 < scale <= MAX_RESCHEDULE_SCALE:
+        raise HTTPException(status_code=400, detail=f"scale must be greater than 0 and at most {MAX_RESCHEDULE_SCALE}")
+    count = scheduling.reschedule_cards(db.connection(), scale)
+    db.commit()
+    return {"rescheduled": count}
+
+@router.get("/scheduler", response_model=schemas.SchedulerStatus)
+def get_scheduler(db: Session = Depends(get_db)):
+    """
+    사용 중인 스케줄러(settings.SCHEDULER)와 FSRS 모델 파라미터, 적합 작업 상태를 반환합니다.
+    """
+    model = db.query(models.SchedulerModel).order_by(models.SchedulerModel.id.desc()).first()
+    return {
+        "scheduler": settings.SCHEDULER,
+        "desired_retention": settings.FSRS_DESIRED_RETENTION,
+        "parameters": model.parameters if model else list(fsrs.DEFAULT_PARAMETERS),
+        "fitted_at": model and model.fitted_at,
+        "review_count": model and model.review_count,
+        "loss": model and model.loss,
+        "default_loss": model and model.default_loss,
+        "fit_job": fsrs.fit_job_status(),
+    }
+
+@router.post("/scheduler/fit", status_code=202, response_model=schemas.SchedulerFitJob)
+def fit_scheduler(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """
+    복습 기록 전체로 FSRS 파라미터를 적합하는 작업을 백그라운드에서 시작합니다.
+    진행 상태와 결과는 GET /scheduler로 확인하며, 적합된 파라미터는 이후 복습부터 적용됩니다.
+    """
+    if not fsrs.start_fit_job():
+        raise HTTPException(status_code=400, detail="A scheduler fit is already running")
+    background_tasks.add_task(fsrs.run_fit_job, db.get_bind())
+    return fsrs.fit_job_status()
 
 @router.get("/{review_id}", response_model=schemas.Review)
-def get_review(
+async def get_review(
     review_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     특정 ID의 복습 기록을 가져옵니다.
     """
-    review = db.query(models.Review).filter(models.Review.id == review_id).first()
+    review = await crud.get_review(db, review_id)
     if not review:
         raise HTTPException(status_code=404, detail=f"Review with id {review_id} not found")
     return review
 
 @router.delete("/{review_id}")
-def delete_review(
+async def delete_review(
     review_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     특정 ID의 복습 기록을 삭제합니다.
     """
-    review = db.query(models.Review).filter(models.Review.id == review_id).first()
+    review = await crud.get_review(db, review_id)
     if not review:
         raise HTTPException(status_code=404, detail=f"Review with id {review_id} not found")
     
-    db.delete(review)
-    db.commit()
+    await crud.delete_review(db, review_id)
     
     return {"message": "Review deleted successfully"}
 
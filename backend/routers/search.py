@@ -0,0 +1,45 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from database import get_read_db
+import schemas
+import search
+
+# APIRouter 생성
+router = APIRouter()
+
+MAX_SEARCH_LIMIT = 100
+MAX_SEARCH_OFFSET = 1000
+
+@router.get("", response_model=schemas.SearchResults)
+def search_all(
+    q: str,
+    type: Optional[List[str]] = Query(None),
+    limit: int = 20,
+    offset: int = 0,
+    prefix: bool = True,
+    db: Session = Depends(get_read_db)
+):
+    """
+    개념 이름/설명, 카드 질문/답/해설, 노트 제목/내용을 전문 검색합니다.
+
+    결과는 bm25 관련도 순이며 일치 부분을 표시한 스니펫을 포함합니다.
+    조사가 붙은 단어도 찾을 수 있도록 각 단어를 접두어로 검색하며,
+    prefix=false이면 단어 단위로 정확히 일치하는 항목만 찾습니다 ("*"로 끝나는 단어는 계속 접두어 검색).
+    type을 여러 번 지정해 concept, card, note 중 일부만 검색할 수 있습니다.
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Query must not be empty")
+    if type:
+        for result_type in type:
+            if result_type not in search.SEARCH_TYPES:
+                raise HTTPException(status_code=400, detail=f"Type must be one of {', '.join(search.SEARCH_TYPES)}")
+    if not 1 <= limit <= MAX_SEARCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"Limit must be between 1 and {MAX_SEARCH_LIMIT}")
+    if not 0 <= offset <= MAX_SEARCH_OFFSET:
+        raise HTTPException(status_code=400, detail=f"Offset must be between 0 and {MAX_SEARCH_OFFSET}")
+
+    results = search.search(db, q, types=type, limit=limit, offset=offset, prefix=prefix)
+    return {"query": q, "results": results}
@@ -0,0 +1,338 @@
+"""
+카드별 복습 스케줄 상태(card_schedule) 관리
+
+복습 기록(reviews)은 추가만 되는 로그이고, 카드의 현재 상태(ease, 간격, 반복 횟수, 실패 횟수, 예정일)는
+card_schedule 한 행에 유지합니다. 복습 기록이 추가/수정/삭제되면 같은 flush(트랜잭션) 안에서
+ORM 이벤트로 스케줄 행을 갱신하므로 API, 일괄 작업, 직접 추가한 기록 모두 같은 규칙을 따릅니다.
+
+다음 복습일은 카드에 저장된 상태로 서버에서 계산합니다. SM-2 상태와 FSRS 기억 상태(fsrs 모듈)를 항상 함께
+갱신하고, 간격은 settings.SCHEDULER로 고른 방식을 따릅니다 (방식을 바꿔도 상태를 다시 만들 필요 없음).
+난이도(1-5)는 SM-2의 응답 품질로 사용하며 클수록 쉽게 기억한 것입니다.
+"""
+from datetime import datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterable, NamedTuple, Optional
+
+from sqlalchemy import bindparam, delete, event, func, insert, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm.attributes import set_committed_value
+
+from config import settings
+import fsrs
+import models
+
+# 이 난이도 미만이면 실패로 보고 반복 횟수를 초기화
+PASSING_DIFFICULTY = 3
+# SM-2 응답 품질의 최댓값
+MAX_QUALITY = 5
+
+# 스케줄을 다시 만들 때 한 번에 기록할 행 수
+REBUILD_BATCH = 500
+
+
+class ScheduleState(NamedTuple):
+    ease: float
+    interval_days: int
+    repetitions: int
+    lapses: int
+
+
+def initial_state() -> ScheduleState:
+    return ScheduleState(settings.SM2_INITIAL_EASE, 0, 0, 0)
+
+
+def next_state(state: ScheduleState, difficulty: int) -> ScheduleState:
+    """
+    현재 상태에서 복습 한 번의 결과(난이도)를 반영한 다음 상태를 계산합니다 (SM-2).
+    """
+    quality = min(max(difficulty, 0), MAX_QUALITY)
+    missed = MAX_QUALITY - quality
+    ease = max(settings.SM2_MINIMUM_EASE, state.ease + 0.1 - missed * (0.08 + missed * 0.02))
+
+    if quality < PASSING_DIFFICULTY:
+        # 이미 성공한 적이 있는 카드를 실패한 경우만 lapse로 셈
+        lapses = state.lapses + (1 if state.repetitions > 0 else 0)
+        return ScheduleState(ease, settings.SM2_FIRST_INTERVAL_DAYS, 0, lapses)
+
+    if state.repetitions == 0:
+        interval = settings.SM2_FIRST_INTERVAL_DAYS
+    elif state.repetitions == 1:
+        interval = settings.SM2_SECOND_INTERVAL_DAYS
+    else:
+        interval = round(state.interval_days * state.ease)
+    interval = min(max(interval, 1), settings.SM2_MAXIMUM_INTERVAL_DAYS)
+    return ScheduleState(ease, interval, state.repetitions + 1, state.lapses)
+
+
+def _uses_fsrs() -> bool:
+    return settings.SCHEDULER == "fsrs"
+
+
+def advance(current, difficulty: int, reviewed_at: datetime, parameters) -> dict:
+    """
+    스케줄 행의 현재 값(current, 첫 복습이면 None)에 복습 한 번을 반영한 새 상태 컬럼 값을 계산합니다.
+    """
+    if current is None:
+        state, memory, elapsed_days = initial_state(), None, 0.0
+    else:
+        state = ScheduleState(current.ease, current.interval_days, current.repetitions, current.lapses)
+        memory = None if current.stability is None else fsrs.MemoryState(current.stability, current.memory_difficulty)
+        last_reviewed_at = _naive(current.last_reviewed_at)
+        elapsed_days = (reviewed_at - last_reviewed_at).total_seconds() / 86400 if last_reviewed_at else 0.0
+
+    state = next_state(state, difficulty)
+    memory = fsrs.next_memory_state(memory, elapsed_days, difficulty, parameters)
+    if _uses_fsrs():
+        state = state._replace(interval_days=fsrs.next_interval(memory.stability))
+    return {**state._asdict(), "stability": memory.stability, "memory_difficulty": memory.difficulty}
+
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite에 저장되는 복습 예정일과 같은 값이 되도록 서버 현지 시각으로 바꾼 뒤 시간대 정보를 떼어냄
+    # (예정일 커서가 두 값을 같이 사용)
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def _upsert(connection: Connection):
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    return dialect.insert(models.CardSchedule)
+
+
+def record_review(connection: Connection, review: models.Review):
+    """
+    복습 한 건을 카드 스케줄에 반영합니다. 기록에 예정일이 없으면 계산한 예정일을 채웁니다
+    (과거 기록 가져오기처럼 예정일이 주어진 경우는 그대로 사용).
+
+    복습 기록 INSERT 뒤에 실행되므로 SQLite는 이미 쓰기 잠금을 잡은 상태에서, PostgreSQL은
+    FOR UPDATE 행 잠금으로 현재 상태를 읽어 같은 카드를 동시에 복습해도 갱신이 유실되지 않습니다.
+    """
+    schedule = models.CardSchedule
+    current = connection.execute(
+        select(
+            schedule.ease,
+            schedule.interval_days,
+            schedule.repetitions,
+            schedule.lapses,
+            schedule.stability,
+            schedule.memory_difficulty,
+            schedule.last_reviewed_at,
+        )
+        .where(schedule.card_id == review.card_id)
+        .with_for_update()
+    ).first()
+
+    # 세션으로 나중에 제출된 기록은 실제로 답한 시각을 기준으로 예정일을 잡음
+    reviewed_at = _naive(review.answered_at) or datetime.now()
+    state = advance(current, review.difficulty, reviewed_at, fsrs.get_parameters(connection))
+    due_at = _naive(review.next_review_date)
+    if due_at is None:
+        due_at = reviewed_at + timedelta(days=state["interval_days"])
+        connection.execute(
+            update(models.Review.__table__)
+            .where(models.Review.__table__.c.id == review.id)
+            .values(next_review_date=due_at)
+        )
+        set_committed_value(review, "next_review_date", due_at)
+
+    values = {**state, "due_at": due_at, "last_review_id": review.id, "last_reviewed_at": reviewed_at}
+    statement = _upsert(connection).values(card_id=review.card_id, **values)
+    connection.execute(statement.on_conflict_do_update(index_elements=[schedule.card_id], set_=values))
+
+
+class _Replayed(NamedTuple):
+    # 기록을 다시 적용하는 동안의 스케줄 행 (advance의 current와 같은 필드)
+    ease: float
+    interval_days: int
+    repetitions: int
+    lapses: int
+    stability: float
+    memory_difficulty: float
+    last_reviewed_at: Optional[datetime]
+
+
+def rebuild_schedules(connection: Connection, card_ids: Optional[Iterable[int]] = None):
+    """
+    복습 기록을 카드별로 시간 순서대로 다시 적용해 스케줄 행을 재구성합니다 (card_ids가 None이면 전체).
+    예정일은 각 카드의 마지막 기록에 저장된 값을 사용합니다.
+    """
+    schedule = models.CardSchedule.__table__
+    review = models.Review.__table__
+    clear = delete(schedule)
+    history = (
+        select(
+            review.c.card_id,
+            review.c.id,
+            review.c.difficulty,
+            review.c.next_review_date,
+            func.coalesce(review.c.answered_at, review.c.created_at),
+        )
+        .where(review.c.card_id.is_not(None))
+        .order_by(review.c.card_id, review.c.id)
+    )
+    if card_ids is not None:
+        card_ids = [card_id for card_id in set(card_ids) if card_id is not None]
+        if not card_ids:
+            return
+        clear = clear.where(schedule.c.card_id.in_(card_ids))
+        history = history.where(review.c.card_id.in_(card_ids))
+    connection.execute(clear)
+
+    # 기록 전체를 메모리에 올리지 않도록 카드 순서로 읽으면서 바로 기록
+    parameters = fsrs.get_parameters(connection)
+    batch = []
+    for card_id, reviews in groupby(connection.execute(history), key=itemgetter(0)):
+        current = None
+        for _, review_id, difficulty, due_at, reviewed_at in reviews:
+            reviewed_at = _naive(reviewed_at)
+            state = advance(current, difficulty or 0, reviewed_at, parameters)
+            current = _Replayed(**state, last_reviewed_at=reviewed_at)
+        batch.append({
+            **state,
+            "card_id": card_id,
+            "due_at": _naive(due_at),
+            "last_review_id": review_id,
+            "last_reviewed_at": reviewed_at,
+        })
+        if len(batch) >= REBUILD_BATCH:
+            connection.execute(insert(schedule), batch)
+            batch = []
+    if batch:
+        connection.execute(insert(schedule), batch)
+
+
+def _read_chunk(connection: Connection, np, after: int, chunk_size: int):
+    schedule = models.CardSchedule.__table__
+    if connection.dialect.name == "sqlite":
+        # SQLite는 날짜를 문자열로 저장하므로 행마다 datetime으로 바꾸지 않고 NumPy가 한 번에 변환
+        rows = connection.exec_driver_sql(
+            "SELECT card_id, last_review_id, interval_days, repetitions, stability, last_reviewed_at FROM card_schedule "
+            "WHERE card_id > ? AND last_reviewed_at IS NOT NULL ORDER BY card_id LIMIT ?",
+            (after, chunk_size),
+        ).fetchall()
+    else:
+        rows = connection.execute(
+            select(
+                schedule.c.card_id,
+                schedule.c.last_review_id,
+                schedule.c.interval_days,
+                schedule.c.repetitions,
+                schedule.c.stability,
+                schedule.c.last_reviewed_at,
+            )
+            .where(schedule.c.card_id > after, schedule.c.last_reviewed_at.is_not(None))
+            .order_by(schedule.c.card_id)
+            .limit(chunk_size)
+        ).all()
+        rows = [(*row[:5], _naive(row[5])) for row in rows]
+    if not rows:
+        return None
+    card_ids, review_ids, intervals, repetitions, stability, reviewed_at = zip(*rows)
+    return (
+        list(card_ids),
+        list(review_ids),
+        np.array(intervals, dtype=np.float64),
+        np.array(repetitions, dtype=np.int64),
+        # 기억 상태가 없는 행(NaN)은 첫 간격을 사용
+        np.array(stability, dtype=np.float64),
+        np.array(reviewed_at, dtype="datetime64[us]"),
+    )
+
+
+def _write_chunk(connection: Connection, np, card_ids, review_ids, intervals, due_at):
+    # 카드의 최신 복습 기록에 저장된 예정일도 같이 옮김 (예정일 목록과 스케줄 재구성이 이 값을 사용)
+    if connection.dialect.name == "sqlite":
+        # SQLAlchemy DateTime과 같은 저장 형식(YYYY-MM-DD HH:MM:SS.ffffff) 문자열을 배열 연산으로 만들어 바로 전달
+        due_text = np.char.replace(np.datetime_as_string(due_at, unit="us"), "T", " ").tolist()
+        connection.exec_driver_sql(
+            "UPDATE card_schedule SET interval_days = ?, due_at = ? WHERE card_id = ?",
+            list(zip(intervals.tolist(), due_text, card_ids)),
+        )
+        review_rows = [(due, review_id) for due, review_id in zip(due_text, review_ids) if review_id is not None]
+        if review_rows:
+            connection.exec_driver_sql("UPDATE reviews SET next_review_date = ? WHERE id = ?", review_rows)
+        return
+    schedule = models.CardSchedule.__table__
+    review = models.Review.__table__
+    connection.execute(
+        update(schedule)
+        .where(schedule.c.card_id == bindparam("b_card_id"))
+        .values(interval_days=bindparam("b_interval_days"), due_at=bindparam("b_due_at")),
+        [
+            {"b_card_id": card_id, "b_interval_days": interval, "b_due_at": due}
+            for card_id, interval, due in zip(card_ids, intervals.tolist(), due_at.tolist())
+        ],
+    )
+    review_rows = [
+        {"b_review_id": review_id, "b_due_at": due}
+        for review_id, due in zip(review_ids, due_at.tolist())
+        if review_id is not None
+    ]
+    if review_rows:
+        connection.execute(
+            update(review).where(review.c.id == bindparam("b_review_id")).values(next_review_date=bindparam("b_due_at")),
+            review_rows,
+        )
+
+
+def reschedule_cards(connection: Connection, scale: float = 1.0, chunk_size: Optional[int] = None) -> int:
+    """
+    모든 카드의 복습 간격을 현재 스케줄러 설정으로 다시 계산하고 예정일을 마지막 복습 시각 + 간격으로 옮깁니다.
+    카드의 최신 복습 기록(next_review_date)도 같은 예정일로 맞추므로 이후 스케줄을 재구성해도 결과가 유지됩니다.
+
+    SM-2는 1, 2회차 카드는 설정된 첫/두 번째 간격을, 그 이후 카드는 현재 간격을 scale배 합니다
+    (실패 직후 카드는 첫 간격 그대로). FSRS는 저장된 안정성과 목표 기억률로 간격을 구해 scale배 합니다. 카드 ID 순서로 chunk_size개씩 읽어 NumPy 배열 연산으로 계산하고
+    executemany로 되돌려 씁니다. 커밋은 호출한 쪽에서 합니다.
+    """
+    # numpy는 전체 재계산에서만 필요하므로 앱 시작 시 임포트하지 않음
+    import numpy as np
+
+    chunk_size = chunk_size or settings.RESCHEDULE_CHUNK_SIZE
+    total = 0
+    after = 0
+    while True:
+        chunk = _read_chunk(connection, np, after, chunk_size)
+        if chunk is None:
+            break
+        card_ids, review_ids, intervals, repetitions, stability, reviewed_at = chunk
+
+        if _uses_fsrs():
+            retention_factor = (settings.FSRS_DESIRED_RETENTION ** (1 / fsrs.DECAY) - 1) / fsrs.FACTOR
+            base = np.nan_to_num(stability * retention_factor, nan=settings.SM2_FIRST_INTERVAL_DAYS)
+            new_intervals = np.clip(np.rint(base * scale), 1, settings.FSRS_MAXIMUM_INTERVAL_DAYS).astype(np.int64)
+        else:
+            base = np.select(
+                [repetitions == 1, repetitions == 2],
+                [settings.SM2_FIRST_INTERVAL_DAYS, settings.SM2_SECOND_INTERVAL_DAYS],
+                default=intervals,
+            )
+            new_intervals = np.clip(np.rint(base * scale), 1, settings.SM2_MAXIMUM_INTERVAL_DAYS).astype(np.int64)
+            new_intervals = np.where(repetitions == 0, settings.SM2_FIRST_INTERVAL_DAYS, new_intervals)
+        due_at = reviewed_at + new_intervals.astype("timedelta64[D]")
+
+        _write_chunk(connection, np, card_ids, review_ids, new_intervals, due_at)
+        total += len(card_ids)
+        after = card_ids[-1]
+    return total
+
+
+# ------------------------ 복습 기록 변경 이벤트 ------------------------
+@event.listens_for(models.Review, "after_insert")
+def _review_inserted(mapper, connection, target):
+    if target.card_id is not None:
+        record_review(connection, target)
+
+
+@event.listens_for(models.Review, "after_update")
+def _review_updated(mapper, connection, target):
+    # 지난 기록이 바뀌면 이후 상태가 모두 달라지므로 해당 카드의 기록을 다시 적용
+    card_history = inspect(target).attrs.card_id.history
+    rebuild_schedules(connection, [target.card_id, *card_history.deleted])
+
+
+@event.listens_for(models.Review, "after_delete")
+def _review_deleted(mapper, connection, target):
+    rebuild_schedules(connection, [target.card_id])
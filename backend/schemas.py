@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, field_validator
+from typing import Any, Dict, List, Optional, Tuple, Union
 from datetime import datetime
 
 # 개념 스키마
@@ -26,7 +26,11 @@ class Concept(ConceptBase):
 class RelatedConcept(BaseModel):
     id: int
     name: str
-    relation: str
+    relation: Optional[str] = None
+    strength: Optional[float] = None
+    connection_id: Optional[int] = None
+    # outgoing: 이 개념 -> 관련 개념, incoming: 관련 개념 -> 이 개념
+    direction: Optional[str] = None
 
     class Config:
         from_attributes= True
@@ -58,6 +62,165 @@ class Connection(ConnectionBase):
     class Config:
         from_attributes= True
 
+# 연결 일괄 처리 스키마
+class ConnectionOperation(BaseModel):
+    # create | update | delete
+    op: str
+    id: Optional[int] = None
+    source_id: Optional[int] = None
+    target_id: Optional[int] = None
+    relation: Optional[str] = None
+    strength: Optional[float] = None
+
+class ConnectionBatch(BaseModel):
+    operations: List[ConnectionOperation]
+    # True이면 하나라도 실패할 경우 아무것도 반영하지 않음
+    atomic: bool = False
+
+class ConnectionOperationResult(BaseModel):
+    index: int
+    op: str
+    success: bool
+    connection: Optional[Connection] = None
+    error: Optional[str] = None
+
+class ConnectionBatchResult(BaseModel):
+    applied: int
+    failed: int
+    results: List[ConnectionOperationResult]
+
+# 그래프 스냅샷 스키마
+class GraphSnapshot(BaseModel):
+    version: int
+    # [id, name]
+    nodes: List[Tuple[int, str]]
+    # [id, source_id, target_id, relation, strength]
+    edges: List[Tuple[int, int, int, Optional[str], float]]
+
+# 그래프 연결 (경량)
+class GraphEdge(BaseModel):
+    id: int
+    source_id: int
+    target_id: int
+    relation: Optional[str] = None
+    strength: float
+
+# k-홉 이웃 서브그래프 스키마
+class NeighborhoodNode(BaseModel):
+    id: int
+    name: str
+    depth: int
+
+class Neighborhood(BaseModel):
+    center_id: int
+    nodes: List[NeighborhoodNode]
+    edges: List[GraphEdge]
+    truncated: bool
+
+# 학습 경로 스키마
+class PathNode(BaseModel):
+    id: int
+    name: str
+
+class LearningPath(BaseModel):
+    cost: float
+    nodes: List[PathNode]
+    edges: List[GraphEdge]
+
+class LearningPaths(BaseModel):
+    source_id: int
+    target_id: int
+    paths: List[LearningPath]
+
+# 선행 관계 학습 순서 스키마
+class LearningOrder(BaseModel):
+    concept_id: Optional[int] = None
+    order: List[PathNode]
+    # 순서를 정할 수 없게 만드는 순환 (학습 순서 방향의 개념 목록)
+    cycles: List[List[PathNode]]
+
+# 그래프 중심성 스키마
+class CentralityItem(BaseModel):
+    id: int
+    name: str
+    pagerank: float
+    degree: float
+    in_degree: float
+    out_degree: float
+    betweenness: float
+
+class Centrality(BaseModel):
+    version: int
+    items: List[CentralityItem]
+
+# 연결 요소 / 커뮤니티 스키마
+class ConceptGroup(BaseModel):
+    size: int
+    nodes: List[PathNode]
+
+class GraphComponents(BaseModel):
+    version: int
+    component_count: int
+    # 연결이 하나도 없는 개념 수
+    isolated_count: int
+    components: List[ConceptGroup]
+    communities: List[ConceptGroup]
+
+# 전문 검색 스키마
+class SearchResult(BaseModel):
+    # concept | card | note
+    type: str
+    id: int
+    # 개념 이름 / 카드 질문 / 노트 제목
+    title: Optional[str] = None
+    concept_id: Optional[int] = None
+    # 일치 부분을 <mark>로 감싼 발췌
+    snippet: str
+    # bm25 점수 (작을수록 관련도 높음)
+    rank: float
+
+class SearchResults(BaseModel):
+    query: str
+    results: List[SearchResult]
+
+# 일괄 작업 스키마
+class BatchOperation(BaseModel):
+    # create | update | delete
+    op: str
+    # concept | card | note | connection | review
+    entity: str
+    # 수정/삭제 대상 ID 또는 같은 요청에서 만든 항목의 "$임시ID"
+    id: Optional[Union[int, str]] = None
+    # 생성 항목의 임시 ID. 이후 작업에서 "$ref" 형식으로 참조
+    ref: Optional[str] = None
+    data: Dict[str, Any] = {}
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+
+class BatchResultItem(BaseModel):
+    index: int
+    op: str
+    entity: str
+    id: int
+    ref: Optional[str] = None
+
+class BatchResult(BaseModel):
+    results: List[BatchResultItem]
+
+# 일괄 가져오기 결과 스키마
+class ImportError(BaseModel):
+    line: int
+    error: str
+
+class ImportResult(BaseModel):
+    concepts_created: int
+    concepts_skipped: int
+    connections_created: int
+    connections_skipped: int
+    error_count: int
+    errors: List[ImportError]
+
 # 카드 스키마
 class CardBase(BaseModel):
     concept_id: int
@@ -85,18 +248,86 @@ class Card(CardBase):
 class ReviewBase(BaseModel):
     card_id: int
     difficulty: int  # 1-5 난이도 평가
-    next_review_date: datetime
 
+# 다음 복습일은 서버가 카드의 스케줄 상태로 계산 (예전 클라이언트가 보내는 next_review_date는 무시)
 class ReviewCreate(ReviewBase):
     pass
 
 class Review(ReviewBase):
     id: int
+    next_review_date: datetime
+    answered_at: Optional[datetime] = None
+    response_ms: Optional[int] = None
+    session_id: Optional[str] = None
     created_at: datetime
 
     class Config:
         from_attributes= True
 
+# 복습 세션 제출 스키마
+class ReviewSessionEntry(BaseModel):
+    card_id: int
+    difficulty: int  # 1-5 난이도 평가
+    answered_at: datetime
+    response_ms: Optional[int] = None
+
+    @field_validator("answered_at")
+    @classmethod
+    def normalize_answered_at(cls, value: datetime) -> datetime:
+        # 시간대가 있는 시각(예: UTC ...Z)은 서버 현지 시각으로 바꿔 저장된 다른 시각과 같은 기준으로 맞춤
+        if value.tzinfo is not None:
+            value = value.astimezone().replace(tzinfo=None)
+        if value > datetime.now():
+            raise ValueError("answered_at must not be in the future")
+        return value
+
+class ReviewSessionSubmit(BaseModel):
+    # 클라이언트가 세션마다 만드는 고유 ID (재시도 시 같은 값을 보냄)
+    session_id: str
+    entries: List[ReviewSessionEntry]
+
+class ReviewSessionResult(BaseModel):
+    session_id: str
+    # 이미 반영된 세션을 다시 제출한 경우 True (이번 요청으로는 아무것도 반영하지 않음)
+    duplicate: bool
+    reviews: List[Review]
+
+# 복습 큐 스키마 (카드 내용 포함)
+class QueueCard(BaseModel):
+    card_id: int
+    concept_id: int
+    concept_name: Optional[str] = None
+    question: str
+    answer: str
+    explanation: Optional[str] = None
+    due_at: datetime
+    # 예정일이 지난 일수
+    overdue_days: float
+    interval_days: int
+    repetitions: int
+    lapses: int
+    # priority 순서에서 사용한 개념 PageRank
+    priority: Optional[float] = None
+
+# 스케줄러 파라미터 적합 작업 상태 (idle, running, done, failed)
+class SchedulerFitJob(BaseModel):
+    status: str
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+# 사용 중인 스케줄러와 FSRS 모델 정보
+class SchedulerStatus(BaseModel):
+    scheduler: str
+    desired_retention: float
+    parameters: List[float]
+    # 적합된 모델이 없으면 기본 파라미터를 사용하며 아래 값은 비어 있음
+    fitted_at: Optional[datetime] = None
+    review_count: Optional[int] = None
+    loss: Optional[float] = None
+    default_loss: Optional[float] = None
+    fit_job: SchedulerFitJob
+
 # 노트 스키마
 class NoteBase(BaseModel):
     concept_id: int
@@ -118,6 +349,20 @@ class Note(NoteBase):
     class Config:
         from_attributes= True
 
+# 노트 목록 요약 (본문 제외)
+class NoteSummary(BaseModel):
+    id: int
+    concept_id: int
+    title: str
+    preview: str
+    # 본문 UTF-8 바이트 수
+    content_length: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes= True
+
 # 학습 이력 스키마
 class LearningHistoryBase(BaseModel):
     concept_id: int
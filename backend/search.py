@@ -0,0 +1,94 @@
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from models import search_table
+
+# 검색 결과 type -> 원본 테이블
+SEARCH_TYPES = {"concept": "concepts", "card": "cards", "note": "notes"}
+
+# bm25 컬럼 가중치 (SEARCH_INDEXES의 컬럼 순서). 제목 역할의 컬럼에 더 큰 가중치
+BM25_WEIGHTS = {
+    "concepts": (10.0, 1.0),
+    "cards": (5.0, 2.0, 1.0),
+    "notes": (5.0, 1.0),
+}
+
+# 결과 제목으로 쓸 컬럼과 소속 개념 ID 컬럼
+TITLE_COLUMNS = {"concepts": "name", "cards": "question", "notes": "title"}
+CONCEPT_ID_COLUMNS = {"concepts": "id", "cards": "concept_id", "notes": "concept_id"}
+
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+SNIPPET_ELLIPSIS = "…"
+# 스니펫에 포함할 최대 토큰 수
+SNIPPET_TOKENS = 12
+
+
+def build_match_query(query: str, prefix: bool = True) -> Optional[str]:
+    """
+    사용자 입력을 FTS5 MATCH 식으로 변환합니다.
+    각 단어는 따옴표로 감싸 FTS 문법 오류가 나지 않게 하고 모두 포함해야 하는 AND 조건으로 묶습니다.
+
+    한국어는 조사가 단어에 붙어 색인되므로("미분의", "미분과") 기본적으로 모든 단어를 접두어로 검색합니다.
+    prefix가 False이면 "*"로 끝나는 단어만 접두어로 검색합니다.
+    """
+    parts = []
+    for term in query.split():
+        is_prefix = prefix or term.endswith("*")
+        term = term.rstrip("*")
+        if not term:
+            continue
+        parts.append('"' + term.replace('"', '""') + '"' + ("*" if is_prefix else ""))
+    return " ".join(parts) or None
+
+
+def _type_query(result_type: str) -> str:
+    table = SEARCH_TYPES[result_type]
+    fts = search_table(table)
+    weights = ", ".join(str(weight) for weight in BM25_WEIGHTS[table])
+    # FTS5가 rank 순으로 상위 window개만 뽑은 뒤 스니펫을 만들고 원본 행을 조인
+    return (
+        f"SELECT * FROM ("
+        f"SELECT '{result_type}' AS type, t.id AS id, t.{TITLE_COLUMNS[table]} AS title, "
+        f"t.{CONCEPT_ID_COLUMNS[table]} AS concept_id, "
+        f"snippet({fts}, -1, :snippet_start, :snippet_end, :snippet_ellipsis, :snippet_tokens) AS snippet, "
+        f"rank "
+        f"FROM {fts} JOIN {table} t ON t.id = {fts}.rowid "
+        f"WHERE {fts} MATCH :match AND rank MATCH 'bm25({weights})' "
+        f"ORDER BY rank LIMIT :window)"
+    )
+
+
+def search(
+    db: Session,
+    query: str,
+    types: Optional[List[str]] = None,
+    limit: int = 20,
+    offset: int = 0,
+    prefix: bool = True,
+) -> List[Dict]:
+    """
+    개념, 카드, 노트를 bm25 순위(작을수록 관련도 높음)로 검색합니다.
+    """
+    match = build_match_query(query, prefix)
+    if match is None:
+        return []
+    types = types or list(SEARCH_TYPES)
+    statement = " UNION ALL ".join(_type_query(result_type) for result_type in types)
+    rows = db.execute(
+        text(f"{statement} ORDER BY rank LIMIT :limit OFFSET :offset"),
+        {
+            "match": match,
+            "window": limit + offset,
+            "limit": limit,
+            "offset": offset,
+            "snippet_start": SNIPPET_START,
+            "snippet_end": SNIPPET_END,
+            "snippet_ellipsis": SNIPPET_ELLIPSIS,
+            "snippet_tokens": SNIPPET_TOKENS,
+        },
+    )
+    return [dict(row._mapping) for row in rows]
+
@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+# 테스트 중 앱이 저장소의 DB 파일을 열지 않도록 in-memory DB 사용
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app import app
+from database import Base, create_async_db_engine, create_db_engine, create_read_engine, get_async_db, get_db, get_read_db
+import graph_index
+
+# 테스트용 데이터베이스 설정 (동기/비동기 엔진이 같은 DB를 보도록 임시 파일 사용)
+_database_dir = tempfile.mkdtemp()
+TEST_DATABASE_URL = f"sqlite:///{os.path.join(_database_dir, 'test.db')}"
+
+engine = create_db_engine(TEST_DATABASE_URL)
+async_engine = create_async_db_engine(TEST_DATABASE_URL)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+read_engine = create_read_engine(TEST_DATABASE_URL)
+TestingReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+def override_get_read_db():
+    try:
+        db = TestingReadSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+@pytest.fixture(scope="session", autouse=True)
+def _remove_database_dir():
+    yield
+    engine.dispose()
+    read_engine.dispose()
+    shutil.rmtree(_database_dir, ignore_errors=True)
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+    graph_index.invalidate()
+
+@pytest.fixture
+def client(db):
+    # 다른 테스트 모듈의 의존성 오버라이드를 보존
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
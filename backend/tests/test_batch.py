@@ -0,0 +1,98 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import models
+
+def test_batch_creates_with_temp_refs(client, db):
+    base = models.Concept(name="집합", description="집합 설명")
+    db.add(base)
+    db.commit()
+
+    response = client.post("/api/batch", json={"operations": [
+        {"op": "create", "entity": "concept", "ref": "f", "data": {"name": "함수", "description": "함수 설명"}},
+        {"op": "create", "entity": "card", "ref": "c", "data": {"concept_id": "$f", "question": "함수란?", "answer": "대응"}},
+        {"op": "create", "entity": "note", "data": {"concept_id": "$f", "title": "정의", "content": "내용"}},
+        {"op": "create", "entity": "connection", "data": {"source_id": "$f", "target_id": base.id, "relation": "선행 개념"}},
+        {"op": "create", "entity": "review", "data": {"card_id": "$c", "difficulty": 3, "next_review_date": "2030-01-01T00:00:00"}},
+        {"op": "update", "entity": "card", "id": "$c", "data": {"explanation": "설명"}},
+    ]})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["entity"] for result in results] == ["concept", "card", "note", "connection", "review", "card"]
+    concept_id, card_id = results[0]["id"], results[1]["id"]
+    assert results[0]["ref"] == "f"
+    assert results[5]["id"] == card_id
+
+    card = client.get(f"/api/cards/{card_id}").json()
+    assert card["concept_id"] == concept_id
+    assert card["explanation"] == "설명"
+    assert client.get("/api/reviews/", params={"card_id": card_id}).json()[0]["difficulty"] == 3
+
+    graph = client.get("/api/graph").json()
+    assert [edge[1:4] for edge in graph["edges"]] == [[concept_id, base.id, "선행 개념"]]
+
+def test_batch_update_and_delete_existing(client, db):
+    concepts = [models.Concept(name=name, description="") for name in ("집합", "함수")]
+    db.add_all(concepts)
+    db.commit()
+    connection = models.Connection(source_id=concepts[1].id, target_id=concepts[0].id)
+    db.add(connection)
+    db.commit()
+
+    response = client.post("/api/batch", json={"operations": [
+        {"op": "delete", "entity": "connection", "id": connection.id},
+        {"op": "create", "entity": "connection", "data": {"source_id": concepts[1].id, "target_id": concepts[0].id, "relation": "관련 개념"}},
+        {"op": "update", "entity": "concept", "id": concepts[0].id, "data": {"description": "새 설명"}},
+    ]})
+    assert response.status_code == 200
+    assert client.get(f"/api/concepts/{concepts[0].id}").json()["description"] == "새 설명"
+    connections = client.get("/api/connections").json()
+    assert [(item["source_id"], item["relation"]) for item in connections] == [(concepts[1].id, "관련 개념")]
+
+def test_batch_is_all_or_nothing(client, db):
+    response = client.post("/api/batch", json={"operations": [
+        {"op": "create", "entity": "concept", "ref": "a", "data": {"name": "집합", "description": ""}},
+        {"op": "create", "entity": "card", "data": {"concept_id": "$a", "question": "q", "answer": "a"}},
+        {"op": "create", "entity": "note", "data": {"concept_id": 9999, "title": "t", "content": "c"}},
+    ]})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Operation 2: Concept with id 9999 not found"
+    assert client.get("/api/concepts").json() == []
+    assert client.get("/api/cards").json() == []
+
+def test_batch_validation_errors(client, db):
+    db.add(models.Concept(name="집합", description=""))
+    db.commit()
+
+    cases = [
+        ({"op": "move", "entity": "concept"}, "Operation 0: Operation must be one of create, update, delete"),
+        ({"op": "create", "entity": "concept", "data": {"name": "집합", "description": ""}}, "Operation 0: Concept '집합' already exists"),
+        ({"op": "create", "entity": "card", "data": {"concept_id": "$x", "question": "q", "answer": "a"}}, "Operation 0: Unknown concept reference '$x'"),
+        ({"op": "update", "entity": "review", "id": 1, "data": {}}, "Operation 0: review cannot be updated"),
+        ({"op": "delete", "entity": "note"}, "Operation 0: id is required"),
+    ]
+    for operation, detail in cases:
+        response = client.post("/api/batch", json={"operations": [operation]})
+        assert response.status_code == 400
+        assert response.json()["detail"] == detail
+
+def test_batch_commits_once(client, db):
+    commits = []
+
+    def count(session):
+        commits.append(session)
+
+    event.listen(Session, "after_commit", count)
+    try:
+        response = client.post("/api/batch", json={"operations": [
+            {"op": "create", "entity": "concept", "ref": str(i), "data": {"name": f"개념 {i}", "description": ""}}
+            for i in range(50)
+        ] + [
+            {"op": "create", "entity": "connection", "data": {"source_id": f"${i}", "target_id": f"${i + 1}"}}
+            for i in range(49)
+        ]})
+    finally:
+        event.remove(Session, "after_commit", count)
+    assert response.status_code == 200
+    assert len(commits) == 1
+    assert len(client.get("/api/graph").json()["edges"]) == 49
@@ -0,0 +1,96 @@
+import json
+
+import models
+
+def to_ndjson(rows):
+    return "\n".join(json.dumps(row, ensure_ascii=False) for row in rows)
+
+def test_import_ndjson(client, db):
+    body = to_ndjson([
+        {"type": "concept", "name": "집합", "description": "원소의 모임"},
+        {"type": "concept", "name": "함수"},
+        {"type": "connection", "source": "함수", "target": "집합", "relation": "선행 개념", "strength": 0.9},
+        {"type": "concept", "name": "극한"},
+        {"type": "connection", "source": "극한", "target": "함수", "relation": "선행 개념"},
+    ])
+    response = client.post("/api/import/graph", content=body.encode("utf-8"))
+    assert response.status_code == 200
+    data = response.json()
+    assert data["concepts_created"] == 3
+    assert data["connections_created"] == 2
+    assert data["error_count"] == 0
+
+    graph = client.get("/api/graph").json()
+    assert len(graph["nodes"]) == 3
+    assert len(graph["edges"]) == 2
+
+def test_import_reports_row_errors_without_aborting(client, db):
+    db.add(models.Concept(name="집합", description=""))
+    db.commit()
+
+    body = "\n".join([
+        json.dumps({"type": "concept", "name": "집합"}),
+        json.dumps({"type": "concept", "name": "함수"}),
+        "{not json",
+        json.dumps({"type": "connection", "source": "함수", "target": "없는 개념"}),
+        json.dumps({"type": "connection", "source": "함수", "target": "함수"}),
+        json.dumps({"type": "connection", "source": "함수", "target": "집합"}),
+        json.dumps({"type": "connection", "source": "함수", "target": "집합"}),
+        json.dumps({"type": "unknown"}),
+    ])
+    # 청크 경계를 넘나드는 처리를 확인하기 위해 작은 청크 크기 사용
+    import bulk_import
+    result = bulk_import.import_stream(db, body.splitlines(keepends=True), chunk_size=3)
+
+    assert result["concepts_created"] == 1
+    assert result["concepts_skipped"] == 1
+    assert result["connections_created"] == 1
+    assert result["connections_skipped"] == 1
+    assert [error["line"] for error in result["errors"]] == [3, 4, 5, 8]
+    assert db.query(models.Connection).count() == 1
+
+def test_import_csv(client, db):
+    body = (
+        "type,name,description,source,target,relation,strength\n"
+        "concept,집합,\"원소의 모임, 정의\",,,,\n"
+        "concept,함수,,,,,\n"
+        "connection,,,함수,집합,선행 개념,0.5\n"
+        "connection,,,함수,집합,선행 개념,abc\n"
+    )
+    response = client.post("/api/import/graph?format=csv", content=body.encode("utf-8"))
+    data = response.json()
+    assert data["concepts_created"] == 2
+    assert data["connections_created"] == 1
+    assert data["errors"] == [{"line": 5, "error": "Invalid strength"}]
+
+    concept = db.query(models.Concept).filter(models.Concept.name == "집합").first()
+    assert concept.description == "원소의 모임, 정의"
+
+def test_failed_chunk_is_not_counted_as_created(db, monkeypatch):
+    import bulk_import
+    from sqlalchemy.exc import OperationalError
+
+    # 첫 청크의 커밋만 실패시킴
+    commit = db.commit
+    calls = []
+    def failing_commit():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OperationalError("COMMIT", {}, Exception("disk I/O error"))
+        commit()
+    monkeypatch.setattr(db, "commit", failing_commit)
+
+    body = "\n".join([
+        json.dumps({"type": "concept", "name": "집합"}),
+        json.dumps({"type": "concept", "name": "함수"}),
+        json.dumps({"type": "connection", "source": "함수", "target": "없는 개념"}),
+        json.dumps({"type": "concept", "name": "극한"}),
+    ])
+    result = bulk_import.import_stream(db, body.splitlines(keepends=True), chunk_size=3)
+
+    # 실패한 청크의 행은 생성/오류 중 한 번만 (오류로) 보고됨
+    assert result["concepts_created"] == 1
+    assert result["connections_created"] == 0
+    assert result["error_count"] == 3
+    assert result["errors"] == [{"line": line, "error": "Database error: OperationalError"} for line in (1, 2, 3)]
+    assert [name for (name,) in db.query(models.Concept.name)] == ["극한"]
@@ -0,0 +1,67 @@
+import models
+
+def setup_concepts(db):
+    concepts = [models.Concept(name=name, description=f"{name} 설명") for name in ("미분", "극한", "적분", "함수")]
+    db.add_all(concepts)
+    db.commit()
+    ids = {concept.name: concept.id for concept in concepts}
+    db.add_all([
+        models.Connection(source_id=ids["미분"], target_id=ids["극한"], relation="선행 개념", strength=0.9),
+        models.Connection(source_id=ids["적분"], target_id=ids["미분"], relation="선행 개념", strength=0.5),
+        models.Connection(source_id=ids["미분"], target_id=ids["적분"], relation=None, strength=0.3),
+    ])
+    db.commit()
+    return ids
+
+def test_read_concept_with_related_concepts(client, db):
+    ids = setup_concepts(db)
+    data = client.get(f"/api/concepts/{ids['미분']}").json()
+    assert data["name"] == "미분"
+    assert [(item["name"], item["relation"], item["direction"]) for item in data["related_concepts"]] == [
+        ("극한", "선행 개념", "outgoing"),
+        ("적분", "선행 개념", "incoming"),
+        ("적분", None, "outgoing"),
+    ]
+
+    data = client.get(f"/api/concepts/{ids['미분']}", params={"related_limit": 1}).json()
+    assert [item["name"] for item in data["related_concepts"]] == ["극한"]
+    assert client.get(f"/api/concepts/{ids['함수']}").json()["related_concepts"] == []
+    assert client.get(f"/api/concepts/{ids['미분']}", params={"related_limit": -1}).status_code == 400
+
+def test_related_concepts_use_one_query(client, db):
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    ids = setup_concepts(db)
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        client.get(f"/api/concepts/{ids['미분']}")
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+    # 개념 조회 1회 + 관련 개념 조회 1회
+    assert len([statement for statement in statements if statement.lstrip().upper().startswith("SELECT")]) == 2
+
+def test_create_app_builds_independent_instances():
+    from app import app, create_app
+
+    other = create_app()
+    assert other is not app
+    assert set(other.openapi()["paths"]) >= {"/", "/api/concepts/", "/api/stats/learning-stats"}
+
+def test_importing_app_defers_heavy_modules():
+    import os
+    import subprocess
+    import sys
+
+    # 새 인터프리터에서 app 모듈만 임포트하면 라우터와 무거운 의존성(numpy, requests)을 불러오지 않음
+    heavy = ["numpy", "graph_analytics", "requests", "routers.llm", "routers.graph"]
+    probe = f"import sys, app; print([name for name in {heavy!r} if name in sys.modules])"
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", probe], cwd=backend_dir, capture_output=True, text=True, check=True,
+        env={**os.environ, "DATABASE_URL": "sqlite://"},
+    )
+    assert result.stdout.strip() == "[]"
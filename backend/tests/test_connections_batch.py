@@ -0,0 +1,119 @@
+import models
+
+def setup_concepts(db, names=("집합", "함수", "극한", "미분")):
+    concepts = [models.Concept(name=name, description=f"{name} 설명") for name in names]
+    db.add_all(concepts)
+    db.commit()
+    return {concept.name: concept.id for concept in concepts}
+
+def test_batch_create_update_delete(client, db):
+    ids = setup_concepts(db)
+    existing = models.Connection(source_id=ids["함수"], target_id=ids["집합"], relation="선행 개념")
+    db.add(existing)
+    db.commit()
+
+    response = client.post("/api/connections/batch", json={"operations": [
+        {"op": "create", "source_id": ids["극한"], "target_id": ids["함수"], "relation": "선행 개념", "strength": 0.8},
+        {"op": "create", "source_id": ids["미분"], "target_id": ids["극한"]},
+        {"op": "update", "id": existing.id, "strength": 0.5},
+    ]})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["applied"] == 3
+    assert data["failed"] == 0
+    assert data["results"][0]["connection"]["strength"] == 0.8
+    assert data["results"][1]["connection"]["strength"] == 1.0
+    assert data["results"][2]["connection"]["relation"] == "선행 개념"
+
+    created_id = data["results"][0]["connection"]["id"]
+    response = client.post("/api/connections/batch", json={"operations": [
+        {"op": "delete", "id": created_id},
+        {"op": "create", "source_id": ids["극한"], "target_id": ids["함수"], "relation": "관련 개념"},
+    ]})
+    assert response.json()["applied"] == 2
+
+    graph = client.get("/api/graph").json()
+    edges = {(edge[1], edge[2]): (edge[3], edge[4]) for edge in graph["edges"]}
+    assert edges == {
+        (ids["함수"], ids["집합"]): ("선행 개념", 0.5),
+        (ids["미분"], ids["극한"]): (None, 1.0),
+        (ids["극한"], ids["함수"]): ("관련 개념", 1.0),
+    }
+
+def test_batch_reports_item_errors(client, db):
+    ids = setup_concepts(db)
+    response = client.post("/api/connections/batch", json={"operations": [
+        {"op": "create", "source_id": ids["함수"], "target_id": ids["집합"]},
+        {"op": "create", "source_id": ids["함수"], "target_id": ids["집합"]},
+        {"op": "create", "source_id": ids["함수"], "target_id": 9999},
+        {"op": "create", "source_id": ids["함수"], "target_id": ids["함수"]},
+        {"op": "delete", "id": 9999},
+        {"op": "move"},
+    ]})
+    data = response.json()
+    assert data["applied"] == 1
+    assert data["failed"] == 5
+    assert [result["error"] for result in data["results"]] == [
+        None,
+        "Connection already exists",
+        "Target concept with id 9999 not found",
+        "Cannot create a connection to itself",
+        "Connection with id 9999 not found",
+        "Operation must be one of create, update, delete",
+    ]
+    assert db.query(models.Connection).count() == 1
+
+def test_batch_atomic_rolls_back(client, db):
+    ids = setup_concepts(db)
+    response = client.post("/api/connections/batch", json={"atomic": True, "operations": [
+        {"op": "create", "source_id": ids["함수"], "target_id": ids["집합"]},
+        {"op": "update", "id": 9999, "strength": 0.1},
+    ]})
+    data = response.json()
+    assert data["applied"] == 0
+    assert [result["success"] for result in data["results"]] == [False, False]
+    assert db.query(models.Connection).count() == 0
+    assert client.get("/api/graph").json()["edges"] == []
+
+def test_batch_update_then_delete_reports_no_connection(client, db):
+    ids = setup_concepts(db)
+    existing = models.Connection(source_id=ids["함수"], target_id=ids["집합"])
+    db.add(existing)
+    db.commit()
+
+    response = client.post("/api/connections/batch", json={"operations": [
+        {"op": "update", "id": existing.id, "strength": 0.5},
+        {"op": "delete", "id": existing.id},
+    ]})
+    data = response.json()
+    assert data["applied"] == 2
+    # 수정 결과는 같은 요청에서 삭제된 연결을 담지 않음
+    assert [(result["success"], result["connection"]) for result in data["results"]] == [(True, None), (True, None)]
+    assert db.query(models.Connection).count() == 0
+
+def test_batch_conflict_fails_only_that_operation(client, db, monkeypatch):
+    import crud
+
+    ids = setup_concepts(db)
+    existing = models.Connection(source_id=ids["함수"], target_id=ids["집합"])
+    db.add(existing)
+    db.commit()
+
+    # 중복 확인 뒤 다른 요청이 같은 연결을 만든 상황: 미리 조회한 쌍에 없어 INSERT에서 충돌
+    async def no_existing_pairs(db, pairs):
+        return {}
+    monkeypatch.setattr(crud, "get_existing_connection_pairs", no_existing_pairs)
+
+    response = client.post("/api/connections/batch", json={"operations": [
+        {"op": "create", "source_id": ids["극한"], "target_id": ids["함수"]},
+        {"op": "create", "source_id": ids["함수"], "target_id": ids["집합"]},
+        {"op": "update", "id": existing.id, "strength": 0.5},
+    ]})
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["applied"], data["failed"]) == (2, 1)
+    assert [result["error"] for result in data["results"]] == [None, "Connection already exists", None]
+    assert data["results"][2]["connection"]["strength"] == 0.5
+
+    edges = {(edge[1], edge[2]): edge[4] for edge in client.get("/api/graph").json()["edges"]}
+    assert edges == {(ids["극한"], ids["함수"]): 1.0, (ids["함수"], ids["집합"]): 0.5}
@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import StaticPool
+
+from config import Settings
+from database import create_db_engine, create_read_engine, is_statement_timeout, to_read_only_url
+
+def test_file_engine_applies_pragmas(tmp_path):
+    config = Settings(SQLITE_CACHE_SIZE=-2048, SQLITE_BUSY_TIMEOUT_MS=1234)
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}", config)
+    with engine.connect() as connection:
+        pragma = lambda name: connection.execute(text(f"PRAGMA {name}")).scalar()
+        assert pragma("journal_mode") == "wal"
+        # NORMAL == 1
+        assert pragma("synchronous") == 1
+        assert pragma("cache_size") == -2048
+        assert pragma("busy_timeout") == 1234
+        assert pragma("foreign_keys") == 1
+    assert engine.pool.size() == config.DB_POOL_SIZE
+    engine.dispose()
+
+def test_journal_mode_is_configurable(tmp_path):
+    config = Settings(SQLITE_JOURNAL_MODE="DELETE", SQLITE_FOREIGN_KEYS=False)
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}", config)
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+        assert connection.execute(text("PRAGMA foreign_keys")).scalar() == 0
+    engine.dispose()
+
+def test_memory_engine_shares_one_connection():
+    engine = create_db_engine("sqlite://")
+    assert isinstance(engine.pool, StaticPool)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE t (x INTEGER)"))
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM t")).scalar() == 0
+
+def test_read_only_url():
+    assert to_read_only_url("sqlite:///./test.db") == "sqlite:///file:./test.db?mode=ro&uri=true"
+    assert to_read_only_url("sqlite://") == "sqlite://"
+    assert to_read_only_url("postgresql://localhost/db") == "postgresql://localhost/db"
+
+def test_read_engine_rejects_writes(tmp_path):
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    engine = create_db_engine(url)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE t (x INTEGER)"))
+        connection.execute(text("INSERT INTO t VALUES (1)"))
+
+    config = Settings(READ_DB_POOL_SIZE=2)
+    read_engine = create_read_engine(url, config)
+    with read_engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM t")).scalar() == 1
+        assert connection.execute(text("PRAGMA query_only")).scalar() == 1
+        with pytest.raises(OperationalError):
+            connection.execute(text("INSERT INTO t VALUES (2)"))
+    assert read_engine.pool.size() == 2
+    read_engine.dispose()
+    engine.dispose()
+
+def test_read_engine_statement_timeout(tmp_path):
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    engine = create_db_engine(url)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE t (x INTEGER)"))
+
+    read_engine = create_read_engine(url, Settings(READ_STATEMENT_TIMEOUT_MS=50))
+    slow = text("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT count(*) FROM n")
+    with read_engine.connect() as connection:
+        with pytest.raises(OperationalError) as error:
+            connection.execute(slow)
+        assert is_statement_timeout(error.value)
+        # 제한 시간은 문장마다 새로 시작됨
+        assert connection.execute(text("SELECT count(*) FROM t")).scalar() == 0
+    read_engine.dispose()
+    engine.dispose()
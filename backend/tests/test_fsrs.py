@@ -0,0 +1,83 @@
+import math
+
+import numpy as np
+import pytest
+
+import fsrs
+
+def replay(parameters, card_ids, difficulties, days):
+    # 복습 한 건씩 반영하는 경로로 계산한 로그 손실 합
+    loss = 0.0
+    states = {}
+    for card_id, difficulty, day in zip(card_ids.tolist(), difficulties.tolist(), days.tolist()):
+        if card_id in states:
+            state, last_day = states[card_id]
+            r = fsrs.retrievability(day - last_day, state.stability)
+            loss -= math.log(r if difficulty >= 3 else 1 - r)
+            state = fsrs.next_memory_state(state, day - last_day, difficulty, parameters)
+        else:
+            state = fsrs.next_memory_state(None, 0, difficulty, parameters)
+        states[card_id] = (state, day)
+    return loss
+
+def simulate(parameters, cards, reviews_per_card, seed=0):
+    # 주어진 파라미터의 기억 모델을 따르는 학습자가 예정일 전후에 복습한 기록
+    rng = np.random.default_rng(seed)
+    card_ids, difficulties, days = [], [], []
+    for card_id in range(cards):
+        day, state = 0.0, None
+        for _ in range(reviews_per_card):
+            if state is None:
+                difficulty = int(rng.integers(1, 6))
+            elif rng.random() < fsrs.retrievability(day - days[-1], state.stability):
+                difficulty = int(rng.choice([3, 4, 5], p=[0.2, 0.6, 0.2]))
+            else:
+                difficulty = 1
+            state = fsrs.next_memory_state(state, 0 if state is None else day - days[-1], difficulty, parameters)
+            card_ids.append(card_id)
+            difficulties.append(difficulty)
+            days.append(day)
+            day += fsrs.next_interval(state.stability) * rng.uniform(0.5, 1.5)
+    return np.array(card_ids), np.array(difficulties), np.array(days)
+
+def test_vectorized_replay_matches_single_review_path():
+    rng = np.random.default_rng(3)
+    card_ids = np.repeat(np.arange(6), [2, 5, 3, 7, 1, 4])
+    difficulties = rng.integers(1, 6, len(card_ids))
+    days = np.cumsum(rng.uniform(0, 20, len(card_ids)))
+
+    # 한 번만 복습한 카드는 빠지고, 카드가 여러 배치로 나뉘어도 손실 합은 같음
+    batches = fsrs.make_batches(np, card_ids, difficulties, days, batch_cards=2)
+    assert len(batches) == 3
+    assert sum(batch.review_count for batch in batches) == len(card_ids) - 6
+
+    weights = np.array([fsrs.DEFAULT_PARAMETERS, fsrs.DEFAULT_PARAMETERS])
+    weights[1, 8] += 0.3
+    losses = sum(fsrs._forward(np, weights, batch) for batch in batches)
+    assert losses[0] == pytest.approx(replay(fsrs.DEFAULT_PARAMETERS, card_ids, difficulties, days))
+    assert losses[1] == pytest.approx(replay(tuple(weights[1]), card_ids, difficulties, days))
+
+def test_fit_recovers_better_parameters():
+    true_parameters = list(fsrs.DEFAULT_PARAMETERS)
+    true_parameters[0:4] = [1.0, 2.8, 5.5, 16.0]
+    true_parameters[8] = 1.9
+    card_ids, difficulties, days = simulate(true_parameters, cards=800, reviews_per_card=8)
+
+    batches = fsrs.make_batches(np, card_ids, difficulties, days, batch_cards=400)
+    result = fsrs.fit_parameters(np, batches, iterations=60)
+    assert result.review_count == 800 * 7
+    assert result.loss < result.default_loss
+    true_loss = sum(fsrs._forward(np, np.array([true_parameters]), batch)[0] for batch in batches) / result.review_count
+    assert result.loss - true_loss < (result.default_loss - true_loss) / 2
+    # 첫 복습 안정성이 실제 값 쪽으로 이동
+    assert result.parameters[2] > fsrs.DEFAULT_PARAMETERS[2]
+    for value, (lower, upper) in zip(result.parameters, fsrs.PARAMETER_BOUNDS):
+        assert lower <= value <= upper
+
+def test_fit_requires_repeated_reviews():
+    batches = fsrs.make_batches(
+        np, np.array([1, 2]), np.array([3, 4]), np.array([0.0, 1.0]), 10
+    )
+    assert batches == []
+    with pytest.raises(ValueError):
+        fsrs.fit_parameters(np, batches)
@@ -0,0 +1,359 @@
+import models
+import graph_analytics
+import graph_components
+import graph_index
+import prerequisites
+
+def setup_graph(db):
+    names = ["집합", "함수", "극한", "미분", "적분"]
+    concepts = [models.Concept(name=name, description=f"{name} 설명") for name in names]
+    db.add_all(concepts)
+    db.commit()
+
+    ids = {concept.name: concept.id for concept in concepts}
+    edges = [
+        ("함수", "집합", "선행 개념", 1.0),
+        ("극한", "함수", "선행 개념", 0.8),
+        ("미분", "극한", "선행 개념", 0.9),
+        ("적분", "미분", "선행 개념", 0.5),
+        ("미분", "적분", "유사 개념", 0.3),
+    ]
+    for source, target, relation, strength in edges:
+        db.add(models.Connection(
+            source_id=ids[source], target_id=ids[target], relation=relation, strength=strength
+        ))
+    db.commit()
+    return ids
+
+def test_read_graph_snapshot(client, db):
+    ids = setup_graph(db)
+
+    response = client.get("/api/graph")
+    assert response.status_code == 200
+    data = response.json()
+
+    assert sorted(node[1] for node in data["nodes"]) == sorted(ids)
+    assert len(data["edges"]) == 5
+    edge = next(e for e in data["edges"] if e[1] == ids["함수"])
+    assert edge[2:] == [ids["집합"], "선행 개념", 1.0]
+
+def test_graph_snapshot_follows_writes(client, db):
+    ids = setup_graph(db)
+    assert len(client.get("/api/graph").json()["edges"]) == 5
+
+    # API를 통한 연결 생성은 다음 조회에 반영되어야 함
+    response = client.post("/api/connections/", json={
+        "source_id": ids["적분"], "target_id": ids["집합"], "relation": "선행 개념"
+    })
+    assert response.status_code == 200
+    assert len(client.get("/api/graph").json()["edges"]) == 6
+
+    # 연결 수정도 반영되어야 함
+    connection_id = response.json()["id"]
+    client.put(f"/api/connections/{connection_id}", json={"relation": "관련 개념"})
+    edges = client.get("/api/graph").json()["edges"]
+    assert next(e for e in edges if e[0] == connection_id)[3] == "관련 개념"
+
+    # 개념 삭제 시 해당 노드와 연결이 사라져야 함
+    client.delete(f"/api/concepts/{ids['집합']}")
+    data = client.get("/api/graph").json()
+    assert ids["집합"] not in {node[0] for node in data["nodes"]}
+    assert all(ids["집합"] not in edge[1:3] for edge in data["edges"])
+
+def test_read_neighborhood(client, db):
+    ids = setup_graph(db)
+
+    # 나가는 방향 2홉: 미분 -> 극한 -> 함수, 미분 -> 적분 -> 미분
+    response = client.get(f"/api/graph/neighborhood/{ids['미분']}?depth=2&direction=outgoing")
+    assert response.status_code == 200
+    data = response.json()
+    depths = {node["name"]: node["depth"] for node in data["nodes"]}
+    assert depths == {"미분": 0, "극한": 1, "적분": 1, "함수": 2}
+    assert len(data["edges"]) == 4
+    assert data["truncated"] is False
+
+    # 관계 필터와 최소 강도
+    response = client.get(
+        f"/api/graph/neighborhood/{ids['미분']}",
+        params={"depth": 3, "relation": "선행 개념", "min_strength": 0.6},
+    )
+    names = {node["name"] for node in response.json()["nodes"]}
+    assert names == {"미분", "극한", "함수", "집합"}
+
+    # 노드 상한
+    response = client.get(f"/api/graph/neighborhood/{ids['미분']}?depth=3&max_nodes=2")
+    data = response.json()
+    assert len(data["nodes"]) == 2
+    assert data["truncated"] is True
+
+def test_read_neighborhood_validation(client, db):
+    ids = setup_graph(db)
+    assert client.get(f"/api/graph/neighborhood/{ids['미분']}?depth=0").status_code == 400
+    assert client.get(f"/api/graph/neighborhood/{ids['미분']}?direction=up").status_code == 400
+    assert client.get("/api/graph/neighborhood/9999").status_code == 404
+
+def test_read_learning_path(client, db):
+    ids = setup_graph(db)
+
+    response = client.get("/api/graph/path", params={"source_id": ids["적분"], "target_id": ids["집합"]})
+    assert response.status_code == 200
+    paths = response.json()["paths"]
+    assert len(paths) == 1
+    assert [node["name"] for node in paths[0]["nodes"]] == ["적분", "미분", "극한", "함수", "집합"]
+    assert [edge["relation"] for edge in paths[0]["edges"]] == ["선행 개념"] * 4
+    # 1/0.5 + 1/0.9 + 1/0.8 + 1/1.0
+    assert abs(paths[0]["cost"] - (2 + 1 / 0.9 + 1.25 + 1)) < 1e-4
+
+    # 방향이 없는 경로가 존재하지 않으면 빈 목록
+    response = client.get("/api/graph/path", params={"source_id": ids["집합"], "target_id": ids["적분"]})
+    assert response.json()["paths"] == []
+
+def test_read_k_shortest_paths(client, db):
+    ids = setup_graph(db)
+    db.add(models.Connection(source_id=ids["적분"], target_id=ids["함수"], relation="선행 개념", strength=0.2))
+    db.commit()
+
+    response = client.get("/api/graph/path", params={
+        "source_id": ids["적분"], "target_id": ids["집합"], "k": 3
+    })
+    paths = response.json()["paths"]
+    assert [[node["name"] for node in path["nodes"]] for path in paths] == [
+        ["적분", "미분", "극한", "함수", "집합"],
+        ["적분", "함수", "집합"],
+    ]
+    assert paths[0]["cost"] <= paths[1]["cost"]
+
+    # 비용 상한을 넘는 경로는 제외
+    response = client.get("/api/graph/path", params={
+        "source_id": ids["적분"], "target_id": ids["집합"], "k": 3, "max_cost": 5.5
+    })
+    assert len(response.json()["paths"]) == 1
+
+def test_graph_index_applies_commits_in_place(client, db):
+    ids = setup_graph(db)
+    index = graph_index.get_graph_index(db)
+    version = index.version
+
+    response = client.post("/api/connections/", json={
+        "source_id": ids["적분"], "target_id": ids["집합"], "relation": "선행 개념", "strength": 0.4
+    })
+    connection_id = response.json()["id"]
+
+    # 재구성 없이 같은 인덱스 객체에 반영되고 version이 증가해야 함
+    assert graph_index.get_graph_index(db) is index
+    assert index.version > version
+    assert index.edges[connection_id] == (ids["적분"], ids["집합"], "선행 개념", 0.4)
+
+    client.put(f"/api/connections/{connection_id}", json={"strength": 0.7})
+    assert index.edges[connection_id][3] == 0.7
+
+    client.put(f"/api/concepts/{ids['집합']}", json={"name": "집합론"})
+    assert index.nodes[ids["집합"]] == "집합론"
+
+    client.delete(f"/api/connections/{connection_id}")
+    assert connection_id not in index.edges
+    assert graph_index.get_graph_index(db) is index
+
+def test_graph_index_notices_writes_from_other_processes(client, db):
+    from database import create_db_engine
+
+    ids = setup_graph(db)
+    index = graph_index.get_graph_index(db)
+    etag = client.get("/api/graph").headers["ETag"]
+
+    # 다른 워커나 가져오기 도구처럼 별도 엔진으로 직접 쓴 변경
+    other = create_db_engine(str(db.get_bind().url))
+    try:
+        with other.begin() as connection:
+            connection.exec_driver_sql("INSERT INTO concepts (name, description) VALUES ('수열', '')")
+            new_id = connection.exec_driver_sql("SELECT id FROM concepts WHERE name = '수열'").scalar()
+            connection.exec_driver_sql(
+                "INSERT INTO connections (source_id, target_id, relation, strength) VALUES (?, ?, '선행 개념', 1.0)",
+                (ids["극한"], new_id),
+            )
+    finally:
+        other.dispose()
+
+    response = client.get("/api/graph")
+    assert response.headers["ETag"] != etag
+    data = response.json()
+    assert [new_id, "수열"] in data["nodes"]
+    assert any(edge[1:3] == [ids["극한"], new_id] for edge in data["edges"])
+    assert graph_index.get_graph_index(db) is not index
+    response = client.get("/api/graph/prerequisites", params={"concept_id": ids["극한"]})
+    assert response.status_code == 200
+
+    # 이 프로세스의 세션으로 쓴 변경은 다시 구성하지 않고 제자리에서 반영
+    index = graph_index.get_graph_index(db)
+    client.delete(f"/api/concepts/{new_id}")
+    assert graph_index.get_graph_index(db) is index
+    assert new_id not in index.nodes
+
+def test_read_connections(client, db):
+    ids = setup_graph(db)
+
+    response = client.get("/api/connections/", params={"source_id": ids["미분"]})
+    assert response.status_code == 200
+    assert {c["target_id"] for c in response.json()} == {ids["극한"], ids["적분"]}
+    assert all(c["created_at"] for c in response.json())
+
+    response = client.get("/api/connections/", params={"skip": 1, "limit": 2})
+    assert [c["id"] for c in response.json()] == [2, 3]
+
+    response = client.get(f"/api/connections/concept/{ids['적분']}")
+    assert len(response.json()) == 2
+
+    # 다른 프로세스(워커, 가져오기 도구)가 세션을 거치지 않고 추가한 연결도 목록에 보임
+    graph_index.get_graph_index(db)
+    with db.get_bind().begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO connections (source_id, target_id, relation, strength) VALUES (?, ?, '관련 개념', 1.0)",
+            (ids["집합"], ids["적분"]),
+        )
+    response = client.get("/api/connections/", params={"source_id": ids["집합"]})
+    assert [c["target_id"] for c in response.json()] == [ids["적분"]]
+    response = client.get(f"/api/connections/concept/{ids['적분']}")
+    assert len(response.json()) == 3
+
+def test_read_graph_etag(client, db):
+    setup_graph(db)
+    response = client.get("/api/graph")
+    etag = response.headers["etag"]
+    assert client.get("/api/graph", headers={"If-None-Match": etag}).status_code == 304
+
+def test_read_centrality(client, db):
+    ids = setup_graph(db)
+
+    response = client.get("/api/graph/centrality")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["items"]) == 5
+    scores = {item["name"]: item for item in data["items"]}
+
+    # 모든 선행 관계가 모이는 "집합"이 가장 높은 PageRank
+    assert data["items"][0]["name"] == "집합"
+    assert abs(sum(item["pagerank"] for item in data["items"]) - 1.0) < 1e-6
+    assert scores["미분"]["out_degree"] == 0.9 + 0.3
+    # 경로 중간에 있는 개념만 매개 중심성을 가짐
+    assert scores["극한"]["betweenness"] > 0
+    assert scores["집합"]["betweenness"] == 0
+
+    # 함수: 들어오는 0.8 + 나가는 1.0
+    response = client.get("/api/graph/centrality", params={"sort": "degree", "limit": 1})
+    assert [item["name"] for item in response.json()["items"]] == ["함수"]
+
+    assert client.get("/api/graph/centrality?sort=closeness").status_code == 400
+
+def test_centrality_cached_per_version(client, db):
+    ids = setup_graph(db)
+    index = graph_index.get_graph_index(db)
+
+    first = graph_analytics.get_centrality(index)
+    assert graph_analytics.get_centrality(index) is first
+
+    client.post("/api/connections/", json={"source_id": ids["집합"], "target_id": ids["적분"]})
+    second = graph_analytics.get_centrality(index)
+    assert second is not first
+    assert second.version == index.version
+
+def test_read_prerequisite_order(client, db):
+    ids = setup_graph(db)
+
+    response = client.get("/api/graph/prerequisites", params={"concept_id": ids["적분"]})
+    assert response.status_code == 200
+    data = response.json()
+    assert [node["name"] for node in data["order"]] == ["집합", "함수", "극한", "미분", "적분"]
+    assert data["cycles"] == []
+
+    response = client.get("/api/graph/prerequisites", params={"concept_id": ids["극한"]})
+    assert [node["name"] for node in response.json()["order"]] == ["집합", "함수", "극한"]
+
+    # "후행 개념"은 소스가 먼저
+    client.post("/api/concepts/", json={"name": "급수", "description": "급수 설명"})
+    series_id = client.get("/api/graph").json()["nodes"][-1][0]
+    client.post("/api/connections/", json={
+        "source_id": ids["극한"], "target_id": series_id, "relation": "후행 개념"
+    })
+    response = client.get("/api/graph/prerequisites", params={"concept_id": series_id})
+    assert [node["name"] for node in response.json()["order"]] == ["집합", "함수", "극한", "급수"]
+
+def test_prerequisite_order_drops_deleted_concept(client, db):
+    ids = setup_graph(db)
+    assert client.get("/api/graph/prerequisites").status_code == 200
+
+    # 캐시된 순서에서도 삭제된 개념과 그 선행 관계가 빠짐
+    assert client.delete(f"/api/concepts/{ids['집합']}").status_code == 200
+    response = client.get("/api/graph/prerequisites")
+    assert response.status_code == 200
+    assert [node["name"] for node in response.json()["order"]] == ["함수", "극한", "미분", "적분"]
+
+    data = client.get("/api/graph/prerequisites", params={"concept_id": ids["함수"]}).json()
+    assert [node["name"] for node in data["order"]] == ["함수"]
+
+def test_prerequisite_cycles_are_reported_and_cleared(client, db):
+    ids = setup_graph(db)
+    index = graph_index.get_graph_index(db)
+    order = prerequisites.get_prerequisite_order(index)
+
+    # 적분이 집합의 선행 개념이 되면 순환
+    response = client.post("/api/connections/", json={
+        "source_id": ids["집합"], "target_id": ids["적분"], "relation": "선행 개념"
+    })
+    cycle_connection_id = response.json()["id"]
+    # 증분 반영: 같은 순서 객체가 유지되어야 함
+    assert prerequisites.get_prerequisite_order(index) is order
+    assert cycle_connection_id in order.blocked
+
+    data = client.get("/api/graph/prerequisites", params={"concept_id": ids["미분"]}).json()
+    assert [[node["name"] for node in cycle] for cycle in data["cycles"]] == [
+        ["집합", "함수", "극한", "미분", "적분"]
+    ]
+
+    client.delete(f"/api/connections/{cycle_connection_id}")
+    data = client.get("/api/graph/prerequisites", params={"concept_id": ids["적분"]}).json()
+    assert data["cycles"] == []
+
+    # 순서를 뒤집어야 하는 관계도 반영 (적분 -> 미분 삭제, 미분 -> 적분을 선행 관계로 수정)
+    client.delete("/api/connections/4")
+    client.put("/api/connections/5", json={"relation": "선행 개념"})
+    data = client.get("/api/graph/prerequisites", params={"concept_id": ids["미분"]}).json()
+    assert [node["name"] for node in data["order"]] == ["집합", "함수", "극한", "적분", "미분"]
+    assert data["cycles"] == []
+
+def test_read_components(client, db):
+    ids = setup_graph(db)
+    client.post("/api/concepts/", json={"name": "행렬", "description": "행렬 설명"})
+    client.post("/api/concepts/", json={"name": "벡터", "description": "벡터 설명"})
+    client.post("/api/concepts/", json={"name": "확률", "description": "확률 설명"})
+    response = client.get("/api/concepts/").json()
+    ids.update({concept["name"]: concept["id"] for concept in response})
+    client.post("/api/connections/", json={"source_id": ids["행렬"], "target_id": ids["벡터"]})
+
+    data = client.get("/api/graph/components").json()
+    assert data["component_count"] == 3
+    assert data["isolated_count"] == 1
+    assert [group["size"] for group in data["components"]] == [5, 2, 1]
+    assert {node["name"] for node in data["components"][1]["nodes"]} == {"행렬", "벡터"}
+    # 커뮤니티는 연결 요소를 넘지 않음
+    for community in data["communities"]:
+        names = {node["name"] for node in community["nodes"]}
+        assert any(names <= {node["name"] for node in group["nodes"]} for group in data["components"])
+
+    data = client.get("/api/graph/components", params={"min_size": 2}).json()
+    assert [group["size"] for group in data["components"]] == [5, 2]
+
+def test_components_follow_connection_removal(client, db):
+    ids = setup_graph(db)
+    index = graph_index.get_graph_index(db)
+    assert len(graph_components.get_components(index)) == 1
+
+    # 미분 <-> 적분은 두 연결로 이어져 있어 하나를 지워도 그대로
+    client.delete("/api/connections/5")
+    assert len(graph_components.get_components(index)) == 1
+
+    client.delete("/api/connections/4")
+    components = graph_components.get_components(index)
+    assert components == [sorted(ids[name] for name in ("집합", "함수", "극한", "미분")), [ids["적분"]]]
+
+    client.post("/api/connections/", json={"source_id": ids["적분"], "target_id": ids["집합"]})
+    assert len(graph_components.get_components(index)) == 1
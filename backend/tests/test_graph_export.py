@@ -0,0 +1,100 @@
+import json
+import xml.etree.ElementTree as ET
+
+from sqlalchemy.orm import Session, aliased
+
+import bulk_import
+import graph_export
+import models
+from database import create_db_engine
+
+def setup_graph(db):
+    concepts = [models.Concept(name=name, description=f"{name} & 설명") for name in ("집합", "함수", "극한")]
+    db.add_all(concepts)
+    db.commit()
+    ids = {concept.name: concept.id for concept in concepts}
+    db.add_all([
+        models.Connection(source_id=ids["함수"], target_id=ids["집합"], relation="선행 개념", strength=0.9),
+        models.Connection(source_id=ids["극한"], target_id=ids["함수"], relation="선행 <개념>", strength=0.5),
+    ])
+    db.commit()
+    return ids
+
+def test_export_ndjson(client, db):
+    ids = setup_graph(db)
+    response = client.get("/api/export/graph")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["type"] for row in rows] == ["concept"] * 3 + ["connection"] * 2
+    assert rows[0]["name"] == "집합"
+    assert rows[3]["source_id"] == ids["함수"]
+    assert rows[3]["strength"] == 0.9
+
+def test_export_graphml(client, db):
+    ids = setup_graph(db)
+    response = client.get("/api/export/graph?format=graphml")
+    root = ET.fromstring(response.content)
+    ns = {"g": "http://graphml.graphdrawing.org/xmlns"}
+    nodes = root.findall("g:graph/g:node", ns)
+    edges = root.findall("g:graph/g:edge", ns)
+    assert len(nodes) == 3
+    assert nodes[0].find("g:data[@key='description']", ns).text == "집합 & 설명"
+    assert edges[1].get("source") == f"n{ids['극한']}"
+    assert edges[1].find("g:data[@key='relation']", ns).text == "선행 <개념>"
+
+def test_export_edgelist_in_chunks(client, db):
+    ids = setup_graph(db)
+    chunks = list(graph_export.export_graph(db.get_bind(), "edgelist", chunk_size=1))
+    assert len(chunks) == 2
+    assert b"".join(chunks).decode() == f"{ids['함수']}\t{ids['집합']}\t0.9\n{ids['극한']}\t{ids['함수']}\t0.5\n"
+
+    assert client.get("/api/export/graph?format=gexf").status_code == 400
+
+def test_exports_skip_connections_to_deleted_concepts(client, db):
+    ids = setup_graph(db)
+    # 개념을 지우면 그 개념을 가리키던 연결은 끝점이 빈 채로 남음
+    client.delete(f"/api/concepts/{ids['집합']}")
+
+    edgelist = client.get("/api/export/graph?format=edgelist").text
+    assert edgelist == f"{ids['극한']}\t{ids['함수']}\t0.5\n"
+
+    root = ET.fromstring(client.get("/api/export/graph?format=graphml").content)
+    ns = {"g": "http://graphml.graphdrawing.org/xmlns"}
+    nodes = {node.get("id") for node in root.findall("g:graph/g:node", ns)}
+    edges = root.findall("g:graph/g:edge", ns)
+    assert [(edge.get("source"), edge.get("target")) for edge in edges] == [(f"n{ids['극한']}", f"n{ids['함수']}")]
+    assert all(edge.get("source") in nodes and edge.get("target") in nodes for edge in edges)
+
+def test_ndjson_export_round_trips_through_import(client, db):
+    setup_graph(db)
+    exported = client.get("/api/export/graph").text
+    db.query(models.Connection).delete()
+    db.commit()
+
+    result = bulk_import.import_stream(db, exported.splitlines(keepends=True))
+    assert result["concepts_skipped"] == 3
+    assert result["connections_created"] == 2
+
+def test_ndjson_export_restores_into_empty_database(client, db, tmp_path):
+    ids = setup_graph(db)
+    # 삭제로 ID에 빈자리가 생긴 그래프
+    client.delete(f"/api/concepts/{ids['집합']}")
+    client.post("/api/concepts/", json={"name": "미분", "description": "미분 설명"})
+    client.post("/api/connections/", json={"source_id": ids["함수"], "target_id": ids["극한"] + 1})
+    exported = client.get("/api/export/graph").text
+
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'restore.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    with Session(engine) as restore:
+        result = bulk_import.import_stream(restore, exported.splitlines(keepends=True))
+        assert result["concepts_created"] == 3
+        assert result["connections_created"] == 2
+        assert result["errors"] == []
+        source, target = aliased(models.Concept), aliased(models.Concept)
+        edges = restore.query(source.name, target.name).select_from(models.Connection).join(
+            source, source.id == models.Connection.source_id
+        ).join(target, target.id == models.Connection.target_id).order_by(models.Connection.id).all()
+    engine.dispose()
+    assert edges == [("극한", "함수"), ("함수", "미분")]
@@ -0,0 +1,110 @@
+from sqlalchemy import create_engine, event, inspect
+
+import migrations
+
+OLD_SCHEMA = [
+    "CREATE TABLE concepts (id INTEGER PRIMARY KEY, name VARCHAR UNIQUE, description TEXT, "
+    "created_at DATETIME, updated_at DATETIME)",
+    "CREATE TABLE connections (id INTEGER PRIMARY KEY, source_id INTEGER, target_id INTEGER, "
+    "relation VARCHAR, strength FLOAT, created_at DATETIME)",
+    "CREATE TABLE cards (id INTEGER PRIMARY KEY, concept_id INTEGER, question TEXT, answer TEXT, "
+    "explanation TEXT, created_at DATETIME, updated_at DATETIME)",
+    "CREATE TABLE reviews (id INTEGER PRIMARY KEY, card_id INTEGER, difficulty INTEGER, "
+    "next_review_date DATETIME, created_at DATETIME)",
+    "CREATE TABLE notes (id INTEGER PRIMARY KEY, concept_id INTEGER, title VARCHAR, content TEXT, "
+    "created_at DATETIME, updated_at DATETIME)",
+    "CREATE TABLE learning_history (id INTEGER PRIMARY KEY, concept_id INTEGER, activity_type VARCHAR, "
+    "created_at DATETIME)",
+]
+
+LONG_NOTE = " ".join(f"원소{i % 30}" for i in range(5000)) + " 공집합"
+
+def index_names(engine, table):
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+def test_upgrade_existing_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        for statement in OLD_SCHEMA:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql("INSERT INTO concepts (id, name) VALUES (1, '집합'), (2, '함수')")
+        # 유니크 제약 이전에 쌓인 중복 연결
+        connection.exec_driver_sql(
+            "INSERT INTO connections (id, source_id, target_id) VALUES (1, 2, 1), (2, 2, 1), (3, 1, 2)"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO notes (id, concept_id, title, content) VALUES (1, 1, '짧은 노트', '집합 정의'), (2, 1, '긴 노트', ?)",
+            (LONG_NOTE,),
+        )
+        connection.exec_driver_sql("INSERT INTO cards (id, concept_id, question) VALUES (1, 1, 'Q'), (2, 1, 'Q')")
+        # 카드 1: 성공 두 번 뒤 실패 (lapse 1회), 카드 2: 성공 한 번
+        connection.exec_driver_sql(
+            "INSERT INTO reviews (id, card_id, difficulty, next_review_date, created_at) VALUES "
+            "(1, 1, 4, '2024-01-02 00:00:00', '2024-01-01 00:00:00'), "
+            "(2, 1, 3, '2024-01-08 00:00:00', '2024-01-02 00:00:00'), "
+            "(3, 1, 1, '2024-01-09 00:00:00', '2024-01-08 00:00:00'), "
+            "(4, 2, 5, '2024-01-07 00:00:00', '2024-01-01 00:00:00')"
+        )
+
+    assert migrations.init_db(engine) == migrations.latest_version()
+
+    assert "uq_connections_source_target" in index_names(engine, "connections")
+    assert "ix_reviews_next_review_date" in index_names(engine, "reviews")
+    assert "ix_learning_history_concept_id_created_at" in index_names(engine, "learning_history")
+    with engine.connect() as connection:
+        assert [row[0] for row in connection.exec_driver_sql("SELECT id FROM connections ORDER BY id")] == [1, 3]
+        # 기존 행으로 검색 색인을 채움
+        assert connection.exec_driver_sql(
+            "SELECT rowid FROM concepts_fts WHERE concepts_fts MATCH '\"함수\"'"
+        ).scalar() == 2
+        # 긴 노트 본문은 압축되고 검색 색인은 압축을 푼 본문으로 채워짐
+        notes = connection.exec_driver_sql(
+            "SELECT id, content, content_compressed IS NOT NULL, content_length, preview FROM notes ORDER BY id"
+        ).fetchall()
+        assert notes[0] == (1, "집합 정의", 0, len("집합 정의".encode("utf-8")), "집합 정의")
+        assert notes[1][1:4] == (None, 1, len(LONG_NOTE.encode("utf-8")))
+        assert connection.exec_driver_sql(
+            "SELECT rowid FROM notes_fts WHERE notes_fts MATCH '\"공집합\"'"
+        ).scalar() == 2
+        # 복습 기록을 SM-2로 재생해 카드별 스케줄을 채우고 예정일은 마지막 기록 값을 사용
+        assert connection.exec_driver_sql(
+            "SELECT card_id, repetitions, lapses, interval_days, last_review_id, date(due_at) FROM card_schedule "
+            "ORDER BY card_id"
+        ).fetchall() == [(1, 0, 1, 1, 3, "2024-01-09"), (2, 1, 0, 1, 4, "2024-01-07")]
+        # FSRS 기억 상태도 같은 기록으로 채움 (실패한 카드 1은 안정성이 첫 복습보다 낮아짐)
+        memory = connection.exec_driver_sql(
+            "SELECT stability, memory_difficulty FROM card_schedule ORDER BY card_id"
+        ).fetchall()
+        assert all(stability > 0 and 1 <= difficulty <= 10 for stability, difficulty in memory)
+        assert memory[0][0] < memory[1][0]
+        assert migrations.current_version(connection) == migrations.latest_version()
+    assert "ix_card_schedule_due" in index_names(engine, "card_schedule")
+    assert "ix_reviews_session_id" in index_names(engine, "reviews")
+    assert {"answered_at", "response_ms", "session_id"} <= {
+        column["name"] for column in inspect(engine).get_columns("reviews")
+    }
+    assert inspect(engine).has_table("scheduler_models")
+    # 개념/연결 변경 시 그래프 변경 카운터가 올라감
+    with engine.begin() as connection:
+        version = connection.exec_driver_sql("SELECT version FROM graph_version").scalar()
+        connection.exec_driver_sql("INSERT INTO connections (source_id, target_id) VALUES (1, 1)")
+        assert connection.exec_driver_sql("SELECT version FROM graph_version").scalar() == version + 1
+
+    # 다시 실행해도 변화 없음
+    assert migrations.upgrade(engine) == migrations.latest_version()
+
+def test_new_database_is_stamped(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+    assert migrations.init_db(engine) == migrations.latest_version()
+    assert "ix_cards_concept_id" in index_names(engine, "cards")
+    with engine.connect() as connection:
+        assert migrations.current_version(connection) == migrations.latest_version()
+
+def test_up_to_date_database_skips_schema_setup(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+    migrations.init_db(engine)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    assert migrations.init_db(engine) == migrations.latest_version()
+    assert statements == ["PRAGMA user_version"]
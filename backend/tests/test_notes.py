@@ -0,0 +1,74 @@
+import models
+from config import settings
+
+def long_text(words=3000):
+    return " ".join(f"강의{i % 50}" for i in range(words)) + " 마지막문단"
+
+def create_note(client, db, content):
+    concept = models.Concept(name="미분", description="")
+    db.add(concept)
+    db.commit()
+    response = client.post("/api/notes/", json={"concept_id": concept.id, "title": "강의 노트", "content": content})
+    assert response.status_code == 200
+    return response.json()["id"]
+
+def stored_note(db, note_id):
+    db.expire_all()
+    return db.get(models.Note, note_id)
+
+def test_large_note_is_compressed_transparently(client, db):
+    content = long_text()
+    note_id = create_note(client, db, content)
+
+    note = stored_note(db, note_id)
+    assert note.content_text is None
+    assert len(note.content_compressed) < len(content.encode("utf-8"))
+    assert note.content_length == len(content.encode("utf-8"))
+    assert client.get(f"/api/notes/{note_id}").json()["content"] == content
+
+    # 작은 본문으로 수정하면 평문으로 저장
+    client.put(f"/api/notes/{note_id}", json={"content": "짧은 본문"})
+    note = stored_note(db, note_id)
+    assert (note.content_text, note.content_compressed) == ("짧은 본문", None)
+
+def test_note_summaries_exclude_content(client, db):
+    content = long_text()
+    note_id = create_note(client, db, content)
+    summaries = client.get("/api/notes/summaries").json()
+    assert len(summaries) == 1
+    assert "content" not in summaries[0]
+    assert summaries[0]["id"] == note_id
+    assert summaries[0]["content_length"] == len(content.encode("utf-8"))
+    assert len(summaries[0]["preview"]) <= settings.NOTE_PREVIEW_LENGTH
+    assert content.startswith(summaries[0]["preview"][:-1])
+
+def test_note_content_streaming_and_ranges(client, db):
+    content = long_text()
+    data = content.encode("utf-8")
+    note_id = create_note(client, db, content)
+
+    response = client.get(f"/api/notes/{note_id}/content")
+    assert response.status_code == 200
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.content == data
+
+    for header, expected in (
+        ("bytes=0-9", data[:10]),
+        ("bytes=100-", data[100:]),
+        ("bytes=-15", data[-15:]),
+        (f"bytes=10-{len(data) * 2}", data[10:]),
+    ):
+        response = client.get(f"/api/notes/{note_id}/content", headers={"Range": header})
+        assert response.status_code == 206
+        assert response.content == expected
+        assert response.headers["content-range"].endswith(f"/{len(data)}")
+
+    response = client.get(f"/api/notes/{note_id}/content", headers={"Range": f"bytes={len(data)}-"})
+    assert response.status_code == 416
+    assert client.get("/api/notes/9999/content").status_code == 404
+
+def test_compressed_note_is_searchable(client, db):
+    note_id = create_note(client, db, long_text())
+    results = client.get("/api/search", params={"q": "마지막문단", "type": "note"}).json()["results"]
+    assert [result["id"] for result in results] == [note_id]
+    assert "<mark>마지막문단</mark>" in results[0]["snippet"]
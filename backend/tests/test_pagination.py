@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+import models
+from pagination import NEXT_CURSOR_HEADER
+
+def walk(client, url, params):
+    """
+    X-Next-Cursor 헤더를 따라 모든 페이지를 조회합니다.
+    """
+    pages = []
+    params = dict(params)
+    while True:
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+        params["cursor"] = cursor
+
+def setup_data(db):
+    concepts = [models.Concept(name=f"개념 {i}", description="") for i in range(7)]
+    db.add_all(concepts)
+    db.commit()
+    cards = [models.Card(concept_id=concepts[0].id, question="Q", answer="A") for _ in range(7)]
+    db.add_all(cards)
+    db.commit()
+    now = datetime.now().replace(microsecond=0)
+    # 같은 예정일이 섞여 있어도 (예정일, 카드 ID) 순서로 빠짐없이 나뉘어야 함
+    days = [-3, -1, -3, -2, -1, -5, 2]
+    # 마지막 카드의 지난 기록은 이미 예정일이 지났지만 최신 기록 기준으로는 예정이 아님
+    db.add(models.Review(card_id=cards[-1].id, difficulty=3, next_review_date=now - timedelta(days=4)))
+    db.commit()
+    db.add_all(models.Review(card_id=card.id, difficulty=3, next_review_date=now + timedelta(days=day))
+               for card, day in zip(cards, days))
+    for i in range(1, 7):
+        db.add(models.Connection(source_id=concepts[0].id, target_id=concepts[i].id))
+    db.commit()
+    return concepts
+
+def test_concepts_cursor_pagination(client, db):
+    concepts = setup_data(db)
+    pages = walk(client, "/api/concepts/", {"limit": 3})
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [concept["id"] for page in pages for concept in page] == [concept.id for concept in concepts]
+
+def test_due_reviews_cursor_pagination(client, db):
+    setup_data(db)
+    pages = walk(client, "/api/reviews/due", {"limit": 2})
+    reviews = [review for page in pages for review in page]
+    assert len(reviews) == 6
+    # 카드마다 한 번만
+    assert len({review["card_id"] for review in reviews}) == 6
+    keys = [(review["next_review_date"], review["card_id"]) for review in reviews]
+    assert keys == sorted(keys)
+
+def test_connections_cursor_pagination(client, db):
+    setup_data(db)
+    pages = walk(client, "/api/connections/", {"limit": 4})
+    assert [len(page) for page in pages] == [4, 2]
+    ids = [connection["id"] for page in pages for connection in page]
+    assert ids == sorted(ids) and len(set(ids)) == 6
+
+def test_invalid_cursor(client, db):
+    assert client.get("/api/cards/", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/reviews/due", params={"cursor": "WzFd"}).status_code == 400
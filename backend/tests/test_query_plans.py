@@ -0,0 +1,151 @@
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+
+import models
+
+@contextmanager
+def capture_queries():
+    """
+    요청 처리 중 실행된 WHERE 절이 있는 SELECT 문과 파라미터를 수집합니다.
+    """
+    queries = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and re.search(r"\bWHERE\b", statement):
+            queries.append((statement, parameters))
+
+    # 동기/비동기 엔진 모두에서 수집
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        yield queries
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+
+def query_plan(engine, statement, parameters=()):
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters)).all()
+    return [row[-1] for row in rows]
+
+def assert_uses_index(engine, queries, table):
+    """
+    table을 읽는 모든 쿼리가 테이블이나 인덱스 전체를 훑지 않고 인덱스로 탐색하는지 확인합니다.
+    """
+    checked = 0
+    for statement, parameters in queries:
+        for line in query_plan(engine, statement, parameters):
+            match = re.match(r"(SCAN|SEARCH) (\w+)", line)
+            if not match or match.group(2) != table:
+                continue
+            checked += 1
+            # 정수 기본 키(rowid) 탐색도 인덱스 탐색으로 인정
+            assert line.startswith("SEARCH") and ("INDEX" in line or "PRIMARY KEY" in line), f"{line}\n{statement}"
+    assert checked, f"No query touched {table}"
+
+def setup_data(db):
+    concepts = [models.Concept(name=name, description="") for name in ("집합", "함수", "극한")]
+    db.add_all(concepts)
+    db.commit()
+    db.add(models.Connection(source_id=concepts[1].id, target_id=concepts[0].id))
+    cards = [models.Card(concept_id=concepts[0].id, question="Q", answer="A") for _ in range(3)]
+    db.add_all(cards)
+    db.add(models.Note(concept_id=concepts[0].id, title="노트", content="내용"))
+    db.commit()
+    db.add(models.Review(card_id=cards[0].id, difficulty=3, next_review_date=datetime.now() - timedelta(days=1)))
+    db.commit()
+    return [concept.id for concept in concepts], [card.id for card in cards]
+
+def test_card_and_note_filters_use_index(client, db):
+    concept_ids, _ = setup_data(db)
+    with capture_queries() as queries:
+        client.get("/api/cards/", params={"concept_id": concept_ids[0]})
+    assert_uses_index(db.get_bind(), queries, "cards")
+
+    with capture_queries() as queries:
+        client.get("/api/notes/", params={"concept_id": concept_ids[0]})
+    assert_uses_index(db.get_bind(), queries, "notes")
+
+def test_review_filters_use_index(client, db):
+    _, card_ids = setup_data(db)
+    with capture_queries() as queries:
+        client.get("/api/reviews/", params={"card_id": card_ids[0]})
+    assert_uses_index(db.get_bind(), queries, "reviews")
+
+    with capture_queries() as queries:
+        assert len(client.get("/api/reviews/due").json()) == 1
+    # 예정 큐는 card_schedule 예정일 인덱스를 범위 탐색하고 복습 기록은 기본 키로 찾음
+    assert_uses_index(db.get_bind(), queries, "card_schedule")
+    assert_uses_index(db.get_bind(), queries, "reviews")
+
+    # 복습 큐는 카드 내용까지 한 번의 조인 쿼리로 가져옴
+    with capture_queries() as queries:
+        assert len(client.get("/api/reviews/queue").json()) == 1
+    assert len(queries) == 1
+    assert_uses_index(db.get_bind(), queries, "card_schedule")
+    assert_uses_index(db.get_bind(), queries, "cards")
+
+    # priority 순서도 저장된 개념 점수를 조인해 한 번의 쿼리로 정렬 (점수 버전 확인 쿼리 제외)
+    client.get("/api/reviews/queue", params={"order": "priority"})
+    with capture_queries() as queries:
+        assert len(client.get("/api/reviews/queue", params={"order": "priority"}).json()) == 1
+    queue_queries = [query for query in queries if "card_schedule" in query[0]]
+    assert len(queue_queries) == 1
+    assert_uses_index(db.get_bind(), queue_queries, "card_schedule")
+    assert_uses_index(db.get_bind(), queries, "concept_scores")
+
+def test_connection_duplicate_checks_use_index(client, db):
+    concept_ids, _ = setup_data(db)
+    with capture_queries() as queries:
+        response = client.post("/api/connections/", json={"source_id": concept_ids[1], "target_id": concept_ids[0]})
+    assert response.status_code == 400
+    assert_uses_index(db.get_bind(), queries, "connections")
+
+    with capture_queries() as queries:
+        client.post("/api/connections/batch", json={"operations": [
+            {"op": "create", "source_id": concept_ids[2], "target_id": concept_ids[1]},
+        ]})
+    assert_uses_index(db.get_bind(), queries, "connections")
+
+def test_statistics_queries_use_index(db):
+    concept_ids, _ = setup_data(db)
+    engine = db.get_bind()
+    recent_activity = (
+        select(models.LearningHistory)
+        .where(models.LearningHistory.concept_id == concept_ids[0])
+        .order_by(models.LearningHistory.created_at.desc())
+        .limit(10)
+    )
+    concept_reviews = (
+        select(models.Review)
+        .join(models.Card, models.Card.id == models.Review.card_id)
+        .where(models.Card.concept_id == concept_ids[0])
+    )
+    incoming = select(models.Connection.id).where(models.Connection.target_id == concept_ids[0])
+    for statement, table in ((recent_activity, "learning_history"), (concept_reviews, "reviews"),
+                             (concept_reviews, "cards"), (incoming, "connections")):
+        compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+        assert_uses_index(engine, [(str(compiled), ())], table)
+    # 정렬까지 인덱스로 처리되어 별도 정렬 단계가 없어야 함
+    compiled = recent_activity.compile(engine, compile_kwargs={"literal_binds": True})
+    assert not any("TEMP B-TREE" in line for line in query_plan(engine, str(compiled)))
+
+def test_cursor_pages_seek_with_index(client, db):
+    setup_data(db)
+    first = client.get("/api/reviews/due", params={"limit": 1})
+    cursor = first.headers["X-Next-Cursor"]
+    with capture_queries() as queries:
+        client.get("/api/reviews/due", params={"limit": 1, "cursor": cursor})
+    assert_uses_index(db.get_bind(), queries, "card_schedule")
+    # 정렬도 인덱스 순서를 그대로 사용
+    for statement, parameters in queries:
+        assert not any("TEMP B-TREE" in line for line in query_plan(db.get_bind(), statement, parameters))
+
+    concept_id = db.query(models.Card.concept_id).first()[0]
+    first = client.get("/api/cards/", params={"concept_id": concept_id, "limit": 1})
+    with capture_queries() as queries:
+        client.get("/api/cards/", params={"concept_id": concept_id, "limit": 1,
+                                          "cursor": first.headers["X-Next-Cursor"]})
+    assert_uses_index(db.get_bind(), queries, "cards")
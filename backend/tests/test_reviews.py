@@ -0,0 +1,351 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from config import settings
+import fsrs
+import models
+
+def setup_cards(db):
+    concept = models.Concept(name="집합", description="집합 설명")
+    db.add(concept)
+    db.commit()
+    cards = [models.Card(concept_id=concept.id, question=f"질문 {i}", answer="답") for i in range(2)]
+    db.add_all(cards)
+    db.commit()
+    return [card.id for card in cards]
+
+def test_create_and_list_due_reviews(client, db):
+    card_ids = setup_cards(db)
+    now = datetime.now()
+    for card_id in card_ids:
+        # 예전 클라이언트가 보내는 next_review_date는 무시하고 서버가 계산
+        response = client.post("/api/reviews/", json={
+            "card_id": card_id,
+            "difficulty": 3,
+            "next_review_date": (now - timedelta(days=1)).isoformat(),
+        })
+        assert response.status_code == 200
+        next_review_date = datetime.fromisoformat(response.json()["next_review_date"])
+        assert timedelta(hours=23) < next_review_date - now < timedelta(days=1, hours=1)
+    assert client.get("/api/reviews/due").json() == []
+
+    # 예정일이 이미 지난 기록(과거 기록 가져오기 등)은 그대로 예정 목록에 나타남
+    db.add(models.Review(card_id=card_ids[0], difficulty=3, next_review_date=now - timedelta(days=1)))
+    db.commit()
+    due = client.get("/api/reviews/due").json()
+    assert [review["card_id"] for review in due] == [card_ids[0]]
+    assert len(client.get("/api/reviews/", params={"card_id": card_ids[1]}).json()) == 1
+
+def test_review_errors_and_delete(client, db):
+    card_ids = setup_cards(db)
+    response = client.post("/api/reviews/", json={
+        "card_id": 9999, "difficulty": 3, "next_review_date": datetime.now().isoformat()
+    })
+    assert response.status_code == 404
+    response = client.post("/api/reviews/", json={
+        "card_id": card_ids[0], "difficulty": 7, "next_review_date": datetime.now().isoformat()
+    })
+    assert response.status_code == 400
+
+    review_id = client.post("/api/reviews/", json={
+        "card_id": card_ids[0], "difficulty": 4, "next_review_date": datetime.now().isoformat()
+    }).json()["id"]
+    assert client.delete(f"/api/reviews/{review_id}").status_code == 200
+    assert client.get(f"/api/reviews/{review_id}").status_code == 404
+
+def test_card_schedule_follows_reviews(client, db):
+    card_ids = setup_cards(db)
+
+    def review(difficulty):
+        return client.post("/api/reviews/", json={"card_id": card_ids[0], "difficulty": difficulty}).json()
+
+    def schedule():
+        db.expire_all()
+        state = db.get(models.CardSchedule, card_ids[0])
+        return state and (state.repetitions, state.lapses, state.interval_days, round(state.ease, 2))
+
+    # SM-2: 1일 -> 6일 -> 이전 간격 x ease
+    review(4)
+    assert schedule() == (1, 0, 1, 2.5)
+    review(4)
+    assert schedule() == (2, 0, 6, 2.5)
+    passed = review(5)
+    assert schedule() == (3, 0, 15, 2.6)
+    due_at = db.get(models.CardSchedule, card_ids[0]).due_at
+    assert due_at == datetime.fromisoformat(passed["next_review_date"])
+
+    # 성공한 적 있는 카드를 실패하면 반복 횟수 초기화 + lapse, ease 감소
+    failed = review(1)
+    assert schedule() == (0, 1, 1, 2.06)
+
+    # 기록을 지우면 남은 기록으로 상태를 다시 계산
+    assert client.delete(f"/api/reviews/{failed['id']}").status_code == 200
+    assert schedule() == (3, 0, 15, 2.6)
+
+    # 카드를 지우면 스케줄도 삭제
+    assert client.delete(f"/api/cards/{card_ids[0]}").status_code == 200
+    assert schedule() is None
+
+def test_reschedule_all_cards(client, db):
+    card_ids = setup_cards(db)
+    for difficulty in (4, 4, 5):
+        client.post("/api/reviews/", json={"card_id": card_ids[0], "difficulty": difficulty})
+    client.post("/api/reviews/", json={"card_id": card_ids[1], "difficulty": 2})
+
+    assert client.post("/api/reviews/reschedule", params={"scale": 0}).status_code == 400
+    response = client.post("/api/reviews/reschedule", params={"scale": 2})
+    assert response.json() == {"rescheduled": 2}
+
+    db.expire_all()
+    long_term, failed = (db.get(models.CardSchedule, card_id) for card_id in card_ids)
+    assert long_term.interval_days == 30
+    assert long_term.due_at == long_term.last_reviewed_at + timedelta(days=30)
+    # 실패 직후 카드는 첫 간격 그대로
+    assert failed.interval_days == 1
+    assert failed.due_at == failed.last_reviewed_at + timedelta(days=1)
+
+def test_reschedule_keeps_due_reviews_in_sync(client, db):
+    import scheduling
+
+    card_ids = setup_cards(db)
+    now = datetime.now()
+    entries = [
+        {"card_id": card_ids[0], "difficulty": 5, "answered_at": (now - timedelta(days=40)).isoformat()},
+        {"card_id": card_ids[1], "difficulty": 5, "answered_at": (now - timedelta(days=20)).isoformat()},
+    ]
+    client.post("/api/reviews/sessions", json={"session_id": "old", "entries": entries})
+    assert client.post("/api/reviews/reschedule", params={"scale": 10}).json() == {"rescheduled": 2}
+
+    # 최신 복습 기록의 예정일도 옮겨져 예정일 목록을 한 건씩 넘겨도 빠지거나 겹치는 카드가 없음
+    db.expire_all()
+    for card_id in card_ids:
+        schedule = db.get(models.CardSchedule, card_id)
+        assert db.get(models.Review, schedule.last_review_id).next_review_date == schedule.due_at
+    seen, cursor = [], None
+    while True:
+        response = client.get("/api/reviews/due", params={"limit": 1, **({"cursor": cursor} if cursor else {})})
+        seen += [review["card_id"] for review in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == card_ids
+
+    # 스케줄을 다시 만들어도 재계산한 예정일이 유지됨
+    due_at = [db.get(models.CardSchedule, card_id).due_at for card_id in card_ids]
+    with db.get_bind().begin() as connection:
+        scheduling.rebuild_schedules(connection)
+    db.expire_all()
+    assert [db.get(models.CardSchedule, card_id).due_at for card_id in card_ids] == due_at
+
+def test_progress_stats_counts_cards_due_today(client, db):
+    card_ids = setup_cards(db)
+    noon = datetime.combine(datetime.now().date(), datetime.min.time()) + timedelta(hours=12)
+    # 첫 카드는 오늘 예정인 기록이 두 개지만 한 번만 셈, 둘째 카드는 내일 예정
+    for card_id, due_at in ((card_ids[0], noon), (card_ids[0], noon), (card_ids[1], noon + timedelta(days=1))):
+        db.add(models.Review(card_id=card_id, difficulty=3, next_review_date=due_at))
+        db.commit()
+    assert client.get("/api/stats/progress-stats").json()["due_today"] == 1
+
+    # 재계산으로 예정일이 옮겨진 카드는 오늘 예정에서 빠짐
+    schedule = db.get(models.CardSchedule, card_ids[0])
+    schedule.due_at = noon + timedelta(days=2)
+    db.commit()
+    assert client.get("/api/stats/progress-stats").json()["due_today"] == 0
+
+def test_submit_review_session_is_idempotent(client, db):
+    card_ids = setup_cards(db)
+    answered = datetime(2024, 3, 1, 9, 0)
+    payload = {
+        "session_id": "session-1",
+        "entries": [
+            # 순서가 섞여 와도 답한 시각 순서로 반영: 첫 카드는 실패 뒤 다시 성공
+            {"card_id": card_ids[0], "difficulty": 4, "answered_at": (answered + timedelta(minutes=5)).isoformat()},
+            {"card_id": card_ids[0], "difficulty": 1, "answered_at": answered.isoformat(), "response_ms": 8000},
+            {"card_id": card_ids[1], "difficulty": 5, "answered_at": answered.isoformat(), "response_ms": 1200},
+        ],
+    }
+    result = client.post("/api/reviews/sessions", json=payload).json()
+    assert result["duplicate"] is False
+    assert [(review["card_id"], review["difficulty"]) for review in result["reviews"]] == [
+        (card_ids[0], 1), (card_ids[1], 5), (card_ids[0], 4),
+    ]
+    # 예정일은 답한 시각 기준
+    assert result["reviews"][-1]["next_review_date"].startswith("2024-03-02T09:05")
+    state = db.get(models.CardSchedule, card_ids[0])
+    assert (state.repetitions, state.last_reviewed_at) == (1, answered + timedelta(minutes=5))
+    assert db.query(models.LearningHistory).filter_by(activity_type="review").count() == 3
+
+    # 재시도는 아무것도 다시 반영하지 않고 처음 결과를 돌려줌
+    retry = client.post("/api/reviews/sessions", json=payload).json()
+    assert retry["duplicate"] is True
+    assert [review["id"] for review in retry["reviews"]] == [review["id"] for review in result["reviews"]]
+    assert len(client.get("/api/reviews/").json()) == 3
+    assert db.query(models.LearningHistory).count() == 3
+
+def test_submit_review_session_errors(client, db):
+    card_ids = setup_cards(db)
+    entry = {"card_id": card_ids[0], "difficulty": 3, "answered_at": datetime.now().isoformat()}
+    response = client.post("/api/reviews/sessions", json={
+        "session_id": "s", "entries": [entry, {**entry, "card_id": 9999}],
+    })
+    assert response.status_code == 404
+    assert "9999" in response.json()["detail"]
+    response = client.post("/api/reviews/sessions", json={"session_id": "s", "entries": [{**entry, "difficulty": 7}]})
+    assert response.status_code == 400
+    assert client.post("/api/reviews/sessions", json={"session_id": "s", "entries": []}).status_code == 400
+    assert client.post("/api/reviews/sessions", json={"session_id": "", "entries": [entry]}).status_code == 400
+    # 실패한 제출은 아무것도 남기지 않으므로 같은 세션 ID로 다시 제출할 수 있음
+    assert client.get("/api/reviews/").json() == []
+    assert client.post("/api/reviews/sessions", json={"session_id": "s", "entries": [entry]}).json()["duplicate"] is False
+
+def test_submit_review_session_converts_aware_answered_at(client, db):
+    card_ids = setup_cards(db)
+    # 서버와 다른 시간대로 보낸 5분 전 답변은 서버 현지 시각으로 바뀌어 저장됨
+    answered = datetime.now(timezone(timedelta(hours=-5))) - timedelta(minutes=5)
+    expected = answered.astimezone().replace(tzinfo=None)
+    entry = {"card_id": card_ids[0], "difficulty": 4, "answered_at": answered.isoformat()}
+    result = client.post("/api/reviews/sessions", json={"session_id": "aware", "entries": [entry]}).json()
+    assert result["reviews"][0]["answered_at"] == expected.isoformat()
+    state = db.get(models.CardSchedule, card_ids[0])
+    assert state.last_reviewed_at == expected
+    assert state.due_at == expected + timedelta(days=state.interval_days)
+    history = db.query(models.LearningHistory).filter_by(activity_type="review").one()
+    assert history.created_at == expected
+
+    # 미래 시각의 답변은 거부
+    future = {**entry, "answered_at": (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()}
+    response = client.post("/api/reviews/sessions", json={"session_id": "future", "entries": [future]})
+    assert response.status_code == 422
+    assert db.query(models.Review).count() == 1
+
+def setup_queue(db):
+    hub, leaf = models.Concept(name="집합", description=""), models.Concept(name="함수", description="")
+    db.add_all([hub, leaf])
+    db.commit()
+    # 함수 -> 집합 연결로 집합의 PageRank가 더 높음
+    db.add(models.Connection(source_id=leaf.id, target_id=hub.id))
+    cards = {
+        name: models.Card(concept_id=concept.id, question=f"{name}?", answer=name)
+        for name, concept in (("a1", hub), ("a2", hub), ("b1", leaf), ("b2", leaf), ("later", leaf))
+    }
+    db.add_all(cards.values())
+    db.commit()
+    now = datetime.now()
+    for name, days in (("a1", -1), ("a2", -2), ("b1", -5), ("b2", -3), ("later", 3)):
+        db.add(models.Review(card_id=cards[name].id, difficulty=3, next_review_date=now + timedelta(days=days)))
+    db.commit()
+    return {card.id: name for name, card in cards.items()}
+
+def walk_queue(client, params):
+    names, cursor = [], None
+    while True:
+        response = client.get("/api/reviews/queue", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        names.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return names
+
+def test_review_queue_orders(client, db):
+    names = setup_queue(db)
+    card_names = lambda pages: [[names[item["card_id"]] for item in page] for page in pages]
+
+    pages = walk_queue(client, {"n": 2})
+    assert card_names(pages) == [["b1", "b2"], ["a2", "a1"], []]
+    first = pages[0][0]
+    assert (first["question"], first["answer"], first["concept_name"]) == ("b1?", "b1", "함수")
+    assert 4.9 < first["overdue_days"] < 5.1
+
+    pages = walk_queue(client, {"n": 3, "order": "priority"})
+    assert card_names(pages) == [["a2", "a1", "b1"], ["b2"]]
+    assert pages[0][0]["priority"] > pages[1][0]["priority"]
+
+    # 무작위 순서도 배치를 이어 받으면 예정된 카드가 한 번씩 모두 나옴
+    pages = walk_queue(client, {"n": 1, "order": "random"})
+    assert sorted(name for page in card_names(pages) for name in page) == ["a1", "a2", "b1", "b2"]
+
+    assert client.get("/api/reviews/queue", params={"order": "oldest"}).status_code == 400
+    assert client.get("/api/reviews/queue", params={"n": 0}).status_code == 400
+    # 다른 정렬 방식의 커서는 거부
+    cursor = client.get("/api/reviews/queue", params={"n": 1}).headers["X-Next-Cursor"]
+    assert client.get("/api/reviews/queue", params={"order": "random", "cursor": cursor}).status_code == 400
+
+def test_priority_queue_pins_scores_in_cursor(client, db, monkeypatch):
+    import review_queue
+
+    names = setup_queue(db)
+    ids = {concept.name: concept.id for concept in db.query(models.Concept)}
+    first = client.get("/api/reviews/queue", params={"n": 2, "order": "priority"})
+    assert [names[item["card_id"]] for item in first.json()] == ["a2", "a1"]
+
+    # 그래프가 바뀌어 함수의 PageRank가 더 높아져도 이어 받는 배치는 처음 점수로 정렬됨
+    db.add(models.Connection(source_id=ids["집합"], target_id=ids["함수"]))
+    db.add(models.Concept(name="수열", description=""))
+    db.commit()
+    db.add(models.Connection(source_id=db.query(models.Concept).filter_by(name="수열").one().id, target_id=ids["함수"]))
+    db.commit()
+    cursor = first.headers["X-Next-Cursor"]
+    response = client.get("/api/reviews/queue", params={"n": 2, "order": "priority", "cursor": cursor})
+    assert [names[item["card_id"]] for item in response.json()] == ["b1", "b2"]
+    # 새로 시작한 큐는 바뀐 점수를 사용
+    restarted = client.get("/api/reviews/queue", params={"n": 2, "order": "priority"}).json()
+    assert [names[item["card_id"]] for item in restarted] == ["b1", "b2"]
+
+    # 정리된 점수 버전을 담은 커서는 만료
+    monkeypatch.setattr(review_queue, "SCORE_VERSIONS_KEPT", 1)
+    db.add(models.Concept(name="급수", description=""))
+    db.commit()
+    client.get("/api/reviews/queue", params={"n": 2, "order": "priority"})
+    response = client.get("/api/reviews/queue", params={"n": 2, "order": "priority", "cursor": cursor})
+    assert response.status_code == 400
+
+def test_fsrs_scheduler_and_fit(client, db, monkeypatch):
+    card_ids = setup_cards(db)
+    fsrs.clear_cache()
+    monkeypatch.setattr(settings, "SCHEDULER", "fsrs")
+    answered = datetime(2024, 3, 1, 9, 0)
+    entries = [
+        {"card_id": card_ids[0], "difficulty": 4, "answered_at": answered.isoformat()},
+        {"card_id": card_ids[0], "difficulty": 4, "answered_at": (answered + timedelta(days=3)).isoformat()},
+        {"card_id": card_ids[1], "difficulty": 2, "answered_at": answered.isoformat()},
+        {"card_id": card_ids[1], "difficulty": 1, "answered_at": (answered + timedelta(days=1)).isoformat()},
+    ]
+    client.post("/api/reviews/sessions", json={"session_id": "fsrs", "entries": entries})
+
+    # 기억 상태는 기본 파라미터로 갱신되고 간격은 목표 기억률에 도달하는 날
+    first = fsrs.next_memory_state(None, 0, 4, fsrs.DEFAULT_PARAMETERS)
+    second = fsrs.next_memory_state(first, 3, 4, fsrs.DEFAULT_PARAMETERS)
+    db.expire_all()
+    state = db.get(models.CardSchedule, card_ids[0])
+    assert (state.stability, state.memory_difficulty) == pytest.approx(second)
+    assert state.interval_days == fsrs.next_interval(second.stability) > 6
+    assert state.due_at == answered + timedelta(days=3 + state.interval_days)
+    # SM-2 상태도 함께 유지
+    assert (state.repetitions, state.lapses) == (2, 0)
+
+    status = client.get("/api/reviews/scheduler").json()
+    assert status["scheduler"] == "fsrs"
+    assert status["parameters"] == list(fsrs.DEFAULT_PARAMETERS)
+    assert status["fitted_at"] is None
+
+    # 테스트 클라이언트는 백그라운드 작업을 응답 전에 끝냄
+    response = client.post("/api/reviews/scheduler/fit")
+    assert response.status_code == 202
+    status = client.get("/api/reviews/scheduler").json()
+    assert status["fit_job"]["status"] == "done"
+    assert status["review_count"] == 2
+    assert status["loss"] <= status["default_loss"]
+    assert fsrs.get_parameters(db.connection()) == tuple(status["parameters"])
+
+    # 이미 실행 중이면 새 작업을 시작하지 않음
+    assert fsrs.start_fit_job()
+    assert client.post("/api/reviews/scheduler/fit").status_code == 400
+    fsrs.run_fit_job(db.get_bind())
+
+    # 전체 재계산도 저장된 안정성으로 간격을 구함
+    assert client.post("/api/reviews/reschedule", params={"scale": 2}).json() == {"rescheduled": 2}
+    db.expire_all()
+    state = db.get(models.CardSchedule, card_ids[0])
+    assert state.interval_days == fsrs.next_interval(state.stability, scale=2)
+    fsrs.clear_cache()
@@ -0,0 +1,62 @@
+import models
+
+def setup_content(db):
+    concepts = [
+        models.Concept(name="미분", description="함수의 순간 변화율을 구하는 연산"),
+        models.Concept(name="적분", description="미분의 역연산이자 넓이를 구하는 방법"),
+        models.Concept(name="집합", description="원소들의 모임"),
+    ]
+    db.add_all(concepts)
+    db.commit()
+    ids = {concept.name: concept.id for concept in concepts}
+    db.add_all([
+        models.Card(concept_id=ids["미분"], question="미분 계수의 정의는?", answer="극한으로 정의한 순간 변화율"),
+        models.Card(concept_id=ids["집합"], question="공집합이란?", answer="원소가 없는 집합", explanation="모든 집합의 부분집합"),
+        models.Note(concept_id=ids["적분"], title="정적분 정리", content="미분과 적분은 서로 역연산 관계"),
+    ])
+    db.commit()
+    return ids
+
+def test_search_ranks_and_snippets(client, db):
+    ids = setup_content(db)
+    response = client.get("/api/search", params={"q": "미분"})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    # 이름이 정확히 일치하는 개념이 가장 먼저
+    assert (results[0]["type"], results[0]["id"]) == ("concept", ids["미분"])
+    assert {result["type"] for result in results} == {"concept", "card", "note"}
+    assert all("<mark>미분" in result["snippet"] for result in results)
+    ranks = [result["rank"] for result in results]
+    assert ranks == sorted(ranks)
+
+    note = next(result for result in results if result["type"] == "note")
+    assert note["title"] == "정적분 정리"
+    assert note["concept_id"] == ids["적분"]
+
+def test_search_type_filter_and_prefix(client, db):
+    setup_content(db)
+    results = client.get("/api/search", params={"q": "집합", "type": "card"}).json()["results"]
+    assert [result["title"] for result in results] == ["공집합이란?"]
+
+    # 기본은 접두어 검색: "변화"로 "변화율"을 찾음
+    assert len(client.get("/api/search", params={"q": "순간 변화"}).json()["results"]) == 2
+    assert client.get("/api/search", params={"q": "변화", "prefix": False}).json()["results"] == []
+    assert len(client.get("/api/search", params={"q": "변화*", "prefix": False}).json()["results"]) == 2
+
+    # FTS 문법 문자는 일반 문자로 취급
+    assert client.get("/api/search", params={"q": '"미분 OR ('}).status_code == 200
+
+def test_search_follows_updates_and_deletes(client, db):
+    ids = setup_content(db)
+    client.put(f"/api/concepts/{ids['집합']}", json={"description": "서로 다른 대상의 모임"})
+    assert client.get("/api/search", params={"q": "원소들의"}).json()["results"] == []
+    assert len(client.get("/api/search", params={"q": "대상의"}).json()["results"]) == 1
+
+    note_id = client.get("/api/search", params={"q": "정적분", "type": "note"}).json()["results"][0]["id"]
+    client.delete(f"/api/notes/{note_id}")
+    assert client.get("/api/search", params={"q": "정적분"}).json()["results"] == []
+
+def test_search_validation(client, db):
+    assert client.get("/api/search", params={"q": " "}).status_code == 400
+    assert client.get("/api/search", params={"q": "미분", "type": "review"}).status_code == 400
+    assert client.get("/api/search", params={"q": "미분", "limit": 0}).status_code == 400
@@ -6,7 +6,7 @@ from sqlalchemy.pool import StaticPool
 from datetime import datetime, timedelta
 
 from app import app
-from database import Base, get_db
+from database import Base, get_db, get_read_db
 import models
 import schemas
 
@@ -29,6 +29,7 @@ def override_get_db():
         db.close()
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
 
 # 테스트 클라이언트 생성
 client = TestClient(app)
@@ -180,7 +181,12 @@ def test_get_review_stats():
     
     # 백분율 확인
     for diff in [2, 3, 4]:
-        assert retention_stats[diff]["percentage"] == (1/3) * 100  # 각 난이도별 1개씩, 총 3개
+        assert retention_stats[diff]["percentage"] == round((1/3) * 100, 2)  # 각 난이도별 1개씩, 총 3개
+
+    # 다음 복습 기록이 없으므로 기억 모델로 추정한 유지율 (쉽게 답할수록 높음)
+    estimates = [retention_stats[diff]["estimated_retention"] for diff in range(1, 6)]
+    assert estimates[0] == estimates[1]
+    assert 0 < estimates[1] < estimates[2] < estimates[3] < estimates[4] < 1
 
 def test_get_progress_stats():
     response = client.get("/api/stats/progress-stats")